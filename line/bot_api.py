@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Bot API Client - one pooled keep-alive HTTP client per process for the LINE Messaging API
+Every call reuses the pooled TLS connections instead of a fresh handshake, has a timeout,
+and retries transient failures (connection errors, 5xx) with jittered exponential backoff.
+Reduced copy of telegram/bot_api.py: the Telegram per-chat pacing and 429 retry_after handling are left out.
+
+Usage:
+    from bot_api import get_client
+    response = get_client().post(url, headers=headers, data=body)
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (5, 30)       # (connect, read) seconds
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class BotApiClient:
+    """requests.Session with a sized connection pool, default timeouts and retries
+
+    Retried: connection failures (refused, reset, DNS, connect timeout) and
+    5xx answers. Read timeouts are retried for GET only, since a POST that
+    timed out while waiting for the answer may already have been delivered.
+    File uploads are rewound before each retry.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=2, backoff=0.5, pool_size=10):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """Send a request, returns the response of the last attempt or raises its exception"""
+        retries = self.max_retries if retries is None else retries
+        kwargs['timeout'] = timeout or self.timeout
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        return response
+                    response.close()
+                except requests.exceptions.ReadTimeout:
+                    if method != 'GET' or attempt >= retries:
+                        self._count_failure()
+                        raise
+                except requests.exceptions.ConnectionError:
+                    if attempt >= retries:
+                        self._count_failure()
+                        raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                # Full jitter, so the workers of a restarting server do not retry in lockstep
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+                self._rewind(kwargs.get('files'))
+        finally:
+            with self._lock:
+                self.calls += 1
+                self.total_ms += (time.monotonic() - started) * 1000
+
+    def _count_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    @staticmethod
+    def _rewind(files):
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'avg_ms': round(self.total_ms / self.calls, 1) if self.calls else 0
+            }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client(**settings):
+    """Process-wide client; settings (BotApiClient arguments) apply when it is first created
+
+    A forked worker gets its own client instead of sharing the parent's sockets.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = BotApiClient(**settings)
+            _client_pid = os.getpid()
+        return _client
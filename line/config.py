@@ -65,6 +65,8 @@ DEFAULT_ACTIVE_AGENT = _config['default_active_agent']
 # tmux configuration
 TMUX_SESSION_NAME = _config['tmux']['session_name']
 TMUX_WORKING_DIR = _config['tmux']['working_dir']
+_injection_socket = _config['tmux'].get('injection_socket', '')
+INJECTION_SOCKET = os.path.join(BASE_DIR, _injection_socket) if _injection_socket else ""
 
 # Image processing configuration
 DEFAULT_CLEANUP_POLICY = _config.get('default_cleanup_policy', {'images_retention_days': 7})
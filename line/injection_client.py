@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Injection Client - submit prompts to the local injection service (injection_service.py)
+Standard library only, so any producer (Gmail listener, LINE server, cron scripts) can use it.
+Copy of the Telegram edition's client without notify() (Agent reports are a Telegram-only op).
+
+Usage:
+    python3 injection_client.py --socket /path/to/.injection.sock --source cron Güpa "Daily report please"
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+
+def submit(agent_name, text, source, socket_path, session=None, timeout=60):
+    """
+    Submit text for agent_name to the injection service
+
+    Args:
+        agent_name (str): Target Agent (window) name
+        text (str): Prompt to type and submit
+        source (str): Producer tag shown in the service's logs and statistics
+        socket_path (str): Unix socket of the service
+        session (str): tmux session the producer expects, the service refuses other sessions
+        timeout (float): Seconds to wait for the injection to complete
+
+    Returns:
+        True / False: the service delivered / failed to deliver the prompt (final, do not retry)
+        None: the service did not take the request (not running, other session, unknown Agent),
+              the caller may inject by itself
+    """
+    request = {'op': 'inject', 'agent': agent_name, 'text': text, 'source': source, 'session': session}
+    return _call(socket_path, request, timeout)
+
+
+def _call(socket_path, request, timeout):
+    """One request/reply round trip, True/False for the outcome, None when the service did not take it"""
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    try:
+        sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        reply_line = sock.makefile('rb').readline()
+    except OSError as e:
+        # The request may already be queued for the Agent: report failure, never fall back
+        print(f"⚠️ Injection service did not answer: {e}")
+        return False
+    finally:
+        sock.close()
+
+    try:
+        reply = json.loads(reply_line)
+    except ValueError:
+        return False
+    if not reply.get('accepted', False):
+        print(f"⚠️ Injection service refused request: {reply.get('error')}")
+        return None
+    return bool(reply.get('ok'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Submit a prompt to an Agent through the injection service")
+    parser.add_argument('agent')
+    parser.add_argument('text')
+    parser.add_argument('--socket', required=True, help="Unix socket of the injection service")
+    parser.add_argument('--source', default='cli')
+    parser.add_argument('--session', default=None)
+    args = parser.parse_args()
+
+    result = submit(args.agent, args.text, args.source, args.socket, args.session)
+    if result is None:
+        print("❌ Injection service unavailable")
+    sys.exit(0 if result else 1)
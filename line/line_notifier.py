@@ -4,12 +4,12 @@ Claude Code LINE Notifier
 Read message format from template file, Claude Code only needs to fill in variables
 """
 
-import requests
 import json
 import yaml
 import os
 from datetime import datetime
 from config import CHANNEL_ACCESS_TOKEN
+from bot_api import get_client
 
 def load_message_template(template_name: str, software: str = None) -> dict:
     """
@@ -83,7 +83,7 @@ def send_message(message: str, quick_reply_items: list = None) -> bool:
     }
 
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = get_client().post(url, headers=headers, data=json.dumps(data))
 
         if response.status_code == 200:
             print(f'✅ LINE notification sent successfully: {datetime.now().strftime("%H:%M:%S")}')
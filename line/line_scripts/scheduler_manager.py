@@ -12,7 +12,8 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 # Import configuration
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import TMUX_SESSION_NAME
+from config import TMUX_SESSION_NAME, INJECTION_SOCKET
+from injection_client import submit as submit_injection
 
 class SchedulerManager:
     def __init__(self, flask_app=None, image_manager=None):
@@ -28,10 +29,17 @@ class SchedulerManager:
         
         print(f"⏰ [Scheduler] Executing scheduled task -> [{agent_name}]: {command}", flush=True)
 
+        # Shared injection service first (ordered with the webhook's messages), tmux directly otherwise
+        result = submit_injection(agent_name, final_message, 'line-scheduler', INJECTION_SOCKET, TMUX_SESSION_NAME)
+        if result is not None:
+            if not result:
+                print(f"❌ [Scheduler] Injection service failed to deliver task to [{agent_name}]", flush=True)
+            return
+
         try:
             subprocess.run([
                 'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                final_message
+                '-l', final_message
             ], check=True)
 
             # Add delay to ensure command input is complete before sending Enter
@@ -9,7 +9,6 @@ import json
 import subprocess
 import time
 import os
-import requests
 import hashlib
 import hmac
 import base64
@@ -18,9 +17,11 @@ from config import (
     CHANNEL_ACCESS_TOKEN, CHANNEL_SECRET, FLASK_HOST, FLASK_PORT, 
     TMUX_SESSION_NAME, AGENTS, DEFAULT_ACTIVE_AGENT,
     DEFAULT_CLEANUP_POLICY, CUSTOM_MENU, SCHEDULER_CONF, TEMP_IMAGE_DIR_NAME,
-    COLLABORATION_GROUPS
+    COLLABORATION_GROUPS, INJECTION_SOCKET
 )
 from line_notifier import send_message
+from bot_api import get_client
+from injection_client import submit as submit_injection
 from line_scripts.scheduler_manager import SchedulerManager
 
 app = Flask(__name__)
@@ -49,7 +50,7 @@ class ImageManager:
             url = f"https://api-data.line.me/v2/bot/message/{message_id}/content"
             headers = {'Authorization': f'Bearer {CHANNEL_ACCESS_TOKEN}'}
 
-            response = requests.get(url, headers=headers, stream=True)
+            response = get_client().get(url, headers=headers, stream=True)
             if response.status_code != 200:
                 print(f"❌ Unable to download LINE image: {response.status_code} {response.text}")
                 return None
@@ -123,13 +124,19 @@ def send_to_ai_session(message, agent_name=None):
     global CURRENT_AGENT
     target = agent_name or CURRENT_AGENT
 
+    # Shared injection service (per-window ordering, one tmux connection), if configured and running
+    result = submit_injection(target, message, 'line', INJECTION_SOCKET, TMUX_SESSION_NAME)
+    if result is not None:
+        print(f"📤 Sent to Agent[{target}] via injection service: {message}")
+        return result
+
     try:
         if not check_agent_session(target):
             send_message(f"❌ Agent '{target}' window does not exist\nPlease check configuration or run: ./start_all_services.sh")
             return False
 
-        # Text -> Delay -> Enter
-        subprocess.run(['tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}', message], check=True)
+        # Text -> Delay -> Enter (-l: literal, no key-name lookup)
+        subprocess.run(['tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}', '-l', message], check=True)
         time.sleep(0.1)
         subprocess.run(['tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}', 'Enter'], check=True)
 
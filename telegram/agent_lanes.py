@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# agent_lanes.py
+# Per-agent serialized dispatch lanes: FIFO order inside one tmux window, parallelism across windows
+
+import fcntl
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+LANE_POLICIES = ('reject', 'drop_oldest', 'spill')
+
+
+class LaneSaturated(Exception):
+    """Raised when a job is not run because the agent's lane is full
+
+    action is 'rejected' (job refused), 'dropped' (queued job evicted by a
+    newer one) or 'spilled' (job parked in the durable backlog instead).
+    """
+
+    def __init__(self, agent_name, depth, action):
+        super().__init__(f"Agent [{agent_name}] lane saturated ({depth} queued), job {action}")
+        self.agent_name = agent_name
+        self.depth = depth
+        self.action = action
+
+
+class AgentLane:
+    """Single FIFO lane with its own worker thread (one per agent window)
+
+    With lock_dir set, each job also holds an flock on <lock_dir>/<name>.lock,
+    so lanes of the same agent in different worker processes stay serialized.
+
+    With max_depth > 0, admission is capped: once max_depth jobs are waiting,
+    policy decides between refusing the new job ('reject'), evicting the
+    oldest waiting one ('drop_oldest') or parking the job's spill_payload in
+    backlog (a SharedStateStore) for later replay through
+    restore_fn(name, payload) -> (fn, args) ('spill').
+    """
+
+    BACKLOG_POLL_INTERVAL = 5.0
+
+    def __init__(self, name, lock_dir=None, max_depth=0, policy='reject', backlog=None, restore_fn=None):
+        if policy not in LANE_POLICIES:
+            raise ValueError(f"Unknown lane policy '{policy}', expected one of {LANE_POLICIES}")
+        self.name = name
+        self.lock_path = os.path.join(lock_dir, f"{name.replace('/', '_')}.lock") if lock_dir else None
+        self.max_depth = max(0, int(max_depth))
+        self.policy = policy
+        self.backlog = backlog if policy == 'spill' else None
+        self.restore_fn = restore_fn
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.busy = False
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_total = 0.0
+        self.service_max = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+
+    def submit(self, fn, *args, spill_payload=None, **kwargs):
+        """Queue fn(*args, **kwargs) on this lane and return a Future for its result
+
+        Raises LaneSaturated when the lane is full and the job is rejected or
+        spilled. spill_payload is the JSON-serializable form of the job used
+        by the 'spill' policy; jobs without one are rejected instead.
+        """
+        future = Future()
+        evicted = None
+        with self._cond:
+            depth = len(self._queue)
+            # While older jobs wait in the backlog, new ones queue behind them to keep FIFO order
+            spill_ok = self.backlog is not None and spill_payload is not None
+            if spill_ok and depth < self.max_depth and self.backlog.backlog_count(self.name):
+                depth = self.max_depth
+            if self.max_depth and depth >= self.max_depth:
+                if self.policy == 'drop_oldest':
+                    evicted = self._queue.popleft()
+                elif self.policy == 'spill' and spill_ok:
+                    self.backlog.push_backlog(self.name, spill_payload)
+                    with self._lock:
+                        self.spilled += 1
+                    self._cond.notify()
+                    self._ensure_worker()
+                    raise LaneSaturated(self.name, len(self._queue), 'spilled')
+                else:
+                    with self._lock:
+                        self.rejected += 1
+                    raise LaneSaturated(self.name, depth, 'rejected')
+            self._queue.append((future, time.monotonic(), fn, args, kwargs))
+            self._cond.notify()
+        with self._lock:
+            self.admitted += 1
+            if evicted is not None:
+                self.dropped += 1
+        if evicted is not None:
+            evicted[0].set_exception(LaneSaturated(self.name, depth, 'dropped'))
+        self._ensure_worker()
+        return future
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker_loop, name=f'lane-{self.name}', daemon=True)
+                self._thread.start()
+
+    def _next_job(self):
+        while True:
+            with self._cond:
+                if not self._queue:
+                    # With a backlog, wake up now and then to pick up jobs spilled by other processes
+                    self._cond.wait(self.BACKLOG_POLL_INTERVAL if self.backlog is not None else None)
+                if self._queue:
+                    return self._queue.popleft()
+            self.replay_backlog()
+
+    def replay_backlog(self):
+        """Move spilled jobs back into the lane while there is room (no-op without a backlog)"""
+        if self.backlog is None or self.restore_fn is None:
+            return 0
+        with self._cond:
+            room = (self.max_depth - len(self._queue)) if self.max_depth else 1
+        if room <= 0:
+            return 0
+        payloads = self.backlog.pop_backlog(self.name, room)
+        for payload in payloads:
+            try:
+                fn, args = self.restore_fn(self.name, payload)
+            except Exception as e:
+                print(f"⚠️ [Lane:{self.name}] Unable to restore backlog job: {e}", flush=True)
+                continue
+            with self._cond:
+                self._queue.append((Future(), time.monotonic(), fn, args, {}))
+                self._cond.notify()
+        if payloads:
+            with self._lock:
+                self.replayed += len(payloads)
+            print(f"♻️ [Lane:{self.name}] Replayed {len(payloads)} job(s) from backlog", flush=True)
+            self._ensure_worker()
+        return len(payloads)
+
+    def _worker_loop(self):
+        while True:
+            future, enqueued_at, fn, args, kwargs = self._next_job()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            lock_fd = self._acquire_process_lock()
+            started = time.monotonic()
+            self.busy = True
+            try:
+                future.set_result(fn(*args, **kwargs))
+                ok = True
+            except Exception as e:
+                future.set_exception(e)
+                ok = False
+            finally:
+                self.busy = False
+                if lock_fd is not None:
+                    os.close(lock_fd)
+            finished = time.monotonic()
+
+            with self._lock:
+                wait = started - enqueued_at
+                service = finished - started
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+                self.service_total += service
+                self.service_max = max(self.service_max, service)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+            # Room just opened up: pull spilled jobs back in order
+            if self.backlog is not None:
+                self.replay_backlog()
+
+    def _acquire_process_lock(self):
+        """Blocking cross-process lock (closing the fd releases it)"""
+        if not self.lock_path:
+            return None
+        try:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            return fd
+        except OSError as e:
+            print(f"⚠️ [Lane:{self.name}] Cross-process lock unavailable: {e}", flush=True)
+            return None
+
+    def stats(self):
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                'depth': len(self._queue),
+                'max_depth': self.max_depth,
+                'policy': self.policy,
+                'busy': self.busy,
+                'completed': self.completed,
+                'failed': self.failed,
+                'wait_avg_ms': round(self.wait_total / done * 1000, 1) if done else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 1),
+                'service_avg_ms': round(self.service_total / done * 1000, 1) if done else 0.0,
+                'service_max_ms': round(self.service_max * 1000, 1),
+                'backlog': self.backlog.backlog_count(self.name) if self.backlog is not None else 0,
+                'admission': {
+                    'admitted': self.admitted,
+                    'rejected': self.rejected,
+                    'dropped': self.dropped,
+                    'spilled': self.spilled,
+                    'replayed': self.replayed
+                }
+            }
+
+
+class AgentLaneRouter:
+    """Route work to the lane of its target agent (lanes for unknown names are created on demand)
+
+    limits maps agent name -> (max_depth, policy) and overrides the
+    router-wide max_depth/policy defaults.
+    """
+
+    def __init__(self, agent_names=(), lock_dir=None, max_depth=0, policy='reject',
+                 limits=None, backlog=None, restore_fn=None):
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self.lock_dir = lock_dir
+        self.max_depth = max_depth
+        self.policy = policy
+        self.limits = limits or {}
+        self.backlog = backlog
+        self.restore_fn = restore_fn
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        for name in agent_names:
+            self._lanes[name] = self._new_lane(name)
+
+    def _new_lane(self, agent_name):
+        max_depth, policy = self.limits.get(agent_name, (self.max_depth, self.policy))
+        return AgentLane(agent_name, self.lock_dir, max_depth=max_depth, policy=policy,
+                         backlog=self.backlog, restore_fn=self.restore_fn)
+
+    def lane(self, agent_name):
+        with self._lock:
+            lane = self._lanes.get(agent_name)
+            if lane is None:
+                lane = self._lanes[agent_name] = self._new_lane(agent_name)
+            return lane
+
+    def submit(self, agent_name, fn, *args, **kwargs):
+        """Queue work on agent's lane, returns Future (raises LaneSaturated when refused)"""
+        return self.lane(agent_name).submit(fn, *args, **kwargs)
+
+    def run(self, agent_name, fn, *args, **kwargs):
+        """Queue work on agent's lane and block until it has been executed"""
+        return self.submit(agent_name, fn, *args, **kwargs).result()
+
+    def replay_backlogs(self):
+        """Resume jobs spilled before a restart (or by another worker process)"""
+        with self._lock:
+            lanes = list(self._lanes.values())
+        return sum(lane.replay_backlog() for lane in lanes)
+
+    def stats(self):
+        with self._lock:
+            lanes = dict(self._lanes)
+        return {name: lane.stats() for name, lane in lanes.items()}
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# agent_output.py
+# Per-Agent append-only output log with byte offsets, fed by the agent transport's output stream
+# (tmux control-mode %output or the PTY reader): "what did the Agent print since X" without capture-pane
+
+import re
+import threading
+
+_ANSI_RE = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]')
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+
+def strip_terminal(text):
+    """Plain text of raw terminal output: escape sequences removed, CR/LF folded to newlines"""
+    text = _ANSI_RE.sub('', text).replace('\r\n', '\n').replace('\r', '\n')
+    return _CONTROL_RE.sub('', text)
+
+
+class AgentOutputLog:
+    """Append-only byte log of one Agent's terminal output
+
+    Offsets count every byte ever appended, so they only grow; the log keeps
+    the newest max_bytes in memory and older bytes are forgotten
+    (read_since reports truncated=True when asked for them).
+    """
+
+    def __init__(self, max_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._start = 0               # offset of _buffer[0]
+        self.injection_offset = 0     # end offset just before the last prompt's Enter
+
+    @property
+    def start_offset(self):
+        """Oldest offset still held in memory"""
+        with self._lock:
+            return self._start
+
+    @property
+    def end_offset(self):
+        with self._lock:
+            return self._start + len(self._buffer)
+
+    def append(self, data):
+        with self._lock:
+            self._buffer += data
+            overflow = len(self._buffer) - self.max_bytes
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._start += overflow
+
+    def read_since(self, offset):
+        """(bytes appended since offset, current end offset, truncated)"""
+        with self._lock:
+            end = self._start + len(self._buffer)
+            truncated = offset < self._start
+            begin = max(offset, self._start) - self._start
+            return bytes(self._buffer[begin:]), end, truncated
+
+    def mark_injection(self):
+        self.injection_offset = self.end_offset
+        return self.injection_offset
+
+
+class AgentOutputLogs:
+    """AgentOutputLog per Agent, plus the text view used by the server"""
+
+    def __init__(self, agent_names, max_bytes=1024 * 1024):
+        self.logs = {name: AgentOutputLog(max_bytes) for name in agent_names}
+
+    def feed(self, agent_name, data):
+        log = self.logs.get(agent_name)
+        if log is not None:
+            log.append(data)
+
+    def end_offset(self, agent_name):
+        log = self.logs.get(agent_name)
+        return log.end_offset if log is not None else 0
+
+    def mark_injection(self, agent_name):
+        """Remember the current end of the Agent's output (called right before the prompt's Enter is pressed)"""
+        log = self.logs.get(agent_name)
+        return log.mark_injection() if log is not None else 0
+
+    def read_since(self, agent_name, offset, raw=False):
+        """Output of agent_name after offset: (text, new offset, truncated)
+
+        Pass the returned offset to the next call to read incrementally.
+        Text is stripped of terminal escape sequences unless raw=True.
+        """
+        log = self.logs.get(agent_name)
+        if log is None:
+            return '', offset, False
+        data, end, truncated = log.read_since(offset)
+        text = data.decode('utf-8', errors='replace')
+        return (text if raw else strip_terminal(text)), end, truncated
+
+    def since_last_injection(self, agent_name, raw=False):
+        """Everything the Agent printed since the Enter of its last submitted prompt"""
+        log = self.logs.get(agent_name)
+        if log is None:
+            return '', 0, False
+        return self.read_since(agent_name, log.injection_offset, raw)
+
+    def stats(self):
+        return {
+            name: {'end_offset': log.end_offset, 'injection_offset': log.injection_offset,
+                   'buffered': log.end_offset - log.start_offset}
+            for name, log in self.logs.items()
+        }
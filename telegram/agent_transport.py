@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# agent_transport.py
+# Pluggable agent transport: how the server types into, reads from and checks the agent CLIs
+#   TmuxTransport - agents live in tmux windows (attachable, the default)
+#   PtyTransport  - agents run under pseudo-terminals owned by the server process itself
+
+import codecs
+import fcntl
+import os
+import re
+import selectors
+import signal
+import struct
+import subprocess
+import termios
+import threading
+import time
+
+from window_cache import SHELL_COMMANDS
+
+_OUTPUT_ESCAPE_RE = re.compile(rb'\\([0-7]{3})')
+
+
+class AgentTransport:
+    """Interface every backend implements; agents are addressed by their configured name"""
+
+    name = 'base'
+
+    def exists(self, agent_name):
+        """True when the agent's terminal is alive"""
+        raise NotImplementedError
+
+    def type_text(self, agent_name, text, mode='keys'):
+        """Put text into the agent's input: 'keys' (typed) or 'buffer' (one bracketed paste)"""
+        raise NotImplementedError
+
+    def send_key(self, agent_name, key):
+        """Send one named key (tmux key names: 'Enter', 'C-c', 'Escape', ...)"""
+        raise NotImplementedError
+
+    def capture(self, agent_name):
+        """Visible screen text of the agent's terminal, or None when unavailable"""
+        raise NotImplementedError
+
+    def probe(self, agent_names):
+        """(backend_running, {agent name: info or None}) for status displays
+
+        info has pane_pid, command, idle_s, dead and cli_exited.
+        """
+        raise NotImplementedError
+
+    def restart_cli(self, agent_name, start_cmd):
+        """Stop the agent CLI and start start_cmd again in the agent's home"""
+        raise NotImplementedError
+
+    def add_output_listener(self, fn):
+        """Register fn(agent_name, data_bytes), called with everything the Agent CLIs print"""
+        raise NotImplementedError
+
+    def start(self):
+        """Called once by the process that owns the agents"""
+
+    def stats(self):
+        return {'backend': self.name}
+
+
+# ==========================================
+# tmux
+# ==========================================
+
+class TmuxTransport(AgentTransport):
+    """Agents in tmux windows, driven over the control-mode client (see tmux_control.py)"""
+
+    name = 'tmux'
+
+    def __init__(self, client, window_cache):
+        self.client = client
+        self.window_cache = window_cache
+
+    def target(self, agent_name):
+        return self.window_cache.target(agent_name)
+
+    def add_output_listener(self, fn):
+        # %output %<pane id> <data, with bytes below 0x20 and backslash as \ooo>
+        def _on_notification(line):
+            parts = line.split(b' ', 2)
+            if parts[0] != b'%output' or len(parts) < 3:
+                return
+            agent_name = self.window_cache.agent_for_pane(parts[1].decode())
+            data = parts[2]
+            if agent_name is not None:
+                fn(agent_name, _OUTPUT_ESCAPE_RE.sub(lambda m: bytes([int(m.group(1), 8)]), data))
+        self.client.add_listener(_on_notification)
+
+    def exists(self, agent_name):
+        return self.window_cache.exists(agent_name)
+
+    def type_text(self, agent_name, text, mode='keys'):
+        if mode == 'buffer':
+            self.client.paste_text(self.target(agent_name), text)
+        else:
+            self.client.send_literal(self.target(agent_name), text)
+
+    def send_key(self, agent_name, key):
+        self.client.run(['send-keys', '-t', self.target(agent_name), key], check=True)
+
+    def capture(self, agent_name):
+        result = self.client.run(['capture-pane', '-p', '-t', self.target(agent_name)], timeout=5)
+        return result.stdout if result.returncode == 0 else None
+
+    def probe(self, agent_names):
+        return self.window_cache.probe(agent_names)
+
+    def restart_cli(self, agent_name, start_cmd):
+        # Quit the CLI, make sure the pane is back at its shell, then start it again
+        for keys, pause in (('/quit', 1), ('Enter', 3), ('pwd', 1), ('Enter', 2), (start_cmd, 1), ('Enter', 0)):
+            if keys == 'Enter':
+                self.send_key(agent_name, 'Enter')
+            else:
+                self.client.send_literal(self.target(agent_name), keys)
+            time.sleep(pause)
+
+
+# ==========================================
+# Native PTY
+# ==========================================
+
+_KEYS = {
+    'Enter': b'\r', 'C-c': b'\x03', 'C-d': b'\x04', 'Escape': b'\x1b', 'Tab': b'\t', 'BSpace': b'\x7f',
+    'Up': b'\x1b[A', 'Down': b'\x1b[B', 'Right': b'\x1b[C', 'Left': b'\x1b[D',
+}
+_CSI_RE = re.compile(r'\x1b\[([?>=]?)([0-9;]*)([ -/]*)([@-~])')
+_OSC_RE = re.compile(r'\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)')
+_BRACKETED_PASTE_ON = b'\x1b[?2004h'
+_BRACKETED_PASTE_OFF = b'\x1b[?2004l'
+
+
+class TerminalScreen:
+    """Minimal line-oriented terminal model, enough to read a CLI's screen like capture-pane -p
+
+    Understands printable text, CR/LF/BS, cursor movement (CUU/CUD/CUF/CUB/CUP/CHA/VPA),
+    erase in line/display and the alternate screen; colours and other modes are ignored.
+    """
+
+    def __init__(self, rows=50, cols=200):
+        self.rows = rows
+        self.cols = cols
+        self.reset()
+
+    def reset(self):
+        self.lines = [[] for _ in range(self.rows)]
+        self.row = 0
+        self.col = 0
+
+    def _newline(self):
+        self.row += 1
+        if self.row >= self.rows:
+            self.lines.pop(0)
+            self.lines.append([])
+            self.row = self.rows - 1
+
+    def _put(self, ch):
+        if self.col >= self.cols:
+            self.col = 0
+            self._newline()
+        line = self.lines[self.row]
+        if len(line) < self.col:
+            line.extend(' ' * (self.col - len(line)))
+        if self.col < len(line):
+            line[self.col] = ch
+        else:
+            line.append(ch)
+        self.col += 1
+
+    def feed(self, text):
+        text = _OSC_RE.sub('', text)
+        pos = 0
+        for match in _CSI_RE.finditer(text):
+            self._feed_plain(text[pos:match.start()])
+            self._csi(match.group(1), match.group(2), match.group(4))
+            pos = match.end()
+        self._feed_plain(text[pos:])
+
+    def _feed_plain(self, text):
+        for ch in text:
+            if ch == '\r':
+                self.col = 0
+            elif ch == '\n':
+                self._newline()
+            elif ch == '\b':
+                self.col = max(0, self.col - 1)
+            elif ch == '\t':
+                self.col = min(self.cols - 1, (self.col // 8 + 1) * 8)
+            elif ch >= ' ' and ch != '\x7f':
+                self._put(ch)
+
+    def _csi(self, private, params, final):
+        values = [int(p) if p.isdigit() else 0 for p in params.split(';')] if params else []
+        n = values[0] if values and values[0] else 1
+        if private == '?':
+            if final in 'hl' and params in ('1049', '47', '1047'):
+                self.reset()
+            return
+        if final == 'A':
+            self.row = max(0, self.row - n)
+        elif final == 'B':
+            self.row = min(self.rows - 1, self.row + n)
+        elif final == 'C':
+            self.col = min(self.cols - 1, self.col + n)
+        elif final == 'D':
+            self.col = max(0, self.col - n)
+        elif final in 'Hf':
+            self.row = min(self.rows - 1, max(0, (values[0] if values else 1) - 1))
+            self.col = min(self.cols - 1, max(0, (values[1] if len(values) > 1 else 1) - 1))
+        elif final == 'G':
+            self.col = min(self.cols - 1, n - 1)
+        elif final == 'd':
+            self.row = min(self.rows - 1, n - 1)
+        elif final == 'K':
+            mode = values[0] if values else 0
+            line = self.lines[self.row]
+            if mode == 0:
+                del line[self.col:]
+            elif mode == 1:
+                line[:self.col] = ' ' * min(self.col, len(line))
+            else:
+                line.clear()
+        elif final == 'J':
+            mode = values[0] if values else 0
+            if mode == 0:
+                del self.lines[self.row][self.col:]
+                for i in range(self.row + 1, self.rows):
+                    self.lines[i] = []
+            elif mode == 1:
+                for i in range(self.row):
+                    self.lines[i] = []
+            else:
+                self.lines = [[] for _ in range(self.rows)]
+
+    def text(self):
+        return '\n'.join(''.join(line).rstrip() for line in self.lines) + '\n'
+
+
+class PtyAgent:
+    """One agent CLI running under a pseudo-terminal"""
+
+    def __init__(self, name, start_cmd, cwd, rows=50, cols=200):
+        self.name = name
+        self.start_cmd = start_cmd
+        self.cwd = cwd
+        self.rows = rows
+        self.cols = cols
+        self.proc = None
+        self.master_fd = None
+        self.screen = TerminalScreen(rows, cols)
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.bracketed_paste = False
+        self.last_output = time.time()
+        self.bytes_out = 0
+        self.lock = threading.Lock()
+
+    def spawn(self):
+        master_fd, slave_fd = os.openpty()
+        fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack('HHHH', self.rows, self.cols, 0, 0))
+        env = dict(os.environ, TERM='xterm-256color', COLUMNS=str(self.cols), LINES=str(self.rows))
+
+        def _take_controlling_tty():
+            fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+        os.makedirs(self.cwd, exist_ok=True)
+        # exec: the CLI itself (not sh) is the session leader and foreground process
+        self.proc = subprocess.Popen(
+            f'exec {self.start_cmd}', shell=True, cwd=self.cwd, env=env,
+            stdin=slave_fd, stdout=slave_fd, stderr=slave_fd,
+            start_new_session=True, preexec_fn=_take_controlling_tty
+        )
+        os.close(slave_fd)
+        os.set_blocking(master_fd, False)
+        with self.lock:
+            self.master_fd = master_fd
+            self.screen.reset()
+            self.bracketed_paste = False
+        print(f"🖥️ [PTY] Started [{self.name}] (pid {self.proc.pid}): {self.start_cmd}", flush=True)
+        return master_fd
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def on_output(self, data):
+        with self.lock:
+            if _BRACKETED_PASTE_ON in data:
+                self.bracketed_paste = data.rfind(_BRACKETED_PASTE_ON) > data.rfind(_BRACKETED_PASTE_OFF)
+            elif _BRACKETED_PASTE_OFF in data:
+                self.bracketed_paste = False
+            self.screen.feed(self.decoder.decode(data))
+            self.last_output = time.time()
+            self.bytes_out += len(data)
+
+    def write(self, data):
+        """Blocking write of all bytes (the master fd is non-blocking for reads)"""
+        fd = self.master_fd
+        if fd is None:
+            raise OSError(f"PTY of [{self.name}] is closed")
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(fd, view)
+                view = view[written:]
+            except BlockingIOError:
+                time.sleep(0.005)
+
+    def foreground_command(self):
+        """Name of the process in the terminal's foreground (like tmux pane_current_command)"""
+        try:
+            pgid = os.tcgetpgrp(self.master_fd)
+            with open(f'/proc/{pgid}/comm', 'r') as f:
+                return f.read().strip()
+        except (OSError, TypeError):
+            return ''
+
+    def stop(self, timeout=5):
+        if self.alive:
+            try:
+                os.killpg(self.proc.pid, signal.SIGTERM)
+                self.proc.wait(timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                os.killpg(self.proc.pid, signal.SIGKILL)
+
+
+class PtyTransport(AgentTransport):
+    """Agents spawned by the server under pseudo-terminals, no tmux involved
+
+    One supervisor thread waits on every master fd with a selector, so
+    output is consumed as soon as it is produced (no polling) and kept in a
+    small screen model for capture(). Output listeners registered with
+    add_output_listener(fn(agent_name, data)) receive the raw bytes.
+    The agents belong to this process: they stop when the server stops, and
+    only the process that called start() can reach them.
+    """
+
+    name = 'pty'
+
+    def __init__(self, agents, home_dir, start_cmds, rows=50, cols=200):
+        self.home_dir = home_dir
+        self.agents = {
+            a['name']: PtyAgent(a['name'], start_cmds[a['name']], os.path.join(home_dir, a['name']), rows, cols)
+            for a in agents
+        }
+        self._selector = selectors.DefaultSelector()
+        self._fd_agents = {}    # master fd -> (PtyAgent, the Popen that fd belongs to)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._listeners = []
+
+    def add_output_listener(self, fn):
+        self._listeners.append(fn)
+
+    def start(self):
+        for agent in self.agents.values():
+            self._spawn(agent)
+        self._thread = threading.Thread(target=self._read_loop, name='pty-supervisor', daemon=True)
+        self._thread.start()
+
+    def _spawn(self, agent):
+        fd = agent.spawn()
+        with self._lock:
+            self._fd_agents[fd] = (agent, agent.proc)
+            self._selector.register(fd, selectors.EVENT_READ)
+
+    def _close_fd(self, fd):
+        with self._lock:
+            agent, _ = self._fd_agents.pop(fd, (None, None))
+            try:
+                self._selector.unregister(fd)
+            except (KeyError, ValueError):
+                pass
+        if agent is not None and agent.master_fd == fd:
+            agent.master_fd = None
+        os.close(fd)
+
+    def _read_loop(self):
+        while True:
+            with self._lock:
+                has_fds = bool(self._fd_agents)
+            if not has_fds:
+                time.sleep(0.5)
+                continue
+            for key, _ in self._selector.select(timeout=1):
+                fd = key.fd
+                agent, proc = self._fd_agents.get(fd, (None, None))
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b''
+                if not data:
+                    # EIO/EOF: the CLI exited
+                    self._close_fd(fd)
+                    if agent is not None:
+                        # Wait on this fd's own process: after restart_cli, agent.proc is the new CLI
+                        try:
+                            code = proc.wait(timeout=1)
+                        except subprocess.TimeoutExpired:
+                            code = None
+                        print(f"⚠️ [PTY] [{agent.name}] exited (pid {proc.pid}, code {code})", flush=True)
+                    continue
+                if agent is None or agent.proc is not proc:
+                    continue    # Leftover output of a replaced CLI
+                agent.on_output(data)
+                for listener in self._listeners:
+                    try:
+                        listener(agent.name, data)
+                    except Exception as e:
+                        print(f"⚠️ [PTY] Listener error: {e}", flush=True)
+
+    def _agent(self, agent_name):
+        agent = self.agents.get(agent_name)
+        if agent is None:
+            raise KeyError(f"Unknown agent '{agent_name}'")
+        return agent
+
+    def exists(self, agent_name):
+        agent = self.agents.get(agent_name)
+        return agent is not None and agent.alive and agent.master_fd is not None
+
+    def type_text(self, agent_name, text, mode='keys'):
+        agent = self._agent(agent_name)
+        data = text.encode('utf-8')
+        if mode == 'buffer':
+            # Same as tmux paste-buffer: newlines become CR, bracketed when the CLI asked for it
+            data = data.replace(b'\r\n', b'\r').replace(b'\n', b'\r')
+            if agent.bracketed_paste:
+                data = b'\x1b[200~' + data + b'\x1b[201~'
+        agent.write(data)
+
+    def send_key(self, agent_name, key):
+        self._agent(agent_name).write(_KEYS.get(key, key.encode('utf-8')))
+
+    def capture(self, agent_name):
+        agent = self.agents.get(agent_name)
+        if agent is None or agent.master_fd is None:
+            return None
+        with agent.lock:
+            return agent.screen.text()
+
+    def probe(self, agent_names):
+        now = time.time()
+        agents = {}
+        for agent_name in agent_names:
+            agent = self.agents.get(agent_name)
+            if agent is None or agent.proc is None:
+                agents[agent_name] = None
+                continue
+            command = agent.foreground_command() if agent.alive else ''
+            agents[agent_name] = {
+                'name': agent_name,
+                'pane_pid': agent.proc.pid,
+                'command': command,
+                'idle_s': int(now - agent.last_output),
+                'dead': not agent.alive,
+                'cli_exited': command in SHELL_COMMANDS
+            }
+        return True, agents
+
+    def restart_cli(self, agent_name, start_cmd):
+        agent = self._agent(agent_name)
+        agent.stop()
+        agent.start_cmd = start_cmd or agent.start_cmd
+        self._spawn(agent)
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'agents': {
+                name: {'pid': a.proc.pid if a.proc else None, 'alive': a.alive, 'bytes_out': a.bytes_out}
+                for name, a in self.agents.items()
+            }
+        }
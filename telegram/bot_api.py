@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Bot API Client - one pooled keep-alive HTTP client per process for the messenger Bot APIs
+Every call reuses the pooled TLS connections instead of a fresh handshake, has a timeout,
+and retries transient failures (connection errors, 5xx) with jittered exponential backoff.
+Calls addressed to a chat wait in line for per-chat and global token buckets, and 429 answers
+are retried after the server's retry_after.
+The LINE edition ships a reduced copy (pooling, timeouts and retries only, no rate limiting).
+
+Usage:
+    from bot_api import get_client
+    response = get_client().post(url, data=data)
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (5, 30)       # (connect, read) seconds
+RETRY_STATUSES = (500, 502, 503, 504)
+MAX_RATE_LIMIT_RETRIES = 3      # 429 answers retried after retry_after (on top of max_retries)
+MAX_RETRY_AFTER = 60            # Longer server pauses fail the call instead of blocking the caller
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations: reserve() takes a token now and returns the wait
+
+    Tokens may go negative, so concurrent callers are spaced out in arrival
+    order (bursts are smoothed into the rate instead of being rejected).
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Per-chat and global send pacing (Telegram: ~1 msg/s per chat, 20 msg/min per group, 30 msg/s overall)
+
+    acquire(chat_id) blocks until the call may go out; block(key, seconds)
+    pauses one chat, or one chat-less method ('method:getUpdates'), after a 429.
+    block(None, seconds) pauses every call, for flood waits known to be bot-wide.
+    """
+
+    def __init__(self, per_chat_rate=1.0, per_chat_burst=3, group_per_minute=20, global_rate=30.0):
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.group_rate = group_per_minute / 60.0
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chats = {}
+        self._blocked_until = {}
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+        self.rate_limited = 0
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Group and channel ids are negative
+            if str(chat_id).startswith('-'):
+                bucket = TokenBucket(self.group_rate, self.per_chat_burst)
+            else:
+                bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def acquire(self, chat_id):
+        with self._lock:
+            now = time.monotonic()
+            blocked_until = max(self._blocked_until.get(chat_id, 0.0), self._blocked_until.get(None, 0.0))
+            delay = max(self._chat_bucket(chat_id).reserve(now), self.global_bucket.reserve(now),
+                        blocked_until - now)
+            if delay <= 0:
+                return
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            self.throttled += 1
+            self.throttle_seconds += delay
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def wait_unblocked(self, key):
+        """Sleep out a 429 pause of key (and a bot-wide one), without taking a send token"""
+        with self._lock:
+            delay = max(self._blocked_until.get(key, 0.0), self._blocked_until.get(None, 0.0)) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def block(self, key, seconds):
+        with self._lock:
+            self.rate_limited += 1
+            until = time.monotonic() + seconds
+            self._blocked_until[key] = max(self._blocked_until.get(key, 0.0), until)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'throttled': self.throttled,
+                'throttle_seconds': round(self.throttle_seconds, 2),
+                'rate_limited': self.rate_limited
+            }
+
+
+class BotApiClient:
+    """requests.Session with a sized connection pool, default timeouts and retries
+
+    Retried: connection failures (refused, reset, DNS, connect timeout) and
+    5xx answers. Read timeouts are retried for GET only, since a POST that
+    timed out while waiting for the answer may already have been delivered.
+    File uploads are rewound before each retry.
+
+    Calls carrying a chat_id (data, params or json) first pass the rate
+    limiter, then 429 answers pause that chat for retry_after and are sent
+    again; downloads and other calls without chat_id are not paced.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=2, backoff=0.5, pool_size=10, rate_limits=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(**(rate_limits or {}))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """Send a request, returns the response of the last attempt or raises its exception"""
+        retries = self.max_retries if retries is None else retries
+        kwargs['timeout'] = timeout or self.timeout
+        chat_id = self._chat_id(kwargs)
+        # A 429 pauses what caused it: the chat, or for chat-less calls only that API method
+        pause_key = chat_id if chat_id is not None else f"method:{url.rstrip('/').rsplit('/', 1)[-1]}"
+        started = time.monotonic()
+        attempt = 0
+        rate_limit_retries = 0
+        try:
+            while True:
+                if chat_id is not None:
+                    self.limiter.acquire(chat_id)
+                else:
+                    self.limiter.wait_unblocked(pause_key)
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    if response.status_code == 429:
+                        retry_after = self._retry_after(response)
+                        self.limiter.block(pause_key, retry_after)
+                        print(f"⏳ [BotAPI] 429 Too Many Requests ({pause_key}), retry after {retry_after}s",
+                              flush=True)
+                        if rate_limit_retries >= MAX_RATE_LIMIT_RETRIES or retry_after > MAX_RETRY_AFTER:
+                            return response
+                        rate_limit_retries += 1
+                        response.close()
+                        self._rewind(kwargs.get('files'))
+                        continue    # acquire() / wait_unblocked() wait out the pause
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        return response
+                    response.close()
+                except requests.exceptions.ReadTimeout:
+                    if method != 'GET' or attempt >= retries:
+                        self._count_failure()
+                        raise
+                except requests.exceptions.ConnectionError:
+                    if attempt >= retries:
+                        self._count_failure()
+                        raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                # Full jitter, so the workers of a restarting server do not retry in lockstep
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+                self._rewind(kwargs.get('files'))
+        finally:
+            with self._lock:
+                self.calls += 1
+                self.total_ms += (time.monotonic() - started) * 1000
+
+    @staticmethod
+    def _chat_id(kwargs):
+        for key in ('data', 'params', 'json'):
+            payload = kwargs.get(key)
+            if isinstance(payload, dict) and payload.get('chat_id') is not None:
+                return str(payload['chat_id'])
+        return None
+
+    @staticmethod
+    def _retry_after(response):
+        """Pause requested by a 429: Telegram's parameters.retry_after, else the Retry-After header"""
+        try:
+            return float(response.json()['parameters']['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers.get('Retry-After', 1))
+        except ValueError:
+            return 1.0
+
+    def _count_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    @staticmethod
+    def _rewind(files):
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'avg_ms': round(self.total_ms / self.calls, 1) if self.calls else 0,
+                'send_queue': self.limiter.stats()
+            }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client(**settings):
+    """Process-wide client; settings (BotApiClient arguments) apply when it is first created
+
+    A forked worker gets its own client instead of sharing the parent's sockets.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = BotApiClient(**settings)
+            _client_pid = os.getpid()
+        return _client
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# burst_coalescer.py
+# Per-agent debounce window: rapid consecutive messages are merged into one injection
+
+import threading
+import time
+
+
+class BurstCoalescer:
+    """Collect messages per agent and flush them together once the agent's window is quiet
+
+    Each new message restarts the agent's debounce window (window seconds),
+    but a burst is never held longer than max_delay seconds after its first
+    message. flush_fn(agent_name, messages) receives the buffered messages in
+    arrival order. A window of 0 disables coalescing (flush immediately);
+    add() can override the default window per call (per-agent settings).
+    """
+
+    def __init__(self, flush_fn, window=1.5, max_delay=5.0):
+        self.flush_fn = flush_fn
+        self.window = float(window)
+        self.max_delay = max(float(max_delay), self.window)
+        self._lock = threading.Lock()
+        self._pending = {}   # agent_name -> {'messages': [...], 'first_at': t, 'timer': Timer}
+        self.bursts = 0
+        self.merged_messages = 0
+
+    def add(self, agent_name, message, window=None):
+        window = self.window if window is None else float(window)
+        if window <= 0:
+            self._flush_messages(agent_name, [message])
+            return
+
+        with self._lock:
+            entry = self._pending.get(agent_name)
+            now = time.monotonic()
+            if entry is None:
+                entry = self._pending[agent_name] = {'messages': [], 'first_at': now, 'timer': None}
+            else:
+                entry['timer'].cancel()
+            entry['messages'].append(message)
+
+            delay = min(window, entry['first_at'] + max(self.max_delay, window) - now)
+            timer = threading.Timer(max(delay, 0), self.flush, args=(agent_name,))
+            timer.daemon = True
+            entry['timer'] = timer
+            timer.start()
+
+    def flush(self, agent_name):
+        """Flush agent's pending burst now (no-op when nothing is buffered)"""
+        with self._lock:
+            entry = self._pending.pop(agent_name, None)
+            if entry is None:
+                return
+            entry['timer'].cancel()
+        self._flush_messages(agent_name, entry['messages'])
+
+    def _flush_messages(self, agent_name, messages):
+        with self._lock:
+            self.bursts += 1
+            self.merged_messages += len(messages)
+        try:
+            self.flush_fn(agent_name, messages)
+        except Exception as e:
+            print(f"❌ [Coalescer] Flush to [{agent_name}] failed: {e}", flush=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'window_s': self.window,
+                'pending': {name: len(entry['messages']) for name, entry in self._pending.items()},
+                'bursts': self.bursts,
+                'messages': self.merged_messages,
+                'turns_saved': self.merged_messages - self.bursts
+            }
@@ -2,8 +2,8 @@
 # Supports three-layer stacking: Base YAML -> Instance YAML -> Environment
 import os
 import sys
-import yaml
 import json
+import marshal
 from copy import deepcopy
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -44,9 +44,12 @@ if INSTANCE_NAME:
 CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
 INSTANCE_CONFIG_PATH = os.path.join(BASE_DIR, f"config.{INSTANCE_NAME}.yaml")
 SCHEDULER_YAML_PATH = os.path.join(BASE_DIR, "scheduler.yaml")
+# Precompiled snapshot of the merged YAML (written at service start, valid while the YAML mtimes match)
+SNAPSHOT_PATH = os.path.join(BASE_DIR, f".config_snapshot.{INSTANCE_NAME}" if INSTANCE_NAME else ".config_snapshot")
 
 def load_yaml(path):
     if os.path.exists(path):
+        import yaml     # Imported on demand: CLI processes running from the snapshot never need it
         with open(path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f)
     return {}
@@ -61,12 +64,57 @@ def _deep_merge(base, override):
             result[key] = deepcopy(value)
     return result
 
-_config = load_yaml(CONFIG_PATH)
-_instance_config = load_yaml(INSTANCE_CONFIG_PATH)
+def _snapshot_sources():
+    """mtime of every YAML file the merged configuration is built from (None if absent)"""
+    sources = {}
+    for path in (CONFIG_PATH, INSTANCE_CONFIG_PATH):
+        try:
+            sources[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            sources[path] = None
+    return sources
 
-# Merge configurations (instance config takes priority, support recursive deep merge)
-if _instance_config:
-    _config = _deep_merge(_config, _instance_config)
+def _load_snapshot():
+    """Merged configuration from SNAPSHOT_PATH, None if missing or stale"""
+    try:
+        with open(SNAPSHOT_PATH, "rb") as f:
+            snapshot = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("sources") != _snapshot_sources():
+        return None
+    return snapshot.get("config")
+
+def _load_yaml_config():
+    config = load_yaml(CONFIG_PATH) or {}
+    instance_config = load_yaml(INSTANCE_CONFIG_PATH)
+    # Merge configurations (instance config takes priority, support recursive deep merge)
+    if instance_config:
+        config = _deep_merge(config, instance_config)
+    return config
+
+def write_config_snapshot():
+    """Parse the YAML files and write the merged result to SNAPSHOT_PATH (called at service start)"""
+    sources = _snapshot_sources()
+    config = _load_yaml_config()
+    tmp_path = f"{SNAPSHOT_PATH}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump({"sources": sources, "config": config}, f)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+        return True
+    except (OSError, ValueError) as e:
+        # ValueError: a YAML value marshal cannot store (e.g. a date), the YAML path keeps working
+        sys.stderr.write(f"⚠️  Unable to write config snapshot: {e}\n")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+
+_config = _load_snapshot()
+if _config is None:
+    _config = _load_yaml_config()
 
 # 4. Variable mapping and environment variable override
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
@@ -81,20 +129,74 @@ except Exception:
 FLASK_HOST = os.environ.get("FLASK_HOST", _config.get("server", {}).get("host", "127.0.0.1"))
 # 【Port configuration unification】Port read from config.yaml, environment variable reserved for emergency override
 FLASK_PORT = int(os.environ.get("FLASK_PORT", _config.get("server", {}).get("port", 5000)))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", _config.get("server", {}).get("workers", 1)))
+AGENT_TRANSPORT = os.environ.get("AGENT_TRANSPORT", _config.get("server", {}).get("agent_transport", "tmux"))
 NGROK_API_PORT = int(os.environ.get("NGROK_API_PORT", _config.get("server", {}).get("ngrok_api_port", 4040)))
 
 AGENTS = _config.get("agents", [])
 DEFAULT_ACTIVE_AGENT = _config.get("default_active_agent", "")
 TMUX_SESSION_NAME = os.environ.get("TMUX_SESSION_NAME", _config.get("tmux", {}).get("session_name", "chat_agent"))
 TMUX_WORKING_DIR = _config.get("tmux", {}).get("working_dir", "")
+TMUX_INJECTION_MODE = _config.get("tmux", {}).get("injection_mode", "auto")
+TMUX_BUFFER_THRESHOLD = int(_config.get("tmux", {}).get("buffer_threshold", 500))
 TELEGRAM_API_BASE_URL = _config.get("telegram", {}).get("api_base_url", "https://api.telegram.org/bot")
 TELEGRAM_WEBHOOK_PATH = os.environ.get("TELEGRAM_WEBHOOK_PATH", _config.get("telegram", {}).get("webhook_path", "/webhook"))
+TELEGRAM_FILE_BASE_URL = _config.get("telegram", {}).get("file_base_url", "https://api.telegram.org/file/bot")
+TELEGRAM_INGESTION_MODE = os.environ.get("TELEGRAM_INGESTION_MODE", _config.get("telegram", {}).get("ingestion_mode", "webhook"))
+TELEGRAM_POLL_TIMEOUT = int(_config.get("telegram", {}).get("poll_timeout", 30))
+_bot_api_config = _config.get("bot_api", {})
+BOT_API_TIMEOUT = (float(_bot_api_config.get("connect_timeout", 5)), float(_bot_api_config.get("read_timeout", 30)))
+BOT_API_MAX_RETRIES = int(_bot_api_config.get("max_retries", 2))
+BOT_API_POOL_SIZE = int(_bot_api_config.get("pool_size", 10))
+BOT_API_RATE_LIMITS = {
+    'per_chat_rate': float(_bot_api_config.get("per_chat_rate", 1)),
+    'per_chat_burst': int(_bot_api_config.get("per_chat_burst", 3)),
+    'group_per_minute': float(_bot_api_config.get("group_per_minute", 20)),
+    'global_rate': float(_bot_api_config.get("global_rate", 30))
+}
 DEFAULT_CLEANUP_POLICY = _config.get("default_cleanup_policy", {"images_retention_days": 7})
 TEMP_IMAGE_DIR_NAME = _config.get("image_processing", {}).get("temp_dir_name", "images_temp")
+MEDIA_GROUP_WINDOW = float(_config.get("image_processing", {}).get("media_group_window", 1.0))
+IMAGE_DOWNLOAD_WORKERS = int(_config.get("image_processing", {}).get("download_workers", 4))
 CUSTOM_MENU = _config.get("menu", [])
 
-# Read schedule configuration from separate scheduler.yaml
-_scheduler_config = load_yaml(SCHEDULER_YAML_PATH)
-SCHEDULER_CONF = _scheduler_config.get("scheduler", [])
+# Update dispatch (acknowledge-then-process work queue)
+_dispatch_config = _config.get("dispatch", {})
+DISPATCH_WORKERS = int(_dispatch_config.get("workers", 4))
+DISPATCH_QUEUE_SIZE = int(_dispatch_config.get("queue_size", 1000))
+DEDUP_WINDOW = int(_dispatch_config.get("dedup_window", 1000))
+DEDUP_SNAPSHOT = bool(_dispatch_config.get("dedup_snapshot", True))
+COALESCE_WINDOW = float(_dispatch_config.get("coalesce_window", 0))
+COALESCE_MAX_DELAY = float(_dispatch_config.get("coalesce_max_delay", 5))
+SPILL_THRESHOLD = int(_dispatch_config.get("spill_threshold", 4000))
+INBOX_DIR_NAME = _dispatch_config.get("inbox_dir_name", "inbox")
+AGENT_QUEUE_MAX = int(_dispatch_config.get("agent_queue_max", 20))
+AGENT_QUEUE_POLICY = _dispatch_config.get("agent_queue_policy", "reject")
+CONTROL_WORKERS = int(_dispatch_config.get("control_workers", 2))
+CONTROL_BUDGET_MS = float(_dispatch_config.get("control_budget_ms", 100))
+OUTPUT_LOG_BYTES = int(_dispatch_config.get("output_log_bytes", 1024 * 1024))
+_injection_socket = _dispatch_config.get("injection_socket", ".injection.sock")
+INJECTION_SOCKET = os.path.join(BASE_DIR, _injection_socket) if _injection_socket else ""
+
+# Live tail of Agent output into one edited Telegram message (opt-in, /live on|off)
+_live_tail_config = _config.get("live_tail", {})
+LIVE_TAIL_ENABLED = bool(_live_tail_config.get("enabled", False))
+LIVE_TAIL_INTERVAL = float(_live_tail_config.get("interval", 1.5))
+LIVE_TAIL_LINES = int(_live_tail_config.get("lines", 20))
+LIVE_TAIL_QUIET_SECONDS = float(_live_tail_config.get("quiet_seconds", 3))
+LIVE_TAIL_MAX_DURATION = float(_live_tail_config.get("max_duration", 600))
+
+# Turn-completion detection and latency histograms
+_turn_metrics_config = _config.get("turn_metrics", {})
+TURN_SETTLE_SECONDS = float(_turn_metrics_config.get("settle_seconds", 1.0))
+TURN_MAX_SECONDS = float(_turn_metrics_config.get("max_turn_seconds", 1800))
 
 COLLABORATION_GROUPS = _config.get("collaboration_groups", [])
+
+def __getattr__(name):
+    """SCHEDULER_CONF is read from the separate scheduler.yaml on first access (only the server needs it)"""
+    if name == "SCHEDULER_CONF":
+        global SCHEDULER_CONF
+        SCHEDULER_CONF = (load_yaml(SCHEDULER_YAML_PATH) or {}).get("scheduler", [])
+        return SCHEDULER_CONF
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# control_lane.py
+# High-priority path for control commands (/interrupt, /status, /capture): skips the update queue,
+# the burst coalescer and the per-agent lanes, so Ctrl+C never waits behind the work it should stop
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Control command -> accepted spellings (first word of the message, case-insensitive)
+CONTROL_COMMANDS = {
+    '/interrupt': ('/interrupt', '/stop', '停止', '中断'),
+    '/status': ('/status', '状态', 'status'),
+    '/capture': ('/capture',),
+}
+
+_ALIASES = {alias: command for command, aliases in CONTROL_COMMANDS.items() for alias in aliases}
+
+
+def classify_control_command(text):
+    """Return the canonical control command for a message text, or None for everything else"""
+    if not text:
+        return None
+    words = text.strip().split()
+    if not words:
+        return None
+    command = _ALIASES.get(words[0].lower())
+    # /status and /interrupt take no arguments; keep '/status xyz' on the normal path
+    if command and command != '/capture' and len(words) > 1:
+        return None
+    return command
+
+
+class ControlLane:
+    """Dedicated executor for control commands with a latency budget
+
+    handler(command, text, received_at, target) runs on one of the lane's own
+    threads; target is whatever the caller resolved at ingestion (e.g. the
+    active Agent), so a command never acts on state that changed after it. Handlers call mark_action(command, received_at) right after the
+    time-critical step (e.g. send-keys C-c); the elapsed time since ingestion
+    is checked against budget_ms and exported by stats().
+    """
+
+    def __init__(self, handler, workers=2, budget_ms=100):
+        self.handler = handler
+        self.budget_ms = float(budget_ms)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='control')
+        self._lock = threading.Lock()
+        self._latency = {}   # command -> {'count', 'total_ms', 'max_ms', 'over_budget'}
+
+    def submit(self, command, text, received_at=None, target=None):
+        received_at = received_at or time.monotonic()
+        self._executor.submit(self._run, command, text, received_at, target)
+
+    def _run(self, command, text, received_at, target):
+        try:
+            self.handler(command, text, received_at, target)
+        except Exception as e:
+            print(f"❌ [Control] {command} failed: {e}", flush=True)
+
+    def mark_action(self, command, received_at):
+        """Record ingestion -> action latency of a control command"""
+        elapsed_ms = (time.monotonic() - received_at) * 1000
+        with self._lock:
+            entry = self._latency.setdefault(command, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'over_budget': 0})
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            if elapsed_ms > self.budget_ms:
+                entry['over_budget'] += 1
+        if elapsed_ms > self.budget_ms:
+            print(f"⚠️ [Control] {command} took {elapsed_ms:.0f}ms (budget {self.budget_ms:.0f}ms)", flush=True)
+        return elapsed_ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                'budget_ms': self.budget_ms,
+                'commands': {
+                    command: {
+                        'count': entry['count'],
+                        'avg_ms': round(entry['total_ms'] / entry['count'], 1),
+                        'max_ms': round(entry['max_ms'], 1),
+                        'over_budget': entry['over_budget']
+                    } for command, entry in self._latency.items()
+                }
+            }
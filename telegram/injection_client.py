@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Injection Client - submit prompts to the local injection service (injection_service.py)
+Standard library only, so any producer (Gmail listener, LINE server, cron scripts) can use it,
+and Agent reports (telegram_notifier.py) can hand messages to the running server without
+importing requests, yaml or config.
+The LINE edition ships a copy without notify().
+
+Usage:
+    python3 injection_client.py --socket /path/to/.injection.sock --source cron Güpa "Daily report please"
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+NOTIFY_WAIT = 15           # Seconds a report may wait in the service's send queue
+NOTIFY_SEND_GRACE = 60     # Extra seconds for a report the service is already sending
+
+
+def submit(agent_name, text, source, socket_path, session=None, timeout=60):
+    """
+    Submit text for agent_name to the injection service
+
+    Args:
+        agent_name (str): Target Agent (window) name
+        text (str): Prompt to type and submit
+        source (str): Producer tag shown in the service's logs and statistics
+        socket_path (str): Unix socket of the service
+        session (str): tmux session the producer expects, the service refuses other sessions
+        timeout (float): Seconds to wait for the injection to complete
+
+    Returns:
+        True / False: the service delivered / failed to deliver the prompt (final, do not retry)
+        None: the service did not take the request (not running, other session, unknown Agent),
+              the caller may inject by itself
+    """
+    request = {'op': 'inject', 'agent': agent_name, 'text': text, 'source': source, 'session': session}
+    return _call(socket_path, request, timeout)
+
+
+def notify(text, socket_path, file_path=None, file_type='document', wait=NOTIFY_WAIT, timeout=None):
+    """
+    Hand a notification (message, or file with text as caption) to the service for sending
+
+    Delivery happens in the server process with its warm Bot API connections. With wait
+    (seconds) the service answers once the report was sent; a report still queued after
+    wait seconds is withdrawn, so the caller can send it by itself. wait=0 only queues it.
+
+    Returns:
+        True: sent by the service (wait=0: queued)
+        False: the service failed to send it
+        None: not taken (no service, notifications not served, withdrawn after wait),
+              the caller may send by itself
+    """
+    request = {'op': 'notify', 'text': text, 'wait': wait}
+    if file_path:
+        request.update(file=os.path.abspath(file_path), file_type=file_type)
+    # A report already being sent when wait runs out is still answered with its result
+    return _call(socket_path, request, timeout or wait + NOTIFY_SEND_GRACE)
+
+
+def _call(socket_path, request, timeout):
+    """One request/reply round trip, True/False for the outcome, None when the service did not take it"""
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    try:
+        sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        reply_line = sock.makefile('rb').readline()
+    except OSError as e:
+        # The request may already be queued for the Agent: report failure, never fall back
+        print(f"⚠️ Injection service did not answer: {e}")
+        return False
+    finally:
+        sock.close()
+
+    try:
+        reply = json.loads(reply_line)
+    except ValueError:
+        return False
+    if not reply.get('accepted', False):
+        print(f"⚠️ Injection service refused request: {reply.get('error')}")
+        return None
+    return bool(reply.get('ok'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Submit a prompt to an Agent through the injection service")
+    parser.add_argument('agent')
+    parser.add_argument('text')
+    parser.add_argument('--socket', required=True, help="Unix socket of the injection service")
+    parser.add_argument('--source', default='cli')
+    parser.add_argument('--session', default=None)
+    args = parser.parse_args()
+
+    result = submit(args.agent, args.text, args.source, args.socket, args.session)
+    if result is None:
+        print("❌ Injection service unavailable")
+    sys.exit(0 if result else 1)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# injection_service.py
+# Local injection service: every producer (Gmail listener, LINE server, scripts) submits prompts over one
+# Unix socket, and the process that owns the agent transport and the per-Agent lanes types them.
+# The same socket takes Agent reports (telegram_notifier.py) and sends them from the resident process.
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON reply per line (a connection may carry several)"""
+
+    def handle(self):
+        for raw in self.rfile:
+            try:
+                request = json.loads(raw)
+                if not isinstance(request, dict):
+                    raise ValueError('request must be an object')
+                reply = self.server.service.handle_request(request)
+            except ValueError as e:
+                reply = {'ok': False, 'accepted': False, 'error': f'bad request: {e}'}
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InjectionService:
+    """Unix-socket front door to inject_fn(text, agent_name, source)
+
+    Request:  {"op": "inject", "agent": "Güpa", "text": "...", "source": "gmail", "session": "<tmux session>"}
+    Reply:    {"ok": true, "accepted": true, "ms": 41.2}
+
+    accepted=false means nothing was injected (unknown Agent, other tmux
+    session, malformed request), so the producer may fall back to its own
+    direct path; once accepted, the outcome is final and must not be retried
+    elsewhere. Requests are handled on their own threads and serialized per
+    Agent by inject_fn (the dispatch lanes). {"op": "ping"} checks liveness.
+
+    {"op": "notify", "text": "...", "file": "/abs/path", "file_type": "photo"}
+    queues a report for notify_fn(request); one sender thread delivers the
+    reports in arrival order. Without "wait" it is answered right away. With
+    "wait": <seconds> the reply carries the send result; a report still
+    queued when the wait runs out is withdrawn and answered accepted=false,
+    so the caller can send it by itself without a duplicate.
+    """
+
+    def __init__(self, socket_path, inject_fn, session_name, agent_names, notify_fn=None):
+        self.socket_path = socket_path
+        self.inject_fn = inject_fn
+        self.notify_fn = notify_fn
+        self.session_name = session_name
+        self.agent_names = set(agent_names)
+        self._server = None
+        self._lock = threading.Lock()
+        self._sources = {}
+        self._notifications = queue.Queue()
+        self.notify_counts = {'queued': 0, 'sent': 0, 'failed': 0, 'withdrawn': 0}
+        self.started_at = None
+
+    def start(self):
+        """Bind the socket and serve in a background thread, returns False if another service owns it"""
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                print(f"⚠️ [Inject] {self.socket_path} is served by another process, not starting", flush=True)
+                return False
+            except OSError:
+                os.unlink(self.socket_path)     # Stale socket of a previous run
+            finally:
+                probe.close()
+
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        self._server.service = self
+        os.chmod(self.socket_path, 0o600)
+        self.started_at = time.time()
+        threading.Thread(target=self._server.serve_forever, name='injection-service', daemon=True).start()
+        if self.notify_fn is not None:
+            threading.Thread(target=self._notify_loop, name='notify-sender', daemon=True).start()
+        print(f"📨 [Inject] Injection service listening on {self.socket_path}", flush=True)
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def handle_request(self, request):
+        op = request.get('op', 'inject')
+        if op == 'ping':
+            return {'ok': True, 'accepted': True, 'session': self.session_name}
+        if op == 'notify':
+            return self._queue_notification(request)
+        if op != 'inject':
+            return {'ok': False, 'accepted': False, 'error': f'unknown op: {op}'}
+
+        agent_name = request.get('agent')
+        text = request.get('text')
+        source = str(request.get('source') or 'unknown')
+        session = request.get('session')
+        if session and session != self.session_name:
+            return {'ok': False, 'accepted': False, 'error': f'this service injects into session {self.session_name}'}
+        if agent_name not in self.agent_names:
+            return {'ok': False, 'accepted': False, 'error': f'unknown agent: {agent_name}'}
+        if not isinstance(text, str) or not text:
+            return {'ok': False, 'accepted': False, 'error': 'text is required'}
+
+        print(f"📨 [Inject:{source}] -> [{agent_name}] ({len(text)} chars)", flush=True)
+        started = time.monotonic()
+        try:
+            ok = bool(self.inject_fn(text, agent_name, source))
+            error = None
+        except Exception as e:
+            ok, error = False, str(e)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self._record(source, ok, len(text), elapsed_ms)
+
+        reply = {'ok': ok, 'accepted': True, 'ms': round(elapsed_ms, 1)}
+        if error:
+            reply['error'] = error
+        return reply
+
+    def _queue_notification(self, request):
+        if self.notify_fn is None:
+            return {'ok': False, 'accepted': False, 'error': 'notifications are not served here'}
+        if not isinstance(request.get('text', ''), str) or not (request.get('text') or request.get('file')):
+            return {'ok': False, 'accepted': False, 'error': 'text or file is required'}
+        if request.get('file') and not os.path.isfile(request['file']):
+            return {'ok': False, 'accepted': True, 'error': f"file does not exist: {request['file']}"}
+        entry = {'request': request, 'state': 'queued', 'ok': False, 'done': threading.Event()}
+        with self._lock:
+            self.notify_counts['queued'] += 1
+        self._notifications.put(entry)
+
+        wait = request.get('wait')
+        if not wait:
+            return {'ok': True, 'accepted': True, 'queued': self._notifications.qsize()}
+        if not entry['done'].wait(float(wait)):
+            with self._lock:
+                if entry['state'] == 'queued':
+                    entry['state'] = 'withdrawn'
+                    self.notify_counts['withdrawn'] += 1
+                    return {'ok': False, 'accepted': False, 'error': f'not sent within {wait}s, withdrawn'}
+            # Already being sent: its Bot API calls are bounded by the client's own timeouts
+            entry['done'].wait()
+        return {'ok': entry['ok'], 'accepted': True}
+
+    def _notify_loop(self):
+        while True:
+            entry = self._notifications.get()
+            with self._lock:
+                if entry['state'] == 'withdrawn':
+                    continue
+                entry['state'] = 'sending'
+            try:
+                ok = bool(self.notify_fn(entry['request']))
+            except Exception as e:
+                print(f"❌ [Inject] Notification failed: {e}", flush=True)
+                ok = False
+            entry['ok'] = ok
+            with self._lock:
+                self.notify_counts['sent' if ok else 'failed'] += 1
+            entry['done'].set()
+
+    def _record(self, source, ok, size, elapsed_ms):
+        with self._lock:
+            counters = self._sources.setdefault(source, {'delivered': 0, 'failed': 0, 'chars': 0, 'total_ms': 0.0})
+            counters['delivered' if ok else 'failed'] += 1
+            counters['chars'] += size
+            counters['total_ms'] += elapsed_ms
+
+    def stats(self):
+        with self._lock:
+            sources = {
+                name: {
+                    'delivered': c['delivered'],
+                    'failed': c['failed'],
+                    'chars': c['chars'],
+                    'avg_ms': round(c['total_ms'] / max(1, c['delivered'] + c['failed']), 1)
+                }
+                for name, c in self._sources.items()
+            }
+        total = sum(c['delivered'] + c['failed'] for c in sources.values())
+        uptime = time.time() - self.started_at if self.started_at else 0
+        return {
+            'socket': self.socket_path,
+            'listening': self._server is not None,
+            'per_minute': round(total / (uptime / 60), 2) if uptime > 0 else 0,
+            'sources': sources,
+            'notifications': dict(self.notify_counts, pending=self._notifications.qsize())
+        }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# live_tail.py
+# Live tail: after a prompt is submitted, mirror the Agent's screen into one Telegram message
+# that is edited as new output arrives (throttled), until the Agent is back at its prompt
+
+import html
+import threading
+import time
+
+from pane_readiness import at_prompt
+
+MAX_BODY_CHARS = 3500   # Telegram messages are limited to 4096 characters
+
+
+def _escaped_tail(text, limit):
+    """html.escape(text) cut to its last `limit` characters, never inside an entity"""
+    escaped = html.escape(text)
+    if len(escaped) <= limit:
+        return escaped
+    pieces = []
+    size = 0
+    for char in reversed(text):
+        piece = html.escape(char)
+        if size + len(piece) > limit:
+            break
+        pieces.append(piece)
+        size += len(piece)
+    return ''.join(reversed(pieces))
+
+
+class _TailSession:
+    def __init__(self, agent_name):
+        self.agent_name = agent_name
+        self.event = threading.Event()
+        self.cancelled = False
+        self.message_id = None
+        self.last_text = None
+
+
+class LiveTail:
+    """One live-tail session per Agent, woken by the transport's output stream (no polling)
+
+    send_fn(text) -> message_id and edit_fn(message_id, text) -> bool talk
+    to Telegram; edits happen at most every `interval` seconds. A session
+    ends when the Agent has been silent for `quiet_seconds` with its input
+    prompt visible, after `max_duration`, or when a new prompt starts the
+    next session for the same Agent. The message shows the Agent's screen
+    (last `lines` lines) rather than the raw stream, so TUI redraws read well.
+    """
+
+    def __init__(self, transport, send_fn, edit_fn, engine_of, interval=1.5, lines=20,
+                 quiet_seconds=3.0, max_duration=600):
+        self.transport = transport
+        self.send_fn = send_fn
+        self.edit_fn = edit_fn
+        self.engine_of = engine_of
+        self.interval = interval
+        self.lines = lines
+        self.quiet_seconds = quiet_seconds
+        self.max_duration = max_duration
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.started = 0
+        self.edits = 0
+        transport.add_output_listener(self._on_output)
+
+    def _on_output(self, agent_name, data):
+        session = self._sessions.get(agent_name)
+        if session is not None:
+            session.event.set()
+
+    def start(self, agent_name):
+        """Tail agent_name's output from now on (replaces a running session for that Agent)"""
+        session = _TailSession(agent_name)
+        session.event.set()     # Output may already have arrived since the prompt was submitted
+        with self._lock:
+            previous = self._sessions.get(agent_name)
+            if previous is not None:
+                previous.cancelled = True
+                previous.event.set()
+            self._sessions[agent_name] = session
+            self.started += 1
+        threading.Thread(target=self._run, args=(session,), name=f'live-tail-{agent_name}', daemon=True).start()
+
+    def _run(self, session):
+        started = last_output = time.monotonic()
+        last_edit = 0.0
+        pending = False         # output arrived that the message does not show yet
+        status = "⏱ stopped (time limit)"
+        try:
+            while not session.cancelled:
+                now = time.monotonic()
+                timeout = max(0.0, last_edit + self.interval - now) if pending else self.quiet_seconds
+                if session.event.wait(timeout):
+                    session.event.clear()
+                    if session.cancelled:
+                        break
+                    pending = True
+                    last_output = time.monotonic()
+                now = time.monotonic()
+
+                if pending and now - last_edit >= self.interval:
+                    self._render(session, "⏳ running")
+                    last_edit, pending = now, False
+                if (session.message_id is not None and now - last_output >= self.quiet_seconds
+                        and at_prompt(self.transport.capture(session.agent_name),
+                                      self.engine_of(session.agent_name))):
+                    status = "✅ back at prompt"
+                    break
+                if now - started >= self.max_duration:
+                    break
+            if session.cancelled:
+                status = "↪️ superseded by a newer prompt"
+            if session.message_id is not None:
+                self._render(session, status)
+        except Exception as e:
+            print(f"⚠️ [LiveTail] [{session.agent_name}] {e}", flush=True)
+        finally:
+            with self._lock:
+                if self._sessions.get(session.agent_name) is session:
+                    del self._sessions[session.agent_name]
+
+    def _render(self, session, status):
+        screen = self.transport.capture(session.agent_name) or ''
+        lines = [line.rstrip() for line in screen.split('\n') if line.strip()][-self.lines:]
+        body = _escaped_tail('\n'.join(lines), MAX_BODY_CHARS)
+        text = f"📡 <b>[{session.agent_name}]</b> {status}\n<pre>{body}</pre>"
+        if text == session.last_text:
+            return
+        if session.message_id is None:
+            session.message_id = self.send_fn(text)
+            if session.message_id is None:
+                session.cancelled = True    # Cannot edit what was not sent
+                return
+        elif not self.edit_fn(session.message_id, text):
+            return
+        session.last_text = text
+        self.edits += 1
+
+    def stats(self):
+        with self._lock:
+            return {'active': sorted(self._sessions), 'started': self.started, 'edits': self.edits}
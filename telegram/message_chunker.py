@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# message_chunker.py
+# Split long HTML-formatted Telegram messages into parts under the 4096-character limit:
+# cuts on line boundaries when possible, never inside a tag or an entity, and closes the open
+# tags at the end of each part and reopens them at the start of the next (<pre>, <b>, <a href>...)
+
+import re
+
+MESSAGE_LIMIT = 4096
+
+_TOKEN_RE = re.compile(r'<[^<>]+>|&#?\w+;|\n|[^<&\n]+|[<&]')
+_TAG_NAME_RE = re.compile(r'</?\s*([a-zA-Z][\w-]*)')
+_TAG_RE = re.compile(r'<[^<>]+>')
+
+
+def _length(text):
+    """Length as Telegram counts it (UTF-16 code units), an upper bound since tags count too"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _has_text(piece):
+    return bool(_TAG_RE.sub('', piece).strip())
+
+
+def _apply(token, stack):
+    """Track the open tags: push (name, opening tag) on <tag>, pop the innermost match on </tag>"""
+    if not token.startswith('<') or len(token) < 3:
+        return
+    match = _TAG_NAME_RE.match(token)
+    if match is None:
+        return
+    name = match.group(1).lower()
+    if token.startswith('</'):
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i]
+                break
+    elif not token.endswith('/>'):
+        stack.append((name, token))
+
+
+def _closing(stack):
+    return ''.join(f'</{name}>' for name, _ in reversed(stack))
+
+
+def split_html_message(text, limit=MESSAGE_LIMIT):
+    """Split HTML message text into balanced parts of at most limit characters (list of str)"""
+    if _length(text) <= limit:
+        return [text]
+
+    parts = []
+    stack = []
+    current = []
+    current_length = 0
+    has_content = False
+
+    def flush():
+        nonlocal current, current_length, has_content
+        if has_content:
+            parts.append(''.join(current) + _closing(stack))
+        reopen = ''.join(tag for _, tag in stack)
+        current, current_length, has_content = [reopen], _length(reopen), False
+
+    def fits(piece, stack_after):
+        return current_length + _length(piece) + _length(_closing(stack_after)) <= limit
+
+    def fits_fresh(piece, stack_after):
+        reopen = ''.join(tag for _, tag in stack)
+        return _length(reopen) + _length(piece) + _length(_closing(stack_after)) <= limit
+
+    for line in text.splitlines(keepends=True):
+        tokens = _TOKEN_RE.findall(line)
+        line_stack = list(stack)
+        for token in tokens:
+            _apply(token, line_stack)
+
+        # Whole line fits (in this part, or in a fresh one). A part that is still less than
+        # half full is not sent on its own (e.g. just a header): the line is cut instead
+        if not fits(line, line_stack) and has_content and fits_fresh(line, line_stack) \
+                and current_length >= limit // 2:
+            flush()
+        if fits(line, line_stack):
+            current.append(line)
+            current_length += _length(line)
+            stack[:] = line_stack
+            has_content = has_content or _has_text(line)
+            continue
+
+        # Line longer than a part: cut between tokens, and inside plain text when needed
+        for token in tokens:
+            after = list(stack)
+            _apply(token, after)
+            cuttable = not token.startswith(('<', '&'))
+            # Plain text is cut to fill the rest of this part; tags and entities move to the next one
+            if not fits(token, after) and has_content and \
+                    (not cuttable or limit - current_length - _length(_closing(stack)) <= 0):
+                flush()
+            while not fits(token, after) and cuttable:
+                room = limit - current_length - _length(_closing(stack))
+                head = token[:max(1, room)]
+                while len(head) > 1 and _length(head) > room:
+                    head = head[:-1]
+                current.append(head)
+                current_length += _length(head)
+                has_content = True
+                token = token[len(head):]
+                flush()
+            current.append(token)
+            current_length += _length(token)
+            stack[:] = after
+            has_content = has_content or _has_text(token)
+
+    if has_content:
+        parts.append(''.join(current) + _closing(stack))
+    return parts
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# pane_readiness.py
+# Readiness-driven Enter: press Enter as soon as the typed text is visible in the Agent's input box,
+# and press it again only if the engine's input box still holds the text afterwards
+# (works on any AgentTransport: capture() for the screen, send_key() for Enter)
+
+import time
+
+# Per-engine input box knowledge (the `engine` field of AGENTS)
+#   prompt_markers: characters that start the input line; the input box is everything from the last
+#                   line starting with one of them to the bottom of the pane
+#   paste_markers:  placeholders a CLI shows instead of the text of a long paste
+#   enter_retries:  extra Enter presses allowed while the text is still sitting in the input box
+#   busy_markers:   status-line text shown while the engine is still working on a turn
+ENGINE_PROFILES = {
+    'claude': {'prompt_markers': ('❯', '>'), 'paste_markers': ('[Pasted text',), 'enter_retries': 2,
+               'busy_markers': ('esc to interrupt',)},
+    'gemini': {'prompt_markers': ('>', '*'), 'paste_markers': ('[Pasted text',), 'enter_retries': 1,
+               'busy_markers': ('esc to cancel',)},
+    'default': {'prompt_markers': (), 'paste_markers': (), 'enter_retries': 0, 'busy_markers': ()},
+}
+
+POLL_INTERVAL = 0.02
+LAND_TIMEOUT = 3.0      # Max wait for the text to show up before pressing Enter anyway
+SUBMIT_TIMEOUT = 0.5    # Max wait for the input box to clear after each Enter
+PROBE_LENGTH = 16
+
+_IGNORED_CHARS = set(' \t\r\n│┃║╭╮╰╯─━═')
+
+
+def _normalize(text):
+    """Drop whitespace, line breaks and box-drawing characters (TUIs wrap and frame the input box)"""
+    return ''.join(ch for ch in text if ch not in _IGNORED_CHARS)
+
+
+def _probe(text):
+    """Tail of the text that must be visible once it has landed in the input box"""
+    return _normalize(text)[-PROBE_LENGTH:]
+
+
+def _input_region(pane, profile, fallback=True):
+    """Text of the input box, or the last non-empty lines when no prompt marker is visible
+
+    With fallback=False, None is returned when the input box cannot be located.
+    """
+    lines = pane.rstrip('\n').split('\n')
+    for i in range(len(lines) - 1, -1, -1):
+        if _normalize(lines[i])[:1] in profile['prompt_markers']:
+            return '\n'.join(lines[i:])
+    if not fallback:
+        return None
+    return '\n'.join([line for line in lines if line.strip()][-3:])
+
+
+def _holds_text(pane, probe, profile, fallback=True):
+    region = _input_region(pane, profile, fallback)
+    if region is None:
+        return False
+    if any(marker in region for marker in profile['paste_markers']):
+        return True
+    return bool(probe) and probe in _normalize(region)
+
+
+def prompt_visible(screen, engine=None):
+    """True when the engine's input prompt is on screen (always True for engines without markers)"""
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    if not profile['prompt_markers']:
+        return True
+    return screen is not None and _input_region(screen, profile, fallback=False) is not None
+
+
+def input_box(screen, engine=None):
+    """Normalized text of the engine's input box, None when it is not on screen (or unknown for the engine)"""
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    if screen is None or not profile['prompt_markers']:
+        return None
+    region = _input_region(screen, profile, fallback=False)
+    return None if region is None else _normalize(region)
+
+
+def busy(screen, engine=None):
+    """True when the engine's busy indicator is on screen"""
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    return screen is not None and any(marker in screen for marker in profile['busy_markers'])
+
+
+def at_prompt(screen, engine=None):
+    """True when the engine is back at its input prompt: prompt visible, no busy indicator"""
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    if screen is None or any(marker in screen for marker in profile['busy_markers']):
+        return False
+    return prompt_visible(screen, engine)
+
+
+def wait_for_input(transport, agent_name, text, engine=None, timeout=LAND_TIMEOUT):
+    """Block until text is visible in the input box and the pane stopped changing, returns bool"""
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    probe = _probe(text)
+    deadline = time.monotonic() + timeout
+    previous = None
+    while time.monotonic() < deadline:
+        pane = transport.capture(agent_name)
+        if pane is not None and _holds_text(pane, probe, profile) and pane == previous:
+            return True
+        previous = pane
+        time.sleep(POLL_INTERVAL)
+    return False
+
+
+def submit_input(transport, agent_name, text, engine=None, on_enter=None):
+    """Press Enter once text has landed, retry while the engine's input box still holds it
+
+    on_enter() is called right before the first Enter (e.g. to mark where the reply starts).
+    Returns the number of Enter presses sent.
+    """
+    profile = ENGINE_PROFILES.get(engine, ENGINE_PROFILES['default'])
+    landed = wait_for_input(transport, agent_name, text, engine)
+    if on_enter is not None:
+        on_enter()
+    transport.send_key(agent_name, 'Enter')
+    presses = 1
+
+    if not landed:
+        return presses
+    probe = _probe(text)
+    for _ in range(profile['enter_retries']):
+        deadline = time.monotonic() + SUBMIT_TIMEOUT
+        while time.monotonic() < deadline:
+            pane = transport.capture(agent_name)
+            if pane is not None and not _holds_text(pane, probe, profile, fallback=False):
+                return presses
+            time.sleep(POLL_INTERVAL)
+        # Enter was swallowed (e.g. paste confirmation), the text is still waiting
+        transport.send_key(agent_name, 'Enter')
+        presses += 1
+    return presses
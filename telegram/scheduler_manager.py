@@ -4,9 +4,8 @@
 
 import os
 import sys
-import subprocess
-import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -14,36 +13,34 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 # Import configuration
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import TMUX_SESSION_NAME, SCHEDULER_YAML_PATH
+from config import SCHEDULER_YAML_PATH
 
 class SchedulerManager:
-    def __init__(self, flask_app=None, image_manager=None):
+    def __init__(self, flask_app=None, image_manager=None, inject_fn=None):
         self.scheduler = BackgroundScheduler()
         self.app = flask_app
         self.image_manager = image_manager
+        # inject_fn(text, agent_name, source): the webhook server's producer entry point
+        # (dispatch lane, inbox spill, escaping, injection mode, readiness-driven Enter)
+        self.inject_fn = inject_fn
         self.jobs = []
 
+    def _inject(self, agent_name, text):
+        """Deliver text to an Agent through the shared injection path, returns True on success"""
+        if self.inject_fn is None:
+            print(f"⚠️ [Scheduler] No injection path configured, [{agent_name}] skipped", flush=True)
+            return False
+        return bool(self.inject_fn(text, agent_name, source='scheduler'))
+
     def send_command_to_agent(self, agent_name, command):
-        """Callback function for scheduled tasks: send command to tmux"""
+        """Callback function for scheduled tasks: send command to the Agent"""
         system_prompt = f"\n\n【System Prompt】This command is from system scheduled task. After task completion, you must execute python3 telegram_notifier.py 'Task report...' to report the result."
         final_message = command + system_prompt
 
         print(f"⏰ [Scheduler] Executing scheduled task -> [{agent_name}]: {command}", flush=True)
-
         try:
-            subprocess.run([
-                'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                final_message
-            ], check=True)
-
-            # Add delay to ensure command input is complete before sending Enter
-            time.sleep(1)
-
-            # Send Enter
-            subprocess.run([
-                'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                'Enter'
-            ], check=True)
+            if not self._inject(agent_name, final_message):
+                print(f"❌ [Scheduler] Scheduled task was not delivered to [{agent_name}]", flush=True)
 
         except Exception as e:
             print(f"❌ [Scheduler] Scheduled task execution failed: {e}", flush=True)
@@ -413,35 +410,23 @@ class SchedulerManager:
 
         print(f"📝 [Scheduler] Starting to inject memory update prompt to all Agents…", flush=True)
 
-        # Inject prompt to each Agent in config list
+        # Inject prompt to each Agent in config list: each Agent has its own lane,
+        # so the windows are served in parallel, then wait for all of them
         try:
-            for agent in AGENTS:
-                agent_name = agent['name']
-                try:
-                    # Use tmux send-keys to inject prompt to Agent window
-                    subprocess.run([
-                        'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                        '-l', prompt
-                    ], check=True)
-
-                    time.sleep(0.3)
+            with ThreadPoolExecutor(max_workers=max(1, len(AGENTS)), thread_name_prefix='memory-update') as pool:
+                for agent in AGENTS:
+                    pool.submit(self._inject_memory_prompt, agent['name'], prompt)
 
-                    subprocess.run([
-                        'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                        'Enter'
-                    ], check=True)
-
-                    # Double insurance
-                    time.sleep(0.2)
-                    subprocess.run([
-                        'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{agent_name}',
-                        'Enter'
-                    ], check=True)
-
-                    print(f"✅ [Scheduler] Memory update prompt injected to {agent_name}", flush=True)
+        except Exception as e:
+            print(f"❌ [Scheduler] Error during memory update: {e}", flush=True)
 
-                except Exception as e:
-                    print(f"❌ [Scheduler] Failed to inject prompt to {agent_name}: {e}", flush=True)
+    def _inject_memory_prompt(self, agent_name, prompt):
+        """Inject memory update prompt into one Agent window"""
+        try:
+            if self._inject(agent_name, prompt):
+                print(f"✅ [Scheduler] Memory update prompt injected to {agent_name}", flush=True)
+            else:
+                print(f"❌ [Scheduler] Memory update prompt not delivered to {agent_name}", flush=True)
 
         except Exception as e:
-            print(f"❌ [Scheduler] Error during memory update: {e}", flush=True)
+            print(f"❌ [Scheduler] Failed to inject prompt to {agent_name}: {e}", flush=True)
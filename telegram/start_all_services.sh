@@ -25,6 +25,10 @@ fi
 
 # Read configuration
 TMUX_SESSION_NAME=$(python3 -c "import sys; sys.path.append('$SCRIPT_DIR'); from config import TMUX_SESSION_NAME; print(TMUX_SESSION_NAME)")
+INGESTION_MODE=$(python3 -c "import sys; sys.path.append('$SCRIPT_DIR'); from config import TELEGRAM_INGESTION_MODE; print(TELEGRAM_INGESTION_MODE)")
+SERVER_WORKERS=$(python3 -c "import sys; sys.path.append('$SCRIPT_DIR'); from config import SERVER_WORKERS; print(SERVER_WORKERS)")
+AGENT_TRANSPORT=$(python3 -c "import sys; sys.path.append('$SCRIPT_DIR'); from config import AGENT_TRANSPORT; print(AGENT_TRANSPORT)")
+SERVER_BIND=$(python3 -c "import sys; sys.path.append('$SCRIPT_DIR'); from config import FLASK_HOST, FLASK_PORT; print(f'{FLASK_HOST}:{FLASK_PORT}')")
 
 echo "🚀 Starting Chat Agent Matrix (Telegram Edition)"
 echo "==========================================="
@@ -53,6 +57,7 @@ python3 "$SCRIPT_DIR/telegram_scripts/setup_agent_env.py"
 echo "🤖 Deploying AI Agent Squad…"
 export SCRIPT_DIR
 export TMUX_SESSION_NAME
+export AGENT_TRANSPORT
 
 python3 << 'EOF'
 import sys
@@ -63,6 +68,8 @@ import re
 
 script_dir = os.environ['SCRIPT_DIR']
 session_name = os.environ['TMUX_SESSION_NAME']
+# pty transport: the server spawns the Agent CLIs itself, only their homes are prepared here
+pty_mode = os.environ.get('AGENT_TRANSPORT') == 'pty'
 sys.path.append(script_dir)
 
 def wait_for_prompt(session_name, window_name, engine, max_wait=30):
@@ -150,15 +157,16 @@ try:
 
         print(f"   ▸ Starting Agent: {name} ({engine})")
 
-        if i == 0:
-            subprocess.run(['tmux', 'rename-window', '-t', f'{session_name}:0', name], check=True)
-        else:
-            subprocess.run(['tmux', 'new-window', '-t', session_name, '-n', name], check=True)
+        if not pty_mode:
+            if i == 0:
+                subprocess.run(['tmux', 'rename-window', '-t', f'{session_name}:0', name], check=True)
+            else:
+                subprocess.run(['tmux', 'new-window', '-t', session_name, '-n', name], check=True)
 
-        # Set up pipe-pane to monitor authorization prompts and stuck commands
-        responder_script = os.path.join(script_dir, 'auto_permission_responder.py')
-        subprocess.run(['tmux', 'pipe-pane', '-t', f'{session_name}:{name}',
-                       f'python3 {responder_script} {session_name}:{name}'], check=True)
+            # Set up pipe-pane to monitor authorization prompts and stuck commands
+            responder_script = os.path.join(script_dir, 'auto_permission_responder.py')
+            subprocess.run(['tmux', 'pipe-pane', '-t', f'{session_name}:{name}',
+                           f'python3 {responder_script} {session_name}:{name}'], check=True)
 
         # 📋 Copy necessary tool scripts to Agent home
         # Copy telegram_notifier.py to toolbox
@@ -232,6 +240,10 @@ try:
         else:
             print(f"   ✓ Avatar directory confirmed: {avatar_emojis_path}")
 
+        if pty_mode:
+            print(f"     ✓ Home ready, CLI will be started by the server (pty transport)")
+            continue
+
         # 🎯 Enter Agent working directory
         subprocess.run(['tmux', 'send-keys', '-t', f'{session_name}:{name}', f'cd {home_path}'], check=True)
         time.sleep(1)
@@ -348,22 +360,43 @@ echo "   ✅ All Agents ready"
 # Window: Flask Telegram API
 echo "📱 Starting Telegram Webhook API…"
 tmux new-window -t "$TMUX_SESSION_NAME" -n "telegram" -c "$SCRIPT_DIR"
-tmux send-keys -t "$TMUX_SESSION_NAME:telegram" "python3 $SCRIPT_DIR/telegram_webhook_server.py"
+# Fresh start marker: the leader resets the active Agent and pending user states once
+touch "$SCRIPT_DIR/.service_start"
+if [ "$AGENT_TRANSPORT" = "pty" ] && [ "$SERVER_WORKERS" -gt 1 ]; then
+    # The Agent PTYs belong to one process, other workers could not reach them
+    echo "   ⚠️  pty transport requires a single process, ignoring workers: $SERVER_WORKERS"
+    SERVER_WORKERS=1
+fi
+if [ "$SERVER_WORKERS" -gt 1 ] && command -v gunicorn &> /dev/null; then
+    # Multi-worker serving: shared state in SQLite, scheduler elected to one worker
+    echo "   ▸ gunicorn with $SERVER_WORKERS workers"
+    tmux send-keys -t "$TMUX_SESSION_NAME:telegram" "cd $SCRIPT_DIR && gunicorn -w $SERVER_WORKERS --threads 4 -b $SERVER_BIND wsgi:app"
+else
+    if [ "$SERVER_WORKERS" -gt 1 ]; then
+        echo "   ⚠️  gunicorn not installed (pip3 install gunicorn), falling back to single process"
+    fi
+    tmux send-keys -t "$TMUX_SESSION_NAME:telegram" "python3 $SCRIPT_DIR/telegram_webhook_server.py"
+fi
 sleep 1
 tmux send-keys -t "$TMUX_SESSION_NAME:telegram" Enter
 
-# Wait for Flask to start
-sleep 3
+if [ "$INGESTION_MODE" = "polling" ]; then
+    # Long polling: server pulls getUpdates itself, no tunnel or webhook registration needed
+    echo "📡 Ingestion mode: long polling (ngrok skipped)"
+else
+    # Wait for Flask to start
+    sleep 3
 
-# Window: ngrok Tunnel
-echo "☁️  Establishing secure tunnel (ngrok)…"
-tmux new-window -t "$TMUX_SESSION_NAME" -n "ngrok" -c "$SCRIPT_DIR"
-tmux send-keys -t "$TMUX_SESSION_NAME:ngrok" "$SCRIPT_DIR/start_ngrok.sh"
-sleep 1
-tmux send-keys -t "$TMUX_SESSION_NAME:ngrok" Enter
+    # Window: ngrok Tunnel
+    echo "☁️  Establishing secure tunnel (ngrok)…"
+    tmux new-window -t "$TMUX_SESSION_NAME" -n "ngrok" -c "$SCRIPT_DIR"
+    tmux send-keys -t "$TMUX_SESSION_NAME:ngrok" "$SCRIPT_DIR/start_ngrok.sh"
+    sleep 1
+    tmux send-keys -t "$TMUX_SESSION_NAME:ngrok" Enter
 
-echo "⏳ Synchronizing network address and webhook…"
-sleep 5
+    echo "⏳ Synchronizing network address and webhook…"
+    sleep 5
+fi
 
 # Return to first Agent window
 tmux select-window -t "$TMUX_SESSION_NAME:0"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# state_store.py
+# Small SQLite (WAL) store for routing state shared by all server worker processes
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SharedStateStore:
+    """Process-safe key/value + user state + update claim store backed by SQLite in WAL mode
+
+    Every thread gets its own connection; WAL lets readers in other worker
+    processes proceed while one of them writes.
+    """
+
+    SEEN_UPDATES_KEEP = 5000
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS user_states ('
+                     'user_id TEXT PRIMARY KEY, command_template TEXT NOT NULL, created_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS seen_updates (update_id INTEGER PRIMARY KEY, seen_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS scheduler_commands ('
+                     'id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, payload TEXT, created_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS agent_backlog ('
+                     'id INTEGER PRIMARY KEY AUTOINCREMENT, agent TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS update_inbox ('
+                     'id INTEGER PRIMARY KEY AUTOINCREMENT, agent TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)')
+
+    # ---------- key/value ----------
+    def get(self, key, default=None):
+        row = self._conn().execute('SELECT value FROM kv WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        self._conn().execute('INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    # ---------- user input states (custom menu {input} templates) ----------
+    def set_user_state(self, user_id, command_template):
+        self._conn().execute('INSERT OR REPLACE INTO user_states (user_id, command_template, created_at) VALUES (?, ?, ?)',
+                             (str(user_id), command_template, time.time()))
+
+    def clear_user_states(self):
+        self._conn().execute('DELETE FROM user_states')
+
+    def peek_user_state(self, user_id):
+        """Command template of user's pending menu input, or None (state is left in place)"""
+        row = self._conn().execute('SELECT command_template FROM user_states WHERE user_id = ?',
+                                   (str(user_id),)).fetchone()
+        return row[0] if row else None
+
+    def pop_user_state(self, user_id):
+        """Atomically fetch and delete user's pending state, returns dict or None"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT command_template, created_at FROM user_states WHERE user_id = ?',
+                               (str(user_id),)).fetchone()
+            if row:
+                conn.execute('DELETE FROM user_states WHERE user_id = ?', (str(user_id),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return {'command_template': row[0], 'timestamp': row[1]} if row else None
+
+    # ---------- cross-process update_id claims ----------
+    def claim_update(self, update_id):
+        """Return True if this process is the first to claim update_id"""
+        conn = self._conn()
+        cursor = conn.execute('INSERT OR IGNORE INTO seen_updates (update_id, seen_at) VALUES (?, ?)',
+                              (int(update_id), time.time()))
+        if cursor.rowcount and int(update_id) % 500 == 0:
+            conn.execute('DELETE FROM seen_updates WHERE update_id < ?', (int(update_id) - self.SEEN_UPDATES_KEEP,))
+        return cursor.rowcount == 1
+
+    def release_update(self, update_id):
+        self._conn().execute('DELETE FROM seen_updates WHERE update_id = ?', (int(update_id),))
+
+    # ---------- scheduler command relay (non-leader workers -> scheduler leader) ----------
+    def push_scheduler_command(self, action, payload=None):
+        self._conn().execute('INSERT INTO scheduler_commands (action, payload, created_at) VALUES (?, ?, ?)',
+                             (action, json.dumps(payload), time.time()))
+
+    def pop_scheduler_commands(self):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT id, action, payload FROM scheduler_commands ORDER BY id').fetchall()
+            if rows:
+                conn.execute('DELETE FROM scheduler_commands WHERE id <= ?', (rows[-1][0],))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [(action, json.loads(payload)) for _, action, payload in rows]
+
+    # ---------- update inbox (every worker process -> leader's update queue) ----------
+    def push_update(self, update, agent_name):
+        self._conn().execute('INSERT INTO update_inbox (agent, payload, created_at) VALUES (?, ?, ?)',
+                             (agent_name, json.dumps(update), time.time()))
+
+    def pop_updates(self, limit):
+        """Atomically take up to limit oldest inbox updates as (update, agent_name), in arrival order"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT id, agent, payload FROM update_inbox ORDER BY id LIMIT ?',
+                                (int(limit),)).fetchall()
+            if rows:
+                conn.execute('DELETE FROM update_inbox WHERE id <= ?', (rows[-1][0],))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [(json.loads(payload), agent) for _, agent, payload in rows]
+
+    def update_inbox_count(self):
+        return self._conn().execute('SELECT COUNT(*) FROM update_inbox').fetchone()[0]
+
+    # ---------- durable per-agent backlog (lane overflow with the 'spill' policy) ----------
+    def push_backlog(self, agent_name, payload):
+        self._conn().execute('INSERT INTO agent_backlog (agent, payload, created_at) VALUES (?, ?, ?)',
+                             (agent_name, json.dumps(payload), time.time()))
+
+    def pop_backlog(self, agent_name, limit):
+        """Atomically take up to limit oldest backlog payloads of agent"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT id, payload FROM agent_backlog WHERE agent = ? ORDER BY id LIMIT ?',
+                                (agent_name, int(limit))).fetchall()
+            if rows:
+                conn.execute(f"DELETE FROM agent_backlog WHERE id IN ({','.join('?' * len(rows))})",
+                             [row[0] for row in rows])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [json.loads(payload) for _, payload in rows]
+
+    def backlog_count(self, agent_name):
+        return self._conn().execute('SELECT COUNT(*) FROM agent_backlog WHERE agent = ?', (agent_name,)).fetchone()[0]
+
+
+class ProcessLeaderLock:
+    """Non-blocking exclusive flock: exactly one worker process holds it for its lifetime"""
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._fd = None
+
+    def try_acquire(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    @property
+    def held(self):
+        return self._fd is not None
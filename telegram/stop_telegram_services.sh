@@ -28,6 +28,10 @@ if pgrep -f "telegram_webhook_server.py" > /dev/null; then
     pkill -f "telegram_webhook_server.py"
     echo "✅ Residual Flask server terminated"
 fi
+if pgrep -f "gunicorn.*wsgi:app" > /dev/null; then
+    pkill -f "gunicorn.*wsgi:app"
+    echo "✅ Residual gunicorn workers terminated"
+fi
 
 # 4. Clean up logs
 rm -f "$SCRIPT_DIR/ngrok.log"
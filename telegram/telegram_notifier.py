@@ -4,15 +4,15 @@ AI Engine Telegram Notifier
 Read message format from template files, AI engine only needs to fill in variables
 """
 
-import requests
 import json
-import yaml
+import marshal
 import os
 import sys
 from datetime import datetime
 
 # Support execution from agent_home directory: find config.py in parent directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
+config_dir = script_dir
 
 # If config not found in current directory, search upwards level by level
 if not os.path.exists(os.path.join(script_dir, 'config.py')):
@@ -20,13 +20,88 @@ if not os.path.exists(os.path.join(script_dir, 'config.py')):
     telegram_dir = os.path.dirname(os.path.dirname(script_dir))
     if os.path.exists(os.path.join(telegram_dir, 'config.py')):
         sys.path.insert(0, telegram_dir)
+        config_dir = telegram_dir
     else:
         # If still not found, try one more level up
         telegram_dir = os.path.dirname(telegram_dir)
         if os.path.exists(os.path.join(telegram_dir, 'config.py')):
             sys.path.insert(0, telegram_dir)
+            config_dir = telegram_dir
 
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL
+def _injection_socket_path():
+    """
+    Injection socket of the running server (dispatch.injection_socket), read from the config snapshot
+
+    The server writes the snapshot at start, so it names the socket that server listens on;
+    reading it with marshal keeps the fast path free of yaml and config.py.
+
+    Returns:
+        str: Socket path, None when the injection service is disabled
+    """
+    if os.environ.get('TELEGRAM_NOTIFY_SOCKET'):
+        return os.environ['TELEGRAM_NOTIFY_SOCKET']
+    instance_name = os.environ.get('INSTANCE_NAME', '')
+    snapshot_path = os.path.join(config_dir, f'.config_snapshot.{instance_name}' if instance_name else '.config_snapshot')
+    try:
+        with open(snapshot_path, 'rb') as f:
+            socket_name = marshal.load(f)['config'].get('dispatch', {}).get('injection_socket', '.injection.sock')
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        # Snapshot missing or unreadable: default socket name
+        socket_name = '.injection.sock'
+    return os.path.join(config_dir, socket_name) if socket_name else None
+
+def _forward_cli_report(argv):
+    """
+    Hand a command line report to the running server's injection service and wait for the send result
+
+    Args:
+        argv (list): Command line arguments (message, or --file <type> <path> [caption])
+
+    Returns:
+        True / False: the server sent / failed to send the report (final, exit status follows it)
+        None: the server did not take it (no service, withdrawn after the wait), send it directly below
+    """
+    try:
+        from injection_client import notify
+    except ImportError:
+        return None
+
+    socket_path = _injection_socket_path()
+    if argv[0] == '--file':
+        if len(argv) < 3:
+            return None
+        caption = " ".join(argv[3:]).replace('\\n', '\n')
+        sent = notify(caption, socket_path, file_path=argv[2], file_type=argv[1])
+    else:
+        sent = notify(" ".join(argv).replace('\\n', '\n'), socket_path)
+    if sent is True:
+        print(f'✅ Telegram notification sent successfully: {datetime.now().strftime("%H:%M:%S")}')
+    elif sent is False:
+        print(f'❌ Telegram notification failed to send (see server log): {datetime.now().strftime("%H:%M:%S")}')
+    return sent
+
+# Fast path for Agent reports: forward before the slow imports below (yaml, requests, config.yaml parsing)
+if __name__ == '__main__' and len(sys.argv) > 1:
+    _forwarded = _forward_cli_report(sys.argv[1:])
+    if _forwarded is not None:
+        sys.exit(0 if _forwarded else 1)
+
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL,
+    BOT_API_TIMEOUT, BOT_API_MAX_RETRIES, BOT_API_POOL_SIZE, BOT_API_RATE_LIMITS
+)
+from bot_api import get_client
+from message_chunker import split_html_message
+
+def api_client():
+    """
+    Process-wide pooled Bot API client (keep-alive connections, timeouts, retries)
+
+    Returns:
+        BotApiClient: Shared client of this process
+    """
+    return get_client(timeout=BOT_API_TIMEOUT, max_retries=BOT_API_MAX_RETRIES, pool_size=BOT_API_POOL_SIZE,
+                      rate_limits=BOT_API_RATE_LIMITS)
 
 def load_message_template(template_name: str, software: str = None) -> dict:
     """
@@ -49,6 +124,7 @@ def load_message_template(template_name: str, software: str = None) -> dict:
         template_file = os.path.join(telegram_dir, 'message_templates.yaml')
 
     try:
+        import yaml     # Only template messages need it, plain CLI reports skip the import
         with open(template_file, 'r', encoding='utf-8') as f:
             templates = yaml.safe_load(f)
 
@@ -97,7 +173,7 @@ def send_message(message: str) -> bool:
     }
 
     try:
-        response = requests.post(url, data=data)
+        response = api_client().post(url, data=data)
 
         if response.status_code == 200:
             print(f'✅ Telegram notification sent successfully: {datetime.now().strftime("%H:%M:%S")}')
@@ -110,6 +186,23 @@ def send_message(message: str) -> bool:
         print(f'❌ Error during sending: {e}')
         return False
 
+def send_long_message(message: str) -> bool:
+    """
+    Send a message of any length: split on line boundaries into parts under Telegram's
+    4096-character limit, with HTML tags kept balanced in every part, and send them in order
+
+    Args:
+        message (str): Message content to send (HTML)
+
+    Returns:
+        bool: Whether all parts were sent (stops at the first failed part)
+    """
+    parts = split_html_message(message)
+    for part in parts:
+        if not send_message(part):
+            return False
+    return True
+
 def send_message_with_keyboard(message: str, keyboard_buttons: list = None) -> bool:
     """
     Send Telegram message with custom keyboard
@@ -143,7 +236,7 @@ def send_message_with_keyboard(message: str, keyboard_buttons: list = None) -> b
         data['reply_markup'] = json.dumps(keyboard)
 
     try:
-        response = requests.post(url, data=data)
+        response = api_client().post(url, data=data)
 
         if response.status_code == 200:
             print(f'✅ Telegram message with keyboard sent successfully: {datetime.now().strftime("%H:%M:%S")}')
@@ -156,6 +249,68 @@ def send_message_with_keyboard(message: str, keyboard_buttons: list = None) -> b
         print(f'❌ Error during sending: {e}')
         return False
 
+def send_editable_message(message: str):
+    """
+    Send Telegram message that will be updated later with edit_message_text
+
+    Args:
+        message (str): Message content to send
+
+    Returns:
+        int: message_id of the sent message, None on failure
+    """
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        print("❌ Error: Please check Telegram configuration")
+        return None
+
+    url = f"{TELEGRAM_API_BASE_URL}{TELEGRAM_BOT_TOKEN}/sendMessage"
+    data = {
+        'chat_id': TELEGRAM_CHAT_ID,
+        'text': message,
+        'parse_mode': 'HTML',
+        'disable_notification': True
+    }
+
+    try:
+        response = api_client().post(url, data=data, timeout=10)
+        if response.status_code == 200:
+            return response.json().get('result', {}).get('message_id')
+        print(f'❌ Telegram message failed to send: {response.status_code} - {response.text}')
+    except Exception as e:
+        print(f'❌ Error during sending: {e}')
+    return None
+
+def edit_message_text(message_id: int, message: str) -> bool:
+    """
+    Replace the text of a previously sent message (editMessageText)
+
+    Args:
+        message_id (int): message_id returned by send_editable_message
+        message (str): New message content
+
+    Returns:
+        bool: Whether editing was successful
+    """
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        return False
+
+    url = f"{TELEGRAM_API_BASE_URL}{TELEGRAM_BOT_TOKEN}/editMessageText"
+    data = {
+        'chat_id': TELEGRAM_CHAT_ID,
+        'message_id': message_id,
+        'text': message,
+        'parse_mode': 'HTML'
+    }
+
+    try:
+        response = api_client().post(url, data=data, timeout=10)
+        if response.status_code == 200 or 'message is not modified' in response.text:
+            return True
+        print(f'❌ Telegram message failed to edit: {response.status_code} - {response.text}')
+    except Exception as e:
+        print(f'❌ Error during editing: {e}')
+    return False
+
 def send_file(file_path: str, file_type: str = 'document', caption: str = '') -> bool:
     """
     Send file to Telegram
@@ -212,7 +367,7 @@ def send_file(file_path: str, file_type: str = 'document', caption: str = '') ->
             if caption:
                 data['caption'] = caption
 
-            response = requests.post(url, files=files, data=data, timeout=30)
+            response = api_client().post(url, files=files, data=data, timeout=30)
 
         if response.status_code == 200:
             file_name = os.path.basename(file_path)
@@ -274,7 +429,7 @@ def get_chat_id() -> str:
     url = f"{TELEGRAM_API_BASE_URL}{TELEGRAM_BOT_TOKEN}/getUpdates"
 
     try:
-        response = requests.get(url)
+        response = api_client().get(url)
         if response.status_code == 200:
             data = response.json()
             if data['result']:
@@ -328,7 +483,7 @@ if __name__ == '__main__':
         message_content = " ".join(sys.argv[1:])
         # Handle newline characters passed from command line, convert literal \n to actual newline
         message_content = message_content.replace('\\n', '\n')
-        if send_message(message_content):
+        if send_long_message(message_content):
             sys.exit(0)
         else:
             sys.exit(1)
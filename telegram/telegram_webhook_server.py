@@ -6,20 +6,47 @@ Receive Telegram user messages and distribute them to different AI Agent tmux wi
 
 from flask import Flask, request, jsonify
 import json
+import html
 import subprocess
 import time
 import os
 import threading
-import requests
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from config import (
     TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, FLASK_HOST, FLASK_PORT,
     TMUX_SESSION_NAME, TELEGRAM_WEBHOOK_PATH, AGENTS, DEFAULT_ACTIVE_AGENT,
     DEFAULT_CLEANUP_POLICY, CUSTOM_MENU, SCHEDULER_CONF, TEMP_IMAGE_DIR_NAME,
-    COLLABORATION_GROUPS
+    COLLABORATION_GROUPS, DISPATCH_WORKERS, DISPATCH_QUEUE_SIZE,
+    DEDUP_WINDOW, DEDUP_SNAPSHOT, TELEGRAM_API_BASE_URL, TELEGRAM_FILE_BASE_URL,
+    TELEGRAM_INGESTION_MODE, TELEGRAM_POLL_TIMEOUT, COALESCE_WINDOW, COALESCE_MAX_DELAY,
+    MEDIA_GROUP_WINDOW, IMAGE_DOWNLOAD_WORKERS, SPILL_THRESHOLD, INBOX_DIR_NAME,
+    AGENT_QUEUE_MAX, AGENT_QUEUE_POLICY, CONTROL_WORKERS, CONTROL_BUDGET_MS,
+    TMUX_INJECTION_MODE, TMUX_BUFFER_THRESHOLD, AGENT_TRANSPORT, SERVER_WORKERS, OUTPUT_LOG_BYTES,
+    LIVE_TAIL_ENABLED, LIVE_TAIL_INTERVAL, LIVE_TAIL_LINES, LIVE_TAIL_QUIET_SECONDS, LIVE_TAIL_MAX_DURATION,
+    TURN_SETTLE_SECONDS, TURN_MAX_SECONDS, INJECTION_SOCKET, write_config_snapshot
+)
+from telegram_notifier import (
+    send_message, send_long_message, send_message_with_keyboard, send_editable_message, edit_message_text,
+    send_file, api_client
 )
-from telegram_notifier import send_message, send_message_with_keyboard
 from scheduler_manager import SchedulerManager
+from update_queue import UpdateWorkQueue
+from update_dedup import UpdateDeduplicator
+from agent_lanes import AgentLaneRouter, LaneSaturated
+from update_poller import TelegramUpdatePoller
+from state_store import SharedStateStore, ProcessLeaderLock
+from burst_coalescer import BurstCoalescer
+from control_lane import ControlLane, classify_control_command
+from tmux_control import TmuxControlClient
+from pane_readiness import submit_input
+from window_cache import AgentWindowCache
+from agent_transport import TmuxTransport, PtyTransport
+from agent_output import AgentOutputLogs
+from live_tail import LiveTail
+from turn_metrics import TurnTracker
+from injection_service import InjectionService
 
 app = Flask(__name__)
 
@@ -36,15 +63,96 @@ except Exception as e:
     print(f"⚠️ Unable to read Webhook Secret: {e}")
     WEBHOOK_SECRET_TOKEN = None
 
-# User state tracking: {user_id: {'command_template': '...', 'timestamp': ...}}
-USER_STATES = {}
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shared routing state (SQLite WAL): current active Agent and pending menu inputs
+# live here instead of module globals, so every worker process sees the same values
+state_store = SharedStateStore(os.path.join(BASE_DIR, '.shared_state.db'))
+
+# Persistent tmux control-mode connection (one per process, connects on first use)
+tmux_client = TmuxControlClient(TMUX_SESSION_NAME)
+
+# Live windows/panes of the session, invalidated by control-mode window notifications
+window_cache = AgentWindowCache(tmux_client, TMUX_SESSION_NAME)
+
+# How Agents are reached: tmux windows (default) or pseudo-terminals owned by this server
+ENGINE_START_COMMANDS = {
+    'gemini': 'gemini --yolo',
+    'claude': 'claude --permission-mode bypassPermissions'
+}
+
+def agent_start_cmd(agent):
+    """Command that starts an Agent's CLI (start_cmd from config, else by engine)"""
+    return agent.get('start_cmd', ENGINE_START_COMMANDS.get(agent.get('engine', 'claude'), 'python3 main.py'))
 
-# Current active Agent (default to configured default value)
-CURRENT_AGENT = DEFAULT_ACTIVE_AGENT
+if AGENT_TRANSPORT == 'pty':
+    agent_transport = PtyTransport(AGENTS, os.path.join(BASE_DIR, 'agent_home'),
+                                   {a['name']: agent_start_cmd(a) for a in AGENTS})
+else:
+    agent_transport = TmuxTransport(tmux_client, window_cache)
+
+# Everything the Agents print, with byte offsets (answers "what was said since my message")
+output_logs = AgentOutputLogs([a['name'] for a in AGENTS], max_bytes=OUTPUT_LOG_BYTES)
+agent_transport.add_output_listener(output_logs.feed)
+
+# Turn completion per engine + time to first output / time to prompt histograms per Agent
+turn_tracker = TurnTracker(
+    agent_transport,
+    engine_of=lambda name: (get_agent_info(name) or {}).get('engine'),
+    settle_seconds=TURN_SETTLE_SECONDS, max_turn_seconds=TURN_MAX_SECONDS
+)
+
+def mark_prompt_submitted(agent_name):
+    """Called right before a prompt's Enter: output log marker and turn timing start here"""
+    output_logs.mark_injection(agent_name)
+    turn_tracker.begin(agent_name)
+
+# Opt-in live tail: Agent screen streamed into one edited Telegram message after each prompt
+live_tail = LiveTail(
+    agent_transport,
+    send_fn=send_editable_message,
+    edit_fn=edit_message_text,
+    engine_of=lambda name: (get_agent_info(name) or {}).get('engine'),
+    interval=LIVE_TAIL_INTERVAL, lines=LIVE_TAIL_LINES,
+    quiet_seconds=LIVE_TAIL_QUIET_SECONDS, max_duration=LIVE_TAIL_MAX_DURATION
+)
 
-# Global scheduler manager (initialized in main program)
+# Exactly one worker process owns the scheduler (and the poller), elected by file lock
+leader_lock = ProcessLeaderLock(os.path.join(BASE_DIR, '.leader.lock'))
+
+# Written by start_all_services.sh, consumed by the first leader (a re-elected leader finds it gone)
+SERVICE_START_MARKER = os.path.join(BASE_DIR, '.service_start')
+
+# Seconds between leader polls of the shared update inbox (server.workers > 1)
+UPDATE_INBOX_POLL = 0.05
+
+# Global scheduler manager (initialized by the leader process in create_app)
 scheduler = None
 
+# Local injection service for other producers (Unix socket, started by the leader process)
+injection_service = None
+
+# getUpdates poller (only in polling ingestion mode, initialized by the leader process)
+update_poller = None
+
+# Recently seen update_id window (drop Telegram redeliveries before any work happens)
+update_dedup = UpdateDeduplicator(
+    capacity=DEDUP_WINDOW,
+    snapshot_path=os.path.join(BASE_DIR, '.update_dedup.json') if DEDUP_SNAPSHOT else None,
+    shared_store=state_store
+)
+
+def get_current_agent():
+    """Current active Agent (shared by all worker processes)"""
+    return state_store.get('current_agent', DEFAULT_ACTIVE_AGENT)
+
+def set_current_agent(name):
+    state_store.set('current_agent', name)
+
+def live_tail_enabled():
+    """Live tail switch (/live on|off), shared by all worker processes"""
+    return state_store.get('live_tail', 'on' if LIVE_TAIL_ENABLED else 'off') == 'on'
+
 class ImageManager:
     """Image Manager: responsible for downloading, storing and auto-cleanup (supports multi-Agent isolation)"""
 
@@ -57,12 +165,11 @@ class ImageManager:
         try:
             # 1. Ensure Agent's directory structure is correct
             agent_img_dir = os.path.join(self.base_dir, 'agent_home', agent_name, TEMP_IMAGE_DIR_NAME)
-            if not os.path.exists(agent_img_dir):
-                os.makedirs(agent_img_dir)
+            os.makedirs(agent_img_dir, exist_ok=True)
 
             # 2. Get file information (getFile)
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getFile?file_id={file_id}"
-            response = requests.get(url)
+            url = f"{TELEGRAM_API_BASE_URL}{TELEGRAM_BOT_TOKEN}/getFile"
+            response = api_client().get(url, params={'file_id': file_id})
             data = response.json()
 
             if not data.get('ok'):
@@ -72,14 +179,19 @@ class ImageManager:
             file_path = data['result']['file_path']
             file_ext = os.path.splitext(file_path)[1] or ".jpg"
 
-            # 3. Build local filename
+            # 3. Build local filename (file_id prefixes are shared by album items, so use a digest)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{timestamp}_{file_id[:8]}{file_ext}"
+            file_tag = hashlib.sha1(file_id.encode()).hexdigest()[:8]
+            filename = f"{timestamp}_{file_tag}{file_ext}"
             local_path = os.path.join(agent_img_dir, filename)
 
             # 4. Download file content
-            download_url = f"https://api.telegram.org/file/bot{TELEGRAM_BOT_TOKEN}/{file_path}"
-            img_data = requests.get(download_url).content
+            download_url = f"{TELEGRAM_FILE_BASE_URL}{TELEGRAM_BOT_TOKEN}/{file_path}"
+            response = api_client().get(download_url)
+            if response.status_code != 200:
+                print(f"❌ Unable to download image: {response.status_code}")
+                return None
+            img_data = response.content
 
             with open(local_path, 'wb') as f:
                 f.write(img_data)
@@ -91,6 +203,13 @@ class ImageManager:
             print(f"❌ Image download failed: {e}")
             return None
 
+    def download_images(self, file_ids, agent_name):
+        """Download several images concurrently, returns local paths in input order (None for failures)"""
+        if len(file_ids) == 1:
+            return [self.download_image(file_ids[0], agent_name)]
+        with ThreadPoolExecutor(max_workers=min(IMAGE_DOWNLOAD_WORKERS, len(file_ids))) as pool:
+            return list(pool.map(lambda fid: self.download_image(fid, agent_name), file_ids))
+
     def cleanup_old_files(self):
         """Traverse all Agent directories for differential cleanup (called by Scheduler)"""
         print("🧹 [ImageManager] Starting multi-Agent image cleanup task...")
@@ -98,10 +217,6 @@ class ImageManager:
 
         for agent in AGENTS:
             name = agent['name']
-            agent_img_dir = os.path.join(self.base_dir, 'agent_home', name, TEMP_IMAGE_DIR_NAME)
-
-            if not os.path.exists(agent_img_dir):
-                continue
 
             # Read cleanup policy
             policy = agent.get('cleanup_policy', {})
@@ -109,22 +224,44 @@ class ImageManager:
 
             cutoff = time.time() - (retention_days * 86400)
 
-            count = 0
-            for filename in os.listdir(agent_img_dir):
-                file_path = os.path.join(agent_img_dir, filename)
-                if os.path.isfile(file_path) and os.path.getmtime(file_path) < cutoff:
-                    try:
-                        os.remove(file_path)
-                        count += 1
-                    except Exception as e:
-                        print(f"⚠️ Unable to delete [{name}] file {filename}: {e}")
+            # Spilled long messages (inbox) follow the same retention as images
+            for dir_name in (TEMP_IMAGE_DIR_NAME, INBOX_DIR_NAME):
+                self._cleanup_dir(name, os.path.join(self.base_dir, 'agent_home', name, dir_name), cutoff)
 
-            if count > 0:
-                print(f"🧹 Cleaned up {count} expired files for Agent[{name}]")
+    def _cleanup_dir(self, name, target_dir, cutoff):
+        if not os.path.exists(target_dir):
+            return
+
+        count = 0
+        for filename in os.listdir(target_dir):
+            file_path = os.path.join(target_dir, filename)
+            if os.path.isfile(file_path) and os.path.getmtime(file_path) < cutoff:
+                try:
+                    os.remove(file_path)
+                    count += 1
+                except Exception as e:
+                    print(f"⚠️ Unable to delete [{name}] file {filename}: {e}")
+
+        if count > 0:
+            print(f"🧹 Cleaned up {count} expired files for Agent[{name}] ({os.path.basename(target_dir)})")
 
 # Initialize image manager
 image_manager = ImageManager()
 
+def _restore_backlog_job(agent_name, payload):
+    """Turn a spilled lane job back into (fn, args) when it is replayed"""
+    return _inject_to_window, (payload['text'], agent_name)
+
+# Per-agent dispatch lanes: ordered delivery within one window, parallel across windows,
+# capped at agent_queue_max waiting jobs per Agent (agent_queue_policy decides what happens beyond)
+agent_lanes = AgentLaneRouter(
+    [a['name'] for a in AGENTS], lock_dir=os.path.join(BASE_DIR, '.agent_locks'),
+    max_depth=AGENT_QUEUE_MAX, policy=AGENT_QUEUE_POLICY,
+    limits={a['name']: (a.get('queue_max', AGENT_QUEUE_MAX), a.get('queue_policy', AGENT_QUEUE_POLICY))
+            for a in AGENTS},
+    backlog=state_store, restore_fn=_restore_backlog_job
+)
+
 def get_agent_info(name):
     """Get detailed information of specified Agent (case-insensitive)"""
     for agent in AGENTS:
@@ -133,23 +270,81 @@ def get_agent_info(name):
     return None
 
 def check_agent_session(name):
-    """Check if tmux window of specific Agent exists"""
+    """Check if the terminal of specific Agent exists (tmux: in-memory lookup kept current by notifications)"""
     try:
-        # tmux has-session -t session:window
-        result = subprocess.run(
-            ['tmux', 'has-session', '-t', f'{TMUX_SESSION_NAME}:{name}'],
-            capture_output=True
-        )
-        return result.returncode == 0
+        return agent_transport.exists(name)
     except Exception as e:
-        print(f"❌ Failed to check tmux session: {e}")
+        print(f"❌ Failed to check Agent session: {e}")
         return False
 
 def send_to_ai_session(message, agent_name=None):
-    """Send message to specified Agent tmux window (with special character escape support)"""
-    global CURRENT_AGENT
-    target = agent_name or CURRENT_AGENT
+    """Send message to specified Agent window (serialized through the Agent's dispatch lane)"""
+    target = agent_name or get_current_agent()
+    if SPILL_THRESHOLD > 0 and len(message) > SPILL_THRESHOLD:
+        message = spill_to_inbox(message, target)
+    try:
+        return agent_lanes.run(target, _inject_to_window, message, target,
+                               spill_payload={'text': message})
+    except LaneSaturated as e:
+        notify_lane_saturated(e)
+        return False
+
+def inject_from_producer(text, agent_name, source):
+    """Injection service callback: same path (lane, spill, escaping, readiness) as Telegram messages"""
+    return send_to_ai_session(text, agent_name)
+
+def notify_from_agent(request):
+    """Injection service callback for Agent reports (telegram_notifier.py CLI), sent with this process's client"""
+    if request.get('file'):
+        return send_file(request['file'], request.get('file_type') or 'document', request.get('text') or '')
+    return send_long_message(request['text'])
+
+def notify_lane_saturated(e):
+    """Tell the user what happened to a job refused by a full Agent lane"""
+    print(f"🚦 {e}")
+    if e.action == 'spilled':
+        send_message(f"📥 <b>[{e.agent_name}]</b> is busy ({e.depth} queued), message saved to backlog and will be delivered later")
+    elif e.action == 'dropped':
+        send_message(f"🗑 <b>[{e.agent_name}]</b> queue overflow: an older pending message was dropped")
+    else:
+        send_message(f"⏳ <b>[{e.agent_name}]</b> is busy, {e.depth} queued. Message not sent, please retry later")
+
+def spill_to_inbox(message, agent_name):
+    """Write a long message to agent_home/<agent>/inbox/ and return a short pointer prompt
+
+    Typing tens of KB through send-keys is slow, can exceed ARG_MAX and trips
+    CLI paste handling; a fixed-size pointer keeps injection time constant.
+    Falls back to the original message if the file cannot be written.
+    """
+    try:
+        inbox_dir = os.path.join(BASE_DIR, 'agent_home', agent_name, INBOX_DIR_NAME)
+        os.makedirs(inbox_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        digest = hashlib.sha1(message.encode('utf-8')).hexdigest()[:8]
+        file_path = os.path.join(inbox_dir, f"{timestamp}_{digest}.md")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(message)
+    except Exception as e:
+        print(f"⚠️ Unable to spill long message for [{agent_name}], typing it instead: {e}")
+        return message
 
+    print(f"📥 Long message ({len(message)} chars) saved to [{agent_name}] inbox: {file_path}")
+    first_line = message.strip().split('\n', 1)[0][:100]
+    return (f"[Long message: {len(message)} characters, saved to file]\n"
+            f"Please read the full content from: {file_path}\n"
+            f"Begins with: {first_line}")
+
+def select_injection_mode(message):
+    """Pick 'keys' (send-keys -l) or 'buffer' (paste-buffer) according to tmux.injection_mode"""
+    if TMUX_INJECTION_MODE in ('keys', 'buffer'):
+        return TMUX_INJECTION_MODE
+    return 'buffer' if len(message) > TMUX_BUFFER_THRESHOLD else 'keys'
+
+def _inject_to_window(message, target):
+    """Type message into Agent tmux window and submit it (with special character escape support)
+
+    Must only run on the Agent's lane, otherwise text and Enter of concurrent senders interleave.
+    """
     try:
         if not check_agent_session(target):
             send_message(f"❌ Agent '{target}' window not found\nPlease check configuration or run: ./start_all_services.sh")
@@ -159,38 +354,22 @@ def send_to_ai_session(message, agent_name=None):
         # Escape invalid: ! → ！(full-width exclamation mark)
         escaped_message = message.replace('!', '！')
 
-        # 🔧 Use -l (literal mode) to send message, preventing tmux interpreting special characters
-        # This resolves:
-        # - tmux command interpretation (like #{pane_id} etc)
-        # - bash history expansion
-        # - "\n" accidentally triggering paste mode
+        mode = select_injection_mode(escaped_message)
+        # 🔧 buffer: long text is pasted atomically (bracketed paste, the CLI receives it as one paste
+        #    instead of thousands of keystrokes; tmux streams it into a buffer via stdin)
+        # 🔧 keys: typed literally (tmux send-keys -l), preventing tmux interpreting special characters
+        #    like #{pane_id}, bash history expansion and "\n" accidentally triggering paste mode
         # (! → ！ replacement already handled above to prevent Gemini entering special mode)
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}',
-            '-l',       # ← Key: literal mode, no tmux interpretation
-            escaped_message
-        ], check=True)
-
-        # Delay to let message completely enter input buffer
-        time.sleep(0.5)
+        agent_transport.type_text(target, escaped_message, mode)
 
-        # Send first Enter key
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}',
-            'Enter'
-        ], check=True)
-
-        # 🔒 Double insurance: for Agents like Claude that need paste mode confirmation, press Enter again
-        # This ensures long text is sent correctly
-        if target in ['Claude', 'Accelerator', 'Chöd']:  # Claude-based agents
-            time.sleep(0.2)
-            subprocess.run([
-                'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target}',
-                'Enter'
-            ], check=True)
+        # Press Enter as soon as the text shows up in the input box (engine-aware),
+        # and again only while the input box still holds it (e.g. Claude paste confirmation)
+        agent_info = get_agent_info(target) or {}
+        presses = submit_input(agent_transport, target, escaped_message, agent_info.get('engine'),
+                               on_enter=lambda: mark_prompt_submitted(target))
 
         msg_preview = message[:80] + ('...' if len(message) > 80 else '')
-        print(f"📤 Sent to Agent[{target}] (mode: literal): {msg_preview}")
+        print(f"📤 Sent to Agent[{target}] (mode: {mode}, Enter x{presses}): {msg_preview}")
         return True
 
     except Exception as e:
@@ -199,18 +378,18 @@ def send_to_ai_session(message, agent_name=None):
         return False
 
 def capture_ai_response(agent_name=None, delay=3):
-    """Capture response from specific Agent"""
-    target = agent_name or CURRENT_AGENT
+    """Capture response from specific Agent (output since the last prompt, else the screen)"""
+    target = agent_name or get_current_agent()
     try:
         time.sleep(delay)
-        result = subprocess.run([
-            'tmux', 'capture-pane', '-t', f'{TMUX_SESSION_NAME}:{target}', '-p'
-        ], capture_output=True, text=True)
-
-        if result.stdout:
-            lines = result.stdout.strip().split('\n')
-            recent_output = '\n'.join(lines[-15:])
-            send_message(f"💬 <b>[{target}] Latest Response:</b>\n<pre>{recent_output}</pre>")
+        text, _, _ = output_logs.since_last_injection(target)
+        if not text.strip():
+            text = agent_transport.capture(target)
+
+        if text:
+            lines = [line for line in text.strip().split('\n') if line.strip()]
+            recent_output = html.escape('\n'.join(lines[-15:]))
+            send_long_message(f"💬 <b>[{target}] Latest Response:</b>\n<pre>{recent_output}</pre>")
             return True
     except Exception as e:
         print(f"⚠️ Failed to capture {target} output: {e}")
@@ -218,7 +397,7 @@ def capture_ai_response(agent_name=None, delay=3):
 
 @app.route(TELEGRAM_WEBHOOK_PATH, methods=['POST'])
 def telegram_webhook():
-    """Receive Telegram webhook"""
+    """Receive Telegram webhook (validate, enqueue, acknowledge immediately)"""
     try:
         # 1. Security check: verify Secret Token (prevent malicious requests from non-Telegram)
         secret_header = request.headers.get('X-Telegram-Bot-Api-Secret-Token')
@@ -226,85 +405,239 @@ def telegram_webhook():
             print(f"🛑 Reject unauthorized request (Invalid Secret): {secret_header}")
             return jsonify({'status': 'unauthorized'}), 403
 
-        webhook_data = request.get_json()
-        if 'message' in webhook_data:
-            message_data = webhook_data['message']
-
-            # Verify chat_id
-            chat_id = str(message_data.get('chat', {}).get('id', ''))
-            if TELEGRAM_CHAT_ID and chat_id != str(TELEGRAM_CHAT_ID):
-                print(f"⚠️ Unauthorized chat_id: {chat_id}")
-                return jsonify({'status': 'unauthorized'}), 403
-
-            # Get user information
-            user_id = message_data.get('from', {}).get('id', 'unknown')
-            username = message_data.get('from', {}).get('username', 'unknown')
-
-            user_message = None
-
-            # 1. Handle text messages
-            if 'text' in message_data:
-                user_message = message_data['text']
-                # Improvement: log handling for long messages (show first 100 characters to avoid log explosion)
-                msg_preview = user_message[:100] + ('...' if len(user_message) > 100 else '')
-                msg_length = len(user_message)
-                print(f"📨 Received text message (length: {msg_length} chars): {msg_preview} (from: @{username})")
-
-            # 2. Handle photo messages
-            elif 'photo' in message_data:
-                print(f"📸 Received photo message (from: @{username})")
-                photo_array = message_data['photo']
-                best_photo = photo_array[-1]
-                file_id = best_photo['file_id']
-
-                local_path = image_manager.download_image(file_id, CURRENT_AGENT)
-                if local_path:
-                    user_message = (
-                        f"Please process this image, file located at: {local_path}\n"
-                        f"Tasks:\n"
-                        f"1. Describe the main content and scene of the image.\n"
-                        f"2. If the image contains text, please extract key information.\n"
-                        f"3. Summarize the key points of this image."
-                    )
-                    send_message(f"✅ Image received, sending to <b>[{CURRENT_AGENT}]</b> for analysis...")
-                else:
-                    send_message("❌ Image download failed")
-
-            if user_message:
-                handle_user_message(user_message, user_id, username)
+        webhook_data = request.get_json(silent=True)
+        if not isinstance(webhook_data, dict):
+            return jsonify({'status': 'ignored'}), 400
 
-        elif 'callback_query' in webhook_data:
-            callback = webhook_data['callback_query']
-            callback_data = callback.get('data', '')
-            user_id = callback.get('from', {}).get('id', 'unknown')
-            print(f"🔘 Received button click: {callback_data}")
-            handle_callback_query(callback_data, user_id)
-
-        return jsonify({'status': 'success'})
+        status, http_code = accept_update(webhook_data)
+        return jsonify({'status': status}), http_code
 
     except Exception as e:
         print(f"❌ Webhook processing error: {e}")
         return jsonify({'error': str(e)}), 500
 
-def handle_user_message(message, user_id, username):
-    """Handle user message (with Agent switching logic)"""
-    global CURRENT_AGENT
+def accept_update(webhook_data):
+    """Validate, deduplicate and enqueue one update (shared by webhook and long polling)
+
+    Returns:
+        tuple: (status, http_code)
+    """
+    received_at = time.monotonic()
+
+    # 1. Verify chat_id before accepting any work
+    if 'message' in webhook_data:
+        chat_id = str(webhook_data['message'].get('chat', {}).get('id', ''))
+        if TELEGRAM_CHAT_ID and chat_id != str(TELEGRAM_CHAT_ID):
+            print(f"⚠️ Unauthorized chat_id: {chat_id}")
+            return 'unauthorized', 403
+
+    # 2. Drop redelivered updates (Telegram retries after slow responses)
+    update_id = webhook_data.get('update_id')
+    if update_id is not None and update_dedup.check_and_add(update_id):
+        print(f"♻️ Duplicate update_id {update_id} dropped")
+        return 'duplicate', 200
+
+    # 3. Resolve the target Agent in arrival order: a switch takes effect here, so every update
+    # and control command accepted after it (e.g. /interrupt right after /switch) acts on the new Agent
+    message_data = webhook_data.get('message', {})
+    menu_template = state_store.peek_user_state(message_data.get('from', {}).get('id', 'unknown'))
+    agent_name = apply_agent_switch(webhook_data, menu_template)
+
+    # 4. Control commands (/interrupt, /status, /capture) skip every queue,
+    # unless a custom menu is waiting for this user's {input}: then the text is that input
+    control_command = classify_control_command(message_data.get('text'))
+    if control_command and menu_template is None:
+        control_lane.submit(control_command, webhook_data['message']['text'].strip(), received_at, agent_name)
+        return 'success', 200
+
+    # 5. Hand over to worker pool; tmux/download/sleep work never blocks the caller
+    if not enqueue_update(webhook_data, agent_name):
+        # Non-2xx makes Telegram redeliver later instead of losing the update
+        if update_id is not None:
+            update_dedup.forget(update_id)
+        return 'busy', 503
+
+    return 'success', 200
+
+def enqueue_update(webhook_data, agent_name):
+    """Queue an accepted update for processing, returns False when the queue is full
+
+    Keyed by target Agent: one Agent's updates stay in order (e.g. a menu press, then its {input}),
+    while a slow injection into one Agent does not hold up updates for the others.
+    With several worker processes, every process appends to the shared update inbox and only
+    the leader feeds its pool from it, so album items and bursts are never split across processes.
+    """
+    if SERVER_WORKERS > 1:
+        if state_store.update_inbox_count() >= DISPATCH_QUEUE_SIZE:
+            print(f"⚠️ [updates] Update inbox full ({DISPATCH_QUEUE_SIZE}), item rejected", flush=True)
+            return False
+        state_store.push_update(webhook_data, agent_name)
+        return True
+    return update_queue.submit((webhook_data, agent_name), key=agent_name)
+
+def _update_inbox_loop():
+    """Leader: move updates accepted by any worker process into this process's pool, in arrival order"""
+    while True:
+        try:
+            room = DISPATCH_QUEUE_SIZE - update_queue.stats()['depth']
+            if room > 0:
+                for webhook_data, agent_name in state_store.pop_updates(room):
+                    update_queue.submit((webhook_data, agent_name), key=agent_name)
+        except Exception as e:
+            print(f"❌ [updates] Inbox relay error: {e}", flush=True)
+        time.sleep(UPDATE_INBOX_POLL)
+
+def apply_agent_switch(webhook_data, menu_template=None):
+    """Apply an Agent switch carried by an update, returns the Agent the update is for
+
+    Covers /switch <name> (typed, behind a menu label or as a pending {input} menu command)
+    and the sw_<name> button. The worker later only confirms the switch to the user.
+    """
+    if 'callback_query' in webhook_data:
+        callback_data = webhook_data['callback_query'].get('data') or ''
+        found_agent = get_agent_info(callback_data[3:]) if callback_data.startswith('sw_') else None
+    else:
+        text = (webhook_data.get('message', {}).get('text') or '').strip()
+        if menu_template is not None:
+            text = menu_template.replace('{input}', text)
+        else:
+            menu_item = find_menu_item(text)
+            if isinstance(menu_item, dict):
+                text = menu_item.get('command', '')
+        parts = text.split()
+        found_agent = get_agent_info(parts[1]) if text.startswith('/switch') and len(parts) > 1 else None
+
+    if found_agent:
+        set_current_agent(found_agent['name'])
+        return found_agent['name']
+    return get_current_agent()
+
+def poll_update(update):
+    """Long polling handler: same path as webhook, but wait for queue room instead of refusing"""
+    while accept_update(update)[0] == 'busy':
+        time.sleep(0.5)
+
+def process_update(webhook_data, agent_name):
+    """Process one Telegram update for the Agent resolved at ingestion (runs on update queue worker)"""
+    if 'message' in webhook_data:
+        message_data = webhook_data['message']
+
+        # Get user information
+        user_id = message_data.get('from', {}).get('id', 'unknown')
+        username = message_data.get('from', {}).get('username', 'unknown')
+
+        user_message = None
+
+        # 1. Handle text messages
+        if 'text' in message_data:
+            user_message = message_data['text']
+            # Improvement: log handling for long messages (show first 100 characters to avoid log explosion)
+            msg_preview = user_message[:100] + ('...' if len(user_message) > 100 else '')
+            msg_length = len(user_message)
+            print(f"📨 Received text message (length: {msg_length} chars): {msg_preview} (from: @{username})")
+
+        # 2. Handle photo messages
+        elif 'photo' in message_data:
+            photo_array = message_data['photo']
+            best_photo = photo_array[-1]
+            file_id = best_photo['file_id']
+            caption = message_data.get('caption', '')
+
+            # Album item: collect the whole media group, then download in parallel and send one prompt
+            media_group_id = message_data.get('media_group_id')
+            if media_group_id:
+                print(f"📸 Received album photo (group {media_group_id}, from: @{username})")
+                media_group_collector.add(media_group_id, {
+                    'file_id': file_id, 'caption': caption, 'agent': agent_name,
+                    'user_id': user_id, 'username': username
+                })
+                return
+
+            print(f"📸 Received photo message (from: @{username})")
+            local_path = image_manager.download_image(file_id, agent_name)
+            if local_path:
+                user_message = build_image_prompt([local_path], caption)
+                send_message(f"✅ Image received, sending to <b>[{agent_name}]</b> for analysis...")
+            else:
+                send_message("❌ Image download failed")
+
+        if user_message:
+            handle_user_message(user_message, user_id, username, agent_name)
+
+    elif 'callback_query' in webhook_data:
+        callback = webhook_data['callback_query']
+        callback_data = callback.get('data', '')
+        user_id = callback.get('from', {}).get('id', 'unknown')
+        print(f"🔘 Received button click: {callback_data}")
+        handle_callback_query(callback_data, user_id, agent_name)
+
+def build_image_prompt(local_paths, caption=''):
+    """Build analysis prompt for one or more downloaded images"""
+    if len(local_paths) == 1:
+        prompt = (
+            f"Please process this image, file located at: {local_paths[0]}\n"
+            f"Tasks:\n"
+            f"1. Describe the main content and scene of the image.\n"
+            f"2. If the image contains text, please extract key information.\n"
+            f"3. Summarize the key points of this image."
+        )
+    else:
+        path_list = "\n".join(f"{i}. {path}" for i, path in enumerate(local_paths, 1))
+        prompt = (
+            f"Please process these {len(local_paths)} images (sent together as one album), files located at:\n"
+            f"{path_list}\n"
+            f"Tasks:\n"
+            f"1. Describe the main content and scene of each image.\n"
+            f"2. If the images contain text, please extract key information.\n"
+            f"3. Summarize the key points of the album as a whole."
+        )
+    if caption:
+        prompt += f"\n\nUser caption: {caption}"
+    return prompt
+
+def flush_media_group(media_group_id, items):
+    """All items of an album have arrived: download concurrently and inject one prompt"""
+    agent_name = items[0]['agent']
+    caption = next((item['caption'] for item in items if item['caption']), '')
+    local_paths = [p for p in image_manager.download_images([item['file_id'] for item in items], agent_name) if p]
+
+    if not local_paths:
+        send_message("❌ Image download failed")
+        return
+    failed = len(items) - len(local_paths)
+    failed_info = f" ({failed} failed)" if failed else ""
+    send_message(f"✅ Album of {len(local_paths)} images received{failed_info}, sending to <b>[{agent_name}]</b> for analysis...")
+    # Straight to the Agent the album was sent to (the active Agent may have changed meanwhile,
+    # and the prompt must not be taken as a pending menu input)
+    prompt_coalescer.add(agent_name, build_image_prompt(local_paths, caption), coalesce_windows.get(agent_name))
+
+# Album collector: Telegram delivers each album item as its own update sharing media_group_id
+media_group_collector = BurstCoalescer(flush_media_group, window=MEDIA_GROUP_WINDOW, max_delay=MEDIA_GROUP_WINDOW * 5)
+
+# Update work queue (acknowledge-then-process, started in main program)
+update_queue = UpdateWorkQueue(lambda item: process_update(*item), workers=DISPATCH_WORKERS, maxsize=DISPATCH_QUEUE_SIZE)
+
+def handle_user_message(message, user_id, username, agent_name):
+    """Handle user message for agent_name, the Agent resolved at ingestion (switches are applied there)"""
     timestamp = datetime.now().strftime('%H:%M:%S')
 
     # 1. User state handling (custom menu input)
-    if user_id in USER_STATES:
-        state = USER_STATES[user_id]
+    state = state_store.pop_user_state(user_id)
+    if state:
         final_command = state['command_template'].replace('{input}', message)
-        del USER_STATES[user_id]
 
         send_message(f"✅ Input received, execute command: {final_command}")
 
         # Key fix: recursively call itself, giving the system a chance to intercept special commands (like /switch, /inspect)
         # instead of directly send_to_ai_session
-        handle_user_message(final_command, user_id, username)
+        handle_user_message(final_command, user_id, username, agent_name)
         return
 
     # 2. Special command handling (highest priority)
+    # Deliver any buffered burst first so it is not overtaken by the command
+    if message.startswith('/'):
+        prompt_coalescer.flush(agent_name)
+
     # A. Agent switching command
     if message.startswith('/switch'):
         parts = message.split()
@@ -314,8 +647,8 @@ def handle_user_message(message, user_id, username):
             found_agent = next((a for a in AGENTS if a['name'].lower() == target_input), None)
 
             if found_agent:
-                CURRENT_AGENT = found_agent['name'] # Use original defined name (like "Güpa")
-                send_message(f"⚡ <b>Dialog switched successfully</b>\nCurrent active Agent: <code>{CURRENT_AGENT}</code>")
+                # Already made active at ingestion (apply_agent_switch), in arrival order
+                send_message(f"⚡ <b>Dialog switched successfully</b>\nCurrent active Agent: <code>{found_agent['name']}</code>")
             else:
                 send_message(f"❌ Agent not found: <code>{parts[1]}</code>\nPlease enter <code>/status</code> to view available list.")
         else:
@@ -334,31 +667,29 @@ def handle_user_message(message, user_id, username):
         show_control_menu()
         return
     elif message.lower() in ['/interrupt', '/stop', '停止', '中断']:
-        try:
-            subprocess.run(['tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{CURRENT_AGENT}', 'C-c'], check=True)
-            send_message(f"🛑 Sent interrupt signal (Ctrl+C) to <b>[{CURRENT_AGENT}]</b>")
-        except Exception as e:
-            send_message(f"❌ Interrupt failed: {e}")
+        interrupt_agent(agent_name)
+        return
+    elif message.lower().startswith('/live'):
+        parts = message.lower().split()
+        if len(parts) > 1 and parts[1] in ('on', 'off'):
+            state_store.set('live_tail', parts[1])
+        state = "🟢 on" if live_tail_enabled() else "⚪ off"
+        send_message(f"📡 Live tail: <b>{state}</b>\nAgent output after each message is shown in one continuously updated message. Use <code>/live on</code> or <code>/live off</code>")
         return
     elif message.lower() in ['/clear', '清除']:
-        send_to_ai_session('/clear')
-        send_message(f"🧹 Cleared screen and memory of <b>[{CURRENT_AGENT}]</b>")
+        send_to_ai_session('/clear', agent_name)
+        send_message(f"🧹 Cleared screen and memory of <b>[{agent_name}]</b>")
         return
     elif message.lower() in ['/resume_latest', '恢复记忆']:
         # Auto-restore recent memory
         # Process: send /resume -> wait for menu -> send Enter (select default/latest)
+        # The whole sequence runs as one lane job so no other message lands between /resume and Enter
+        target = agent_name
         try:
-            print(f"⏳ [DEBUG] Starting memory restoration for {CURRENT_AGENT}...")
-            send_to_ai_session('/resume')
-
-            print(f"⏳ [DEBUG] Waiting 3 seconds for list to load...")
-            time.sleep(3) # Wait for CLI to load Session list
-
-            # Send Enter to confirm selection (use CURRENT_AGENT to replace non-existent function)
-            print(f"⏳ [DEBUG] Sending Enter key to {CURRENT_AGENT}")
-            subprocess.run(['tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{CURRENT_AGENT}', 'Enter'], check=True)
-
-            send_message(f"🧠 Attempted to restore <b>[{CURRENT_AGENT}]</b> most recent conversation memory, if no response please run 'Reset'")
+            agent_lanes.run(target, resume_latest_sequence, target)
+            send_message(f"🧠 Attempted to restore <b>[{target}]</b> most recent conversation memory, if no response please run 'Reset'")
+        except LaneSaturated as e:
+            notify_lane_saturated(e)
         except Exception as e:
             print(f"❌ [DEBUG] Memory restoration failed: {e}")
             send_message(f"❌ Memory restoration failed: {e}")
@@ -375,8 +706,8 @@ def handle_user_message(message, user_id, username):
                 f"Find tmux session '{TMUX_SESSION_NAME}' via tmux, enter '{target}' window, view first 50 lines of message status, and analyze if it's working normally.\n\n"
                 f"【System Prompt】This command is from Telegram user, after task completion you must execute `python3 telegram_notifier.py 'your response...'` to report result."
             )
-            send_to_ai_session(prompt)
-            send_message(f"🔍 Assigned <b>[{CURRENT_AGENT}]</b> to check status of <b>[{target}]</b>...")
+            send_to_ai_session(prompt, agent_name)
+            send_message(f"🔍 Assigned <b>[{agent_name}]</b> to check status of <b>[{target}]</b>...")
         else:
             send_message("❌ Please specify the Agent name to check, for example: `/inspect claude`")
         return
@@ -389,11 +720,11 @@ def handle_user_message(message, user_id, username):
             target_agent = get_agent_info(target_name)
             if target_agent:
                 send_message(f"⚡ Starting automatic recovery for <b>[{target_name}]</b>...")
-                # Launch in background thread to avoid blocking
-                import threading
-                thread = threading.Thread(target=awake_agent, args=(target_name, target_agent))
-                thread.daemon = True
-                thread.start()
+                # Queue on the target's lane (non-blocking): recovery keystrokes never interleave with prompts
+                try:
+                    agent_lanes.submit(target_agent['name'], awake_agent, target_agent['name'], target_agent)
+                except LaneSaturated as e:
+                    notify_lane_saturated(e)
             else:
                 send_message(f"❌ Agent not found in configuration: {target_name}")
         else:
@@ -425,8 +756,8 @@ def handle_user_message(message, user_id, username):
                     f"tmux send-keys -t target your message content && sleep 1 && tmux send-keys -t target Enter\n\n"
                     f"【System Prompt】This command is from Telegram user, after task completion you must execute `python3 telegram_notifier.py 'your response...'` to report result."
                 )
-                send_to_ai_session(prompt)
-                send_message(f"🚑 Assigned <b>[{CURRENT_AGENT}]</b> to fix <b>[{target_name}]</b>...")
+                send_to_ai_session(prompt, agent_name)
+                send_message(f"🚑 Assigned <b>[{agent_name}]</b> to fix <b>[{target_name}]</b>...")
             else:
                 send_message(f"❌ Agent not found in configuration: {target_name}")
         else:
@@ -435,91 +766,58 @@ def handle_user_message(message, user_id, username):
 
     # Format: /capture [target_agent]
     elif message.startswith('/capture'):
-        parts = message.split()
-        if len(parts) > 1:
-            target = parts[1]
-            if check_agent_session(target):
-                try:
-                    # Capture tmux pane content
-                    result = subprocess.run(
-                        ['tmux', 'capture-pane', '-t', f'{TMUX_SESSION_NAME}:{target}', '-p'],
-                        capture_output=True, text=True, timeout=5
-                    )
-
-                    if result.returncode == 0:
-                        output_lines = result.stdout.split('\n')
-                        # Take last 100 lines
-                        captured_lines = output_lines[-100:] if len(output_lines) > 100 else output_lines
-                        captured_content = '\n'.join(captured_lines).strip()
-
-                        # Split into multiple messages to send (avoid Telegram limit)
-                        msg_chunks = []
-                        current_chunk = ""
-                        for line in captured_lines:
-                            if len(current_chunk) + len(line) + 1 > 4000:  # Telegram message limit
-                                if current_chunk:
-                                    msg_chunks.append(current_chunk)
-                                current_chunk = line
-                            else:
-                                current_chunk += line + '\n'
-                        if current_chunk:
-                            msg_chunks.append(current_chunk)
-
-                        # Send screenshot
-                        send_message(f"📸 <b>[{target}]</b> Screen capture (last 100 lines)\n<code>{msg_chunks[0]}</code>" if msg_chunks else f"❌ [{target}] screen is empty")
-
-                        # If more chunks, continue sending
-                        for chunk in msg_chunks[1:]:
-                            time.sleep(0.3)
-                            send_message(f"<code>{chunk}</code>")
-                    else:
-                        send_message(f"❌ Unable to capture [{target}]: {result.stderr}")
-                except subprocess.TimeoutExpired:
-                    send_message(f"⏱️ Capture timeout [{target}]")
-                except Exception as e:
-                    send_message(f"❌ Capture failed [{target}]: {str(e)}")
-            else:
-                send_message(f"❌ Agent '{target}' window not found")
-        else:
-            send_message("❌ Please specify the Agent name to capture, for example: `/capture Güpa20`")
+        capture_agent_screen(message)
         return
 
     # 3. Check if it's a custom menu label
-    matched_menu_item = None
-    for row in CUSTOM_MENU:
-        for item in row:
-            label = item.get('label') if isinstance(item, dict) else item
-            if message == label:
-                matched_menu_item = item
-                break
-        if matched_menu_item: break
-
+    matched_menu_item = find_menu_item(message)
     if matched_menu_item:
         command = matched_menu_item.get('command', '')
         if '{input}' in command:
-            USER_STATES[user_id] = {'command_template': command, 'timestamp': datetime.now()}
+            state_store.set_user_state(user_id, command)
             send_message(matched_menu_item.get('prompt', 'Please enter content:'))
         else:
             # Recursively process menu command (handle possible /status etc)
-            handle_user_message(command, user_id, username)
+            handle_user_message(command, user_id, username, agent_name)
         return
 
     # 4. General message forwarding
+    # Buffered per Agent: messages sent in quick succession become one injection (one LLM turn)
+    prompt_coalescer.add(agent_name, message, coalesce_windows.get(agent_name))
+
+def find_menu_item(label):
+    """Custom menu item whose label is exactly label, or None"""
+    for row in CUSTOM_MENU:
+        for item in row:
+            if label == (item.get('label') if isinstance(item, dict) else item):
+                return item
+    return None
+
+def flush_prompt_burst(agent_name, messages):
+    """Inject a coalesced burst of user messages with a single System Prompt suffix"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
     # Append forced reporting hint to ensure AI knows this is an external command needing response
     system_prompt = "\n\n【System Prompt】This command is from Telegram user, after task completion you must execute `python3 telegram_notifier.py 'your response...'` to report result."
-    final_message = message + system_prompt
+    final_message = "\n\n".join(messages) + system_prompt
 
-    success = send_to_ai_session(final_message)
+    success = send_to_ai_session(final_message, agent_name)
     if success:
-        send_message(f"🐙 <b>[{timestamp}]</b> > Matrix Connected :: <b>[{CURRENT_AGENT}]</b>")
+        merged_info = f" ({len(messages)} messages merged)" if len(messages) > 1 else ""
+        send_message(f"🐙 <b>[{timestamp}]</b> > Matrix Connected :: <b>[{agent_name}]</b>{merged_info}")
+        if live_tail_enabled():
+            live_tail.start(agent_name)
+
+# Burst coalescing of consecutive plain messages (debounce window per Agent, override: coalesce_window)
+prompt_coalescer = BurstCoalescer(flush_prompt_burst, window=COALESCE_WINDOW, max_delay=COALESCE_MAX_DELAY)
+coalesce_windows = {a['name']: float(a.get('coalesce_window', COALESCE_WINDOW)) for a in AGENTS}
 
-def handle_callback_query(callback_data, user_id):
-    """Handle button callback"""
-    global CURRENT_AGENT
+def handle_callback_query(callback_data, user_id, agent_name):
+    """Handle button callback (sw_ switches were applied at ingestion, agent_name is the new Agent)"""
     if callback_data.startswith('sw_'):
-        target = callback_data.replace('sw_', '')
-        CURRENT_AGENT = target
-        send_message(f"⚡ <b>Dialog switched successfully</b>\nCurrent active Agent: <code>{target}</code>")
+        if get_agent_info(callback_data[3:]):
+            send_message(f"⚡ <b>Dialog switched successfully</b>\nCurrent active Agent: <code>{agent_name}</code>")
+        else:
+            send_message(f"❌ Agent not found: <code>{html.escape(callback_data[3:])}</code>")
     elif callback_data == 'system_status':
         check_system_status()
     elif callback_data == 'help':
@@ -537,132 +835,134 @@ def show_agent_selector():
     msg = f"🤖 <b>Please select Agent to switch to</b>\nFormat: <code>/switch [name]</code>\n\nAvailable list:\n{agent_list}"
     send_message(msg)
 
-def wait_for_agent_prompt(target_name, engine, max_wait=30):
-    """Wait for tmux pane to show corresponding CLI prompt
+def resume_latest_sequence(target):
+    """/resume -> wait for session list -> Enter (runs on the Agent's lane)"""
+    print(f"⏳ [DEBUG] Starting memory restoration for {target}...")
+    _inject_to_window('/resume', target)
 
-    Args:
-        engine: 'claude' or 'gemini'
-        - claude → ❯ prompt marker
-        - gemini → * or > at start of line
-    """
-    start_time = time.time()
+    print(f"⏳ [DEBUG] Waiting 3 seconds for list to load...")
+    time.sleep(3) # Wait for CLI to load Session list
 
-    while time.time() - start_time < max_wait:
-        try:
-            result = subprocess.run(
-                ['tmux', 'capture-pane', '-t', f'{TMUX_SESSION_NAME}:{target_name}', '-p'],
-                capture_output=True, text=True, timeout=5
-            )
-            output = result.stdout
-            if not output:
-                time.sleep(0.5)
-                continue
-
-            lines = output.split('\n')
-
-            if engine == 'claude':
-                # Claude prompt: check for ❯ marker in output
-                if '❯' in output:
-                    return True
-            else:  # gemini
-                # Gemini prompt: * or > at the start of a line (check multiple last lines)
-                for line in reversed(lines[-5:]):  # Check last 5 lines
-                    stripped = line.strip()
-                    if stripped.startswith('*') or stripped.startswith('>'):
-                        return True
-        except Exception as e:
-            pass
+    # Send Enter to confirm selection
+    print(f"⏳ [DEBUG] Sending Enter key to {target}")
+    agent_transport.send_key(target, 'Enter')
 
-        time.sleep(0.5)
+def wait_for_agent_prompt(target_name, engine, max_wait=30):
+    """Wait for the Agent screen to show corresponding CLI prompt (woken by Agent output, no fixed polling)
 
-    return False
+    Args:
+        engine: 'claude' or 'gemini' (prompt and busy markers: ENGINE_PROFILES in pane_readiness.py)
+    """
+    try:
+        return turn_tracker.wait_for_prompt(target_name, engine, max_wait)
+    except Exception as e:
+        print(f"⚠️ Failed to wait for {target_name} prompt: {e}")
+        return False
 
 def awake_agent(target_name, target_agent):
     """Automatically recover a faulty Agent with precise timing control"""
     try:
-        # Determine startup command based on agent engine type
         engine = target_agent.get('engine', 'claude')
-        engine_cmd_map = {
-            'gemini': 'gemini --yolo',
-            'claude': 'claude --permission-mode bypassPermissions'
-        }
-        start_cmd = target_agent.get('start_cmd', engine_cmd_map.get(engine, 'python3 main.py'))
-
-        send_message(f"📍 [Step 1/6] Entering {target_name} tmux window...")
-
-        # Step 1: Send /quit command
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            '/quit'
-        ], check=True)
-        time.sleep(1)
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'Enter'
-        ], check=True)
-        time.sleep(3)
+        start_cmd = agent_start_cmd(target_agent)
 
-        send_message(f"📍 [Step 2/6] Verifying shell return with pwd...")
+        # Step 1: /quit, verify shell return with pwd, run the startup command
+        # (pty transport: the CLI process is terminated and spawned again)
+        send_message(f"📍 [Step 1/4] Restarting {target_name} CLI with: {start_cmd}...")
+        agent_transport.restart_cli(target_name, start_cmd)
 
-        # Step 2: Verify with pwd
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'pwd'
-        ], check=True)
-        time.sleep(1)
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'Enter'
-        ], check=True)
-        time.sleep(2)
-
-        send_message(f"📍 [Step 3/6] Executing startup command: {start_cmd}...")
-
-        # Step 3: Restart Agent
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            start_cmd
-        ], check=True)
-        time.sleep(1)
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'Enter'
-        ], check=True)
-
-        send_message(f"📍 [Step 4/6] Waiting for {engine} CLI prompt to appear...")
+        send_message(f"📍 [Step 2/4] Waiting for {engine} CLI prompt to appear...")
         if wait_for_agent_prompt(target_name, engine, max_wait=60):
             send_message(f"✅ Detected {engine} prompt - startup successful")
         else:
             send_message(f"⚠️ Timeout waiting for {engine} prompt, continuing with recovery...")
 
-        send_message(f"📍 [Step 5/6] Restoring conversation with /resume...")
+        send_message(f"📍 [Step 3/4] Restoring conversation with /resume...")
 
-        # Step 5: Resume conversation
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            '/resume'
-        ], check=True)
+        # Step 3: Resume conversation
+        agent_transport.type_text(target_name, '/resume')
         time.sleep(1)
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'Enter'
-        ], check=True)
+        agent_transport.send_key(target_name, 'Enter')
         time.sleep(3)
 
-        subprocess.run([
-            'tmux', 'send-keys', '-t', f'{TMUX_SESSION_NAME}:{target_name}',
-            'Enter'
-        ], check=True)
+        agent_transport.send_key(target_name, 'Enter')
         time.sleep(2)
 
-        send_message(f"✅ [Step 6/6] Agent <b>{target_name}</b> awakened successfully! Ready to use.")
+        send_message(f"✅ [Step 4/4] Agent <b>{target_name}</b> awakened successfully! Ready to use.")
 
     except subprocess.CalledProcessError as e:
         send_message(f"❌ Awake failed at step: {str(e)}")
     except Exception as e:
         send_message(f"❌ Error during awake process: {str(e)}")
 
-def check_system_status():
+def interrupt_agent(target, received_at=None):
+    """Send Ctrl+C to the target Agent window (control command, never queued behind prompts)"""
+    try:
+        agent_transport.send_key(target, 'C-c')
+        if received_at is not None:
+            control_lane.mark_action('/interrupt', received_at)
+        send_message(f"🛑 Sent interrupt signal (Ctrl+C) to <b>[{target}]</b>")
+    except Exception as e:
+        send_message(f"❌ Interrupt failed: {e}")
+
+def capture_agent_screen(message, received_at=None):
+    """Handle /capture [target_agent]: send the last 100 lines of the Agent window"""
+    parts = message.split()
+    if len(parts) < 2:
+        send_message("❌ Please specify the Agent name to capture, for example: `/capture Güpa20`")
+        return
+    target = parts[1]
+    if check_agent_session(target):
+        try:
+            # Capture Agent screen content
+            screen = agent_transport.capture(target)
+            if received_at is not None:
+                control_lane.mark_action('/capture', received_at)
+
+            if screen is not None:
+                # Take last 100 lines
+                captured_content = '\n'.join(screen.split('\n')[-100:]).strip()
+
+                # Send screenshot (split into balanced <code> parts beyond Telegram's limit)
+                if captured_content:
+                    send_long_message(f"📸 <b>[{target}]</b> Screen capture (last 100 lines)\n"
+                                      f"<code>{html.escape(captured_content)}</code>")
+                else:
+                    send_message(f"❌ [{target}] screen is empty")
+            else:
+                send_message(f"❌ Unable to capture [{target}]")
+        except subprocess.TimeoutExpired:
+            send_message(f"⏱️ Capture timeout [{target}]")
+        except Exception as e:
+            send_message(f"❌ Capture failed [{target}]: {str(e)}")
+    else:
+        send_message(f"❌ Agent '{target}' window not found")
+
+def handle_control_command(command, message, received_at, agent_name):
+    """Run a control command on the control lane (bypasses update queue, coalescer and agent lanes)
+
+    agent_name is the active Agent at ingestion, so earlier switches are already applied.
+    """
+    print(f"⚡ [Control] {command} ({(time.monotonic() - received_at) * 1000:.0f}ms after ingestion)")
+    if command == '/interrupt':
+        interrupt_agent(agent_name, received_at)
+    elif command == '/capture':
+        capture_agent_screen(message, received_at)
+    elif command == '/status':
+        check_system_status(received_at)
+
+# Control lane: dedicated executor for time-critical commands
+control_lane = ControlLane(handle_control_command, workers=CONTROL_WORKERS, budget_ms=CONTROL_BUDGET_MS)
+
+def format_idle(seconds):
+    if seconds is None:
+        return "?"
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+def check_system_status(received_at=None):
     """Check system status (Multi-Agent Edition)"""
     try:
         # 0. Create role reference table
@@ -673,7 +973,12 @@ def check_system_status():
                 # Display complete role description (no length limit)
                 agent_role_map[member] = f"[{grp.get('name')}] {role}"
 
-        # 1. Agent status
+        # 1. Agent status (tmux: one call for every window)
+        current_agent = get_current_agent()
+        session_running, windows = agent_transport.probe([a['name'] for a in AGENTS])
+        if received_at is not None:
+            control_lane.mark_action('/status', received_at)
+        turn_stats = turn_tracker.stats()
         agent_status_list = []
         for agent in AGENTS:
             name = agent['name']
@@ -681,17 +986,28 @@ def check_system_status():
             engine = agent['engine']
             role_info = f"\n      └ {agent_role_map[name]}" if name in agent_role_map else ""
 
-            is_active = " (⭐ active)" if name == CURRENT_AGENT else ""
-            status_icon = "🟢" if check_agent_session(name) else "🔴"
+            is_active = " (⭐ active)" if name == current_agent else ""
+            window = windows.get(name)
+            if window is None:
+                status_icon, pane_info = "🔴", ""
+            elif window['dead']:
+                status_icon, pane_info = "💀", "\n      └ Pane is dead"
+            elif window['cli_exited']:
+                status_icon, pane_info = "🟡", f"\n      └ CLI not running (pane at {window['command']})"
+            else:
+                status_icon, pane_info = "🟢", f"\n      └ {window['command']}, idle {format_idle(window['idle_s'])}"
+            turns = turn_stats.get(name, {}).get('time_to_prompt', {})
+            if turns.get('count'):
+                pane_info += f"\n      └ Turn time p50 ≤{turns['p50_s']}s, p95 ≤{turns['p95_s']}s ({turns['count']} turns)"
 
-            agent_status_list.append(f"{status_icon} <b>[{name}]</b> {desc} ({engine}){is_active}{role_info}")
+            agent_status_list.append(f"{status_icon} <b>[{name}]</b> {desc} ({engine}){is_active}{role_info}{pane_info}")
 
         agents_info = "\n".join(agent_status_list)
 
         # 2. Schedule status (Real-time query)
         scheduler_list = []
-        if scheduler:
-            scheduler_data = scheduler.list_jobs()
+        scheduler_data = list_scheduler_jobs()
+        if scheduler_data:
             for job in scheduler_data.get('jobs', []):
                 job_id = job.get('id', '?')
                 trigger_str = job.get('trigger', '?')
@@ -709,9 +1025,21 @@ def check_system_status():
 
         scheduler_info = "\n".join(scheduler_list) if scheduler_list else "• No enabled tasks"
 
-        # 3. tmux status
-        result = subprocess.run(['tmux', 'list-sessions'], capture_output=True, text=True)
-        session_info = "Running" if TMUX_SESSION_NAME in result.stdout else "Session not started"
+        # 3. Update queue status
+        queue_stats = update_queue.stats()
+        queue_info = (f"{queue_stats['depth']}/{queue_stats['maxsize']} queued, "
+                      f"{queue_stats['busy_workers']}/{queue_stats['workers']} workers busy")
+        lane_stats = agent_lanes.stats().values()
+        lanes_info = (f"{sum(l['depth'] for l in lane_stats)} queued, "
+                      f"{sum(l['admission']['rejected'] for l in lane_stats)} rejected / "
+                      f"{sum(l['admission']['dropped'] for l in lane_stats)} dropped / "
+                      f"{sum(l['admission']['spilled'] for l in lane_stats)} spilled")
+
+        # 4. tmux status
+        if AGENT_TRANSPORT == 'pty':
+            session_info = "Not used (Agents on server-owned PTYs)"
+        else:
+            session_info = "Running" if session_running else "Session not started"
 
         status_message = f"""
 📊 <b>Chat Agent Matrix Status Report</b>
@@ -724,6 +1052,8 @@ def check_system_status():
 
 📺 <b>System Status:</b>
 • tmux Session: {session_info}
+• Update Queue: {queue_info}
+• Agent Lanes: {lanes_info}
 • Telegram API: 🟢 Normal
 • Check time: {datetime.now().strftime('%H:%M:%S')}
 
@@ -738,7 +1068,7 @@ def show_help():
     help_message = f"""
 📖 <b>Chat Agent Matrix - Complete Feature Guide</b>
 
-<b>🎯 Current Focused Agent:</b> <code>{CURRENT_AGENT}</code>
+<b>🎯 Current Focused Agent:</b> <code>{get_current_agent()}</code>
 
 ───────────────────────────────
 
@@ -755,6 +1085,7 @@ def show_help():
 • <code>/inspect [agent]</code> - Deep check specified Agent's tmux session
 • <code>/capture [agent]</code> - Capture specified Agent's window content (last 100 lines)
 • <code>/interrupt</code> or <code>/stop</code> - Interrupt current Agent execution (Ctrl+C)
+• <code>/live on|off</code> - Stream Agent output into one live-updated message after each message
 • <code>/clear</code> - Clear current Agent window and memory
 
 ───────────────────────────────
@@ -780,7 +1111,7 @@ def show_help():
 
 def show_control_menu():
     """Display control menu (based on config.py customization)"""
-    menu_message = f"🎮 <b>System Control Menu</b> (Active: {CURRENT_AGENT})\n\nPlease select operation:"
+    menu_message = f"🎮 <b>System Control Menu</b> (Active: {get_current_agent()})\n\nPlease select operation:"
     keyboard = []
     for row in CUSTOM_MENU:
         keyboard_row = []
@@ -793,77 +1124,213 @@ def show_control_menu():
 @app.route('/status', methods=['GET'])
 def api_status():
     """API status check endpoint"""
-    agents_summary = {a['name']: check_agent_session(a['name']) for a in AGENTS}
+    session_running, windows = agent_transport.probe([a['name'] for a in AGENTS])
+    agents_summary = {name: dict(window, running=not window['dead']) if window else {'running': False}
+                      for name, window in windows.items()}
     return jsonify({
         'status': 'ok',
-        'active_agent': CURRENT_AGENT,
+        'active_agent': get_current_agent(),
         'agents': agents_summary,
         'tmux_session': TMUX_SESSION_NAME,
+        'tmux_session_running': session_running,
+        'update_queue': update_queue.stats(),
+        'update_inbox': state_store.update_inbox_count() if SERVER_WORKERS > 1 else None,
+        'update_dedup': update_dedup.stats(),
+        'agent_lanes': agent_lanes.stats(),
+        'control_lane': control_lane.stats(),
+        'agent_transport': agent_transport.stats(),
+        'output_logs': output_logs.stats(),
+        'live_tail': live_tail.stats(),
+        'turn_metrics': turn_tracker.stats(),
+        'injection_service': injection_service.stats() if injection_service else None,
+        'bot_api': api_client().stats(),
+        'tmux_control': tmux_client.stats(),
+        'window_cache': window_cache.stats(),
+        'coalescer': prompt_coalescer.stats(),
+        'ingestion_mode': TELEGRAM_INGESTION_MODE,
+        'update_poller': update_poller.stats() if update_poller else None,
         'timestamp': datetime.now().isoformat()
     })
 
 # ==========================================
 # Schedule Management API
 # ==========================================
+# The scheduler lives in the leader process only. Other worker processes read the
+# job snapshot it publishes and relay mutations through the shared state store.
+
+def list_scheduler_jobs():
+    """Job list from the local scheduler, or the leader's published snapshot"""
+    if scheduler is not None:
+        return scheduler.list_jobs()
+    return state_store.get('scheduler_jobs')
+
+def _publish_scheduler_jobs():
+    state_store.set('scheduler_jobs', scheduler.list_jobs())
+
+def _relay_scheduler_command(action, payload=None):
+    state_store.push_scheduler_command(action, payload)
+    return jsonify({
+        'status': 'queued',
+        'message': f"Scheduler runs in another worker process, '{action}' relayed to it"
+    }), 202
+
+def _scheduler_relay_loop():
+    """Leader: execute commands relayed by other workers and keep job snapshot fresh"""
+    last_publish = 0
+    while True:
+        try:
+            commands = state_store.pop_scheduler_commands()
+            for action, payload in commands:
+                if action == 'refresh':
+                    result = scheduler.refresh_jobs()
+                elif action == 'register':
+                    result = scheduler.register_job(payload)
+                elif action == 'delete':
+                    result = scheduler.delete_job(payload)
+                else:
+                    result = {'status': 'error', 'message': f'Unknown action: {action}'}
+                print(f"⏰ [Scheduler] Relayed '{action}': {result.get('message')}", flush=True)
+            if commands or time.time() - last_publish > 10:
+                _publish_scheduler_jobs()
+                last_publish = time.time()
+        except Exception as e:
+            print(f"❌ [Scheduler] Relay error: {e}", flush=True)
+        time.sleep(1)
 
 @app.route('/scheduler/refresh', methods=['POST'])
 def scheduler_refresh():
     """Re-read scheduler.yaml and refresh schedules"""
     if scheduler is None:
-        return jsonify({'status': 'error', 'message': 'Scheduler manager not initialized'}), 500
+        return _relay_scheduler_command('refresh')
 
     result = scheduler.refresh_jobs()
+    _publish_scheduler_jobs()
     return jsonify(result), 200 if result['status'] == 'ok' else 400
 
 @app.route('/scheduler/jobs', methods=['GET'])
 def scheduler_list_jobs():
     """List all schedule tasks"""
-    if scheduler is None:
+    result = list_scheduler_jobs()
+    if result is None:
         return jsonify({'status': 'error', 'message': 'Scheduler manager not initialized'}), 500
 
-    result = scheduler.list_jobs()
     return jsonify(result), 200
 
 @app.route('/scheduler/jobs/register', methods=['POST'])
 def scheduler_register_job():
     """Register new schedule task"""
-    if scheduler is None:
-        return jsonify({'status': 'error', 'message': 'Scheduler manager not initialized'}), 500
-
     job_config = request.get_json()
     if not job_config:
         return jsonify({'status': 'error', 'message': 'Please provide valid JSON configuration'}), 400
 
+    if scheduler is None:
+        return _relay_scheduler_command('register', job_config)
+
     result = scheduler.register_job(job_config)
+    _publish_scheduler_jobs()
     return jsonify(result), 200 if result['status'] == 'ok' else 400
 
 @app.route('/scheduler/jobs/<job_id>', methods=['DELETE'])
 def scheduler_delete_job(job_id):
     """Delete schedule task"""
     if scheduler is None:
-        return jsonify({'status': 'error', 'message': 'Scheduler manager not initialized'}), 500
+        return _relay_scheduler_command('delete', job_id)
 
     result = scheduler.delete_job(job_id)
+    _publish_scheduler_jobs()
     return jsonify(result), 200 if result['status'] == 'ok' else 400
 
-if __name__ == '__main__':
-    print(f"🚀 Starting Chat Agent Matrix API (Multi-Agent Mode)...")
-    print(f"📍 Local endpoint: http://{FLASK_HOST}:{FLASK_PORT}")
+_runtime_started = False
+
+def create_app():
+    """App factory: start this process's runtime and return the Flask app
+
+    Safe under a multi-process WSGI server (e.g. gunicorn -w 4 'wsgi:app'):
+    every worker accepts updates into the shared update inbox, while the
+    process that wins the leader lock processes them and also owns the
+    scheduler and the poller.
+    """
+    global scheduler, update_poller, injection_service, _runtime_started
+    if _runtime_started:
+        return app
+    _runtime_started = True
+
+    # Start update worker pool
+    update_queue.start()
+
+    if not leader_lock.try_acquire():
+        print(f"👥 Worker {os.getpid()}: serving requests (scheduler owned by leader process)", flush=True)
+        return app
+
+    print(f"👑 Worker {os.getpid()}: leader (scheduler owner)", flush=True)
+
+    # Precompiled config for short-lived CLI processes (telegram_notifier.py)
+    write_config_snapshot()
+
     # === AACS: physically write current Port for startup script to read ===
-    port_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".flask_port")
-    with open(port_file, "w") as f:
+    with open(os.path.join(BASE_DIR, ".flask_port"), "w") as f:
         f.write(str(FLASK_PORT))
 
-    print(f"🤖 Default Agent: {DEFAULT_ACTIVE_AGENT}")
-    print(f"👥 Configured Agents: {', '.join([a['name'] for a in AGENTS])}")
-    print("")
+    # Fresh service start: reset routing state like the former in-memory globals.
+    # Leader re-election (worker restart) keeps the active Agent and pending menu inputs.
+    if os.path.exists(SERVICE_START_MARKER):
+        set_current_agent(DEFAULT_ACTIVE_AGENT)
+        state_store.clear_user_states()
+        os.remove(SERVICE_START_MARKER)
+        print(f"🔄 Service start: active Agent reset to {DEFAULT_ACTIVE_AGENT}", flush=True)
+    elif not any(a['name'] == get_current_agent() for a in AGENTS):
+        # Kept across a restart that skipped start_all_services.sh, but no longer in config.yaml
+        print(f"🔄 Stored active Agent {get_current_agent()} is not configured, reset to {DEFAULT_ACTIVE_AGENT}", flush=True)
+        set_current_agent(DEFAULT_ACTIVE_AGENT)
+
+    # PTY transport: the Agent CLIs are children of this process
+    if AGENT_TRANSPORT == 'pty':
+        if SERVER_WORKERS > 1:
+            print("⚠️ agent_transport 'pty' requires server.workers: 1, other workers cannot reach the Agents", flush=True)
+        agent_transport.start()
 
     # Start schedule tasks
-    scheduler = SchedulerManager(image_manager=image_manager)
+    # Scheduled commands take the same injection path as every other producer
+    scheduler = SchedulerManager(image_manager=image_manager, inject_fn=inject_from_producer)
     scheduler.load_jobs(SCHEDULER_CONF)
     scheduler.start()
+    _publish_scheduler_jobs()
+
+    # Deliver messages spilled to the durable backlog before the restart
+    agent_lanes.replay_backlogs()
+
+    # One injection entry point for the Gmail listener, the LINE server and scripts
+    if INJECTION_SOCKET:
+        injection_service = InjectionService(INJECTION_SOCKET, inject_from_producer,
+                                             TMUX_SESSION_NAME, [a['name'] for a in AGENTS],
+                                             notify_fn=notify_from_agent)
+        injection_service.start()
+    threading.Thread(target=_scheduler_relay_loop, name='scheduler-relay', daemon=True).start()
+    if SERVER_WORKERS > 1:
+        threading.Thread(target=_update_inbox_loop, name='update-inbox', daemon=True).start()
+
+    # Long polling ingestion (no ngrok tunnel; webhook route stays available but unused)
+    if TELEGRAM_INGESTION_MODE == 'polling':
+        update_poller = TelegramUpdatePoller(
+            TELEGRAM_API_BASE_URL, TELEGRAM_BOT_TOKEN, poll_update,
+            offset_path=os.path.join(BASE_DIR, '.telegram_offset'),
+            poll_timeout=TELEGRAM_POLL_TIMEOUT,
+            client=api_client()
+        )
+        update_poller.start()
+
+    return app
+
+if __name__ == '__main__':
+    print(f"🚀 Starting Chat Agent Matrix API (Multi-Agent Mode)...")
+    print(f"📍 Local endpoint: http://{FLASK_HOST}:{FLASK_PORT}")
+    print(f"🤖 Default Agent: {DEFAULT_ACTIVE_AGENT}")
+    print(f"👥 Configured Agents: {', '.join([a['name'] for a in AGENTS])}")
+    print("")
+
+    create_app()
 
     try:
-        app.run(host=FLASK_HOST, port=FLASK_PORT, debug=False)
+        app.run(host=FLASK_HOST, port=FLASK_PORT, debug=False, threaded=True)
     except Exception as e:
         print(f"❌ Failed to start Flask server: {e}")
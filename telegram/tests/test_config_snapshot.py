@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Precompiled config snapshot: `import config` skips yaml while the snapshot is fresh, and rebuilds from YAML once stale
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+TELEGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 50   # Cumulative import time of config from the snapshot (generous, CI machines vary)
+
+
+def import_config(cwd):
+    """Run `import config` under -X importtime in cwd, returns {module: cumulative ms}"""
+    env = {k: v for k, v in os.environ.items() if k != 'INSTANCE_NAME'}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import config'],
+                            cwd=cwd, env=env, capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(cumulative) / 1000
+    return modules
+
+
+class ConfigSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+        shutil.copy(os.path.join(TELEGRAM_DIR, 'config.py'), self.dir)
+        shutil.copy(os.path.join(TELEGRAM_DIR, 'config.yaml.example'), os.path.join(self.dir, 'config.yaml'))
+        env = {k: v for k, v in os.environ.items() if k != 'INSTANCE_NAME'}
+        subprocess.run([sys.executable, '-c', 'import config, sys; sys.exit(0 if config.write_config_snapshot() else 1)'],
+                       cwd=self.dir, env=env, check=True, timeout=30)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fresh_snapshot_skips_yaml(self):
+        modules = import_config(self.dir)
+
+        self.assertNotIn('yaml', modules)
+        self.assertLess(modules['config'], IMPORT_BUDGET_MS)
+
+    def test_touched_yaml_invalidates_snapshot(self):
+        config_path = os.path.join(self.dir, 'config.yaml')
+        later = time.time() + 5
+        os.utime(config_path, (later, later))
+
+        self.assertIn('yaml', import_config(self.dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
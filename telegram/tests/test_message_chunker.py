@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# A short header followed by a long <pre> block shares the first part with the start of the block
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from message_chunker import MESSAGE_LIMIT, split_html_message
+
+
+class SplitHtmlMessageTest(unittest.TestCase):
+
+    def assertBalanced(self, parts):
+        for part in parts:
+            self.assertLessEqual(len(part), MESSAGE_LIMIT)
+            for tag in ('b', 'pre'):
+                self.assertEqual(part.count(f'<{tag}>'), part.count(f'</{tag}>'), part[:80])
+
+    def test_header_is_not_sent_alone(self):
+        body = 'x' * 9000
+        parts = split_html_message(f"💬 <b>[Agent] Latest Response:</b>\n<pre>{body}</pre>")
+
+        self.assertBalanced(parts)
+        self.assertTrue(parts[0].startswith("💬 <b>[Agent] Latest Response:</b>\n<pre>x"))
+        self.assertGreater(len(parts[0]), MESSAGE_LIMIT // 2)
+        self.assertTrue(all(part.startswith('<pre>') for part in parts[1:]))
+        self.assertEqual(''.join(part.split('<pre>', 1)[1].replace('</pre>', '') for part in parts), body)
+
+    def test_lines_stay_whole_when_part_is_full(self):
+        lines = [f"line {i} " * 8 for i in range(300)]
+        parts = split_html_message("<b>Log</b>\n<pre>" + "\n".join(lines) + "</pre>")
+
+        self.assertBalanced(parts)
+        for part in parts:
+            for line in part.replace('<pre>', '').replace('</pre>', '').split('\n'):
+                self.assertTrue(line in lines or line in ('', '<b>Log</b>'), line[:40])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Fast-start CLI path: an Agent report handed to the running server imports no heavy modules
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import json
+import marshal
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+TELEGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TELEGRAM_DIR)
+from injection_service import InjectionService
+
+HEAVY_MODULES = ('yaml', 'requests', 'flask')
+TIME_BUDGET = 3.0   # Seconds for interpreter start plus the report round trip (generous, CI machines vary)
+
+# Runs the CLI as __main__ and reports which heavy modules were loaded when it exits
+REPORT_SCRIPT = f"""
+import atexit, json, runpy, sys
+atexit.register(lambda: print('MODULES ' + json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules])))
+sys.argv = ['telegram_notifier.py', 'Task finished']
+runpy.run_path('telegram_notifier.py', run_name='__main__')
+"""
+
+
+class NotifierStartupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'notify.sock')
+        self.reports = []
+        self.service = InjectionService(self.socket_path, lambda *args: True, 'test', [],
+                                        notify_fn=lambda request: self.reports.append(request['text']) or True)
+        self.assertTrue(self.service.start())
+
+    def tearDown(self):
+        self.service.stop()
+        self.tmpdir.cleanup()
+
+    def test_forwarded_report_skips_heavy_imports(self):
+        env = dict(os.environ, TELEGRAM_NOTIFY_SOCKET=self.socket_path)
+        started = time.monotonic()
+        result = subprocess.run([sys.executable, '-c', REPORT_SCRIPT], cwd=TELEGRAM_DIR, env=env,
+                                capture_output=True, text=True, timeout=30)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertEqual(self.reports, ['Task finished'])
+        loaded = json.loads(result.stdout.split('MODULES ', 1)[1])
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, TIME_BUDGET)
+
+    def test_socket_path_comes_from_config_snapshot(self):
+        instance_name = f'notifier-test-{os.getpid()}'
+        snapshot_path = os.path.join(TELEGRAM_DIR, f'.config_snapshot.{instance_name}')
+        with open(snapshot_path, 'wb') as f:
+            marshal.dump({'sources': {}, 'config': {'dispatch': {'injection_socket': self.socket_path}}}, f)
+        self.addCleanup(os.unlink, snapshot_path)
+        env = dict(os.environ, INSTANCE_NAME=instance_name)
+        env.pop('TELEGRAM_NOTIFY_SOCKET', None)
+
+        result = subprocess.run([sys.executable, '-c', REPORT_SCRIPT], cwd=TELEGRAM_DIR, env=env,
+                                capture_output=True, text=True, timeout=30)
+
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertEqual(self.reports, ['Task finished'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Readiness-driven Enter when the CLI wraps the typed text inside its input box
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pane_readiness
+
+
+class WrappingTransport:
+    """Fake transport whose input box wraps the typed text every `width` characters"""
+
+    def __init__(self, text, width):
+        self.text = text
+        self.width = width
+        self.submitted = False
+        self.keys = []
+
+    def capture(self, agent_name):
+        if self.submitted:
+            return "Working...\n╭────╮\n│ > │\n╰────╯\n"
+        rows = [self.text[i:i + self.width] for i in range(0, len(self.text), self.width)]
+        box = [f"│ > {rows[0]} │"] + [f"│   {row} │" for row in rows[1:]]
+        return "Previous answer\n╭────╮\n" + "\n".join(box) + "\n╰────╯\n"
+
+    def send_key(self, agent_name, key):
+        self.keys.append(key)
+        self.submitted = True
+
+
+class SubmitInputTest(unittest.TestCase):
+
+    def test_wrap_inside_probe_does_not_wait_for_timeout(self):
+        text = "x" * 195 + "0123456789"     # Wrapped at 100: the last 16 characters span two rows
+        transport = WrappingTransport(text, width=100)
+
+        started = time.monotonic()
+        presses = pane_readiness.submit_input(transport, 'Agent', text, engine='claude')
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(presses, 1)
+        self.assertLess(elapsed, pane_readiness.LAND_TIMEOUT / 2)
+
+    def test_multiline_text_lands(self):
+        text = "first line\nsecond line of the prompt"
+        transport = WrappingTransport(text.replace('\n', ' '), width=12)
+        self.assertTrue(pane_readiness.wait_for_input(transport, 'Agent', text, engine='claude', timeout=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Shared update inbox: updates accepted by several worker processes come out once, in arrival order
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TELEGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TELEGRAM_DIR)
+from state_store import SharedStateStore
+
+# Another worker process appending to the same inbox
+PUSH_SCRIPT = """
+import sys
+from state_store import SharedStateStore
+store = SharedStateStore(sys.argv[1])
+store.push_update({'update_id': int(sys.argv[2]), 'message': {'text': sys.argv[3]}}, sys.argv[4])
+"""
+
+
+class UpdateInboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'state.db')
+        self.store = SharedStateStore(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def push_from_other_process(self, update_id, text, agent_name):
+        subprocess.run([sys.executable, '-c', PUSH_SCRIPT, self.db_path, str(update_id), text, agent_name],
+                       cwd=TELEGRAM_DIR, check=True, timeout=30)
+
+    def test_updates_from_all_processes_pop_in_arrival_order(self):
+        self.store.push_update({'update_id': 1, 'message': {'text': '/switch Chöd'}}, 'Chöd')
+        self.push_from_other_process(2, 'photo 1', 'Chöd')
+        self.store.push_update({'update_id': 3, 'message': {'text': 'photo 2'}}, 'Chöd')
+        self.push_from_other_process(4, 'hello', 'Güpa')
+        self.assertEqual(self.store.update_inbox_count(), 4)
+
+        first = self.store.pop_updates(3)
+        rest = self.store.pop_updates(3)
+
+        self.assertEqual([(u['update_id'], agent) for u, agent in first], [(1, 'Chöd'), (2, 'Chöd'), (3, 'Chöd')])
+        self.assertEqual([(u['update_id'], agent) for u, agent in rest], [(4, 'Güpa')])
+        self.assertEqual(self.store.pop_updates(3), [])
+        self.assertEqual(self.store.update_inbox_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
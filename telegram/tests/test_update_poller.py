@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# getUpdates long polling against a local fake Bot API server
+# Usage: python3 -m unittest discover -s tests (from telegram/)
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from update_poller import TelegramUpdatePoller
+
+
+class FakeBotApi(BaseHTTPRequestHandler):
+    """Answers getUpdates from the server's script, then with empty long polls"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        method = self.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.calls.append((method, form, time.monotonic()))
+            script = self.server.script
+            reply = script.pop(0) if method == 'getUpdates' and script else None
+
+        if reply is None:
+            if method == 'getUpdates':
+                time.sleep(0.05)
+            reply = (200, {'ok': True, 'result': [] if method == 'getUpdates' else True})
+        status, payload = reply
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UpdatePollerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBotApi)
+        self.server.lock = threading.Lock()
+        self.server.calls = []
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.offset_path = os.path.join(self.tmpdir.name, '.update_offset')
+        self.received = []
+        self.poller = None
+
+    def tearDown(self):
+        if self.poller:
+            self.poller.stop()
+            self.poller._thread.join(3)
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def start_poller(self):
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/bot"
+        self.poller = TelegramUpdatePoller(base_url, 'TOKEN', self.received.append, self.offset_path,
+                                           poll_timeout=1)
+        self.poller.start()
+
+    def get_updates_calls(self):
+        with self.server.lock:
+            return [call for call in self.server.calls if call[0] == 'getUpdates']
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def test_updates_handed_over_and_offset_persisted(self):
+        batch = [{'update_id': 41, 'message': {'text': 'a'}}, {'update_id': 42, 'message': {'text': 'b'}}]
+        self.server.script = [(200, {'ok': True, 'result': batch})]
+        self.start_poller()
+
+        self.assertTrue(self.wait_for(lambda: len(self.get_updates_calls()) >= 2))
+        self.assertEqual([u['update_id'] for u in self.received], [41, 42])
+        self.assertEqual(self.get_updates_calls()[1][1]['offset'], '43')
+        with open(self.offset_path) as f:
+            self.assertEqual(f.read(), '43')
+        # Shared Bot API client: getUpdates is counted with every other call
+        self.assertGreaterEqual(self.poller.client.stats()['calls'], 3)
+
+    def test_persisted_offset_is_resumed(self):
+        with open(self.offset_path, 'w') as f:
+            f.write('100')
+        self.start_poller()
+
+        self.assertTrue(self.wait_for(lambda: self.get_updates_calls()))
+        self.assertEqual(self.get_updates_calls()[0][1]['offset'], '100')
+
+    def test_conflict_backs_off_and_removes_webhook(self):
+        self.server.script = [(409, {'ok': False, 'error_code': 409, 'description': 'Conflict'})]
+        self.start_poller()
+
+        self.assertTrue(self.wait_for(lambda: len(self.get_updates_calls()) >= 2))
+        calls = self.get_updates_calls()
+        self.assertGreaterEqual(calls[1][2] - calls[0][2], 0.9)
+        with self.server.lock:
+            methods = [call[0] for call in self.server.calls]
+        self.assertEqual(methods.count('deleteWebhook'), 2)
+        self.assertEqual(self.poller.stats()['errors'], 1)
+        self.assertEqual(self.received, [])
+
+    def test_error_response_backs_off(self):
+        self.server.script = [(200, {'ok': False, 'description': 'Bad Request'})] * 2
+        self.start_poller()
+
+        self.assertTrue(self.wait_for(lambda: len(self.get_updates_calls()) >= 3))
+        calls = self.get_updates_calls()
+        self.assertGreaterEqual(calls[1][2] - calls[0][2], 0.9)
+        self.assertGreaterEqual(calls[2][2] - calls[1][2], 1.9)
+        self.assertEqual(self.poller.stats()['offset'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# tmux_control.py
+# Long-lived tmux control-mode (tmux -C) client: many commands over one pipe instead of a fork per command
+
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+
+_BLOCK_RE = re.compile(rb'^%(begin|end|error) (\d+) (\d+) (\d+)$')
+
+
+def quote_tmux_arg(arg):
+    """Quote one argument for the tmux command parser (double quotes, escapes, no expansion)"""
+    out = []
+    for ch in str(arg):
+        if ch in '\\"$':
+            out.append('\\' + ch)
+        elif ch == '\n':
+            out.append('\\n')
+        elif ch == '\r':
+            out.append('\\r')
+        elif ch == '\t':
+            out.append('\\t')
+        elif ord(ch) < 0x20 or ord(ch) == 0x7f:
+            out.append('\\%03o' % ord(ch))
+        else:
+            out.append(ch)
+    return '"' + ''.join(out) + '"'
+
+
+class TmuxControlClient:
+    """Run tmux commands through one persistent `tmux -C attach-session` connection
+
+    run(args) takes the same argument list as `tmux <args>` and returns a
+    subprocess.CompletedProcess, so it is a drop-in for subprocess.run(['tmux', ...]).
+    Replies are matched to commands in order through the %begin/%end/%error
+    blocks tmux emits for commands from this client (flags=1).
+
+    The connection is opened lazily (and again after a fork or when tmux
+    goes away, at most every reconnect_interval seconds). While it is down,
+    commands fall back to a plain tmux subprocess, so callers never notice.
+    Asynchronous notifications (%output, %window-add, ...) are handed to
+    listeners registered with add_listener(fn(line_bytes)).
+    """
+
+    def __init__(self, session_name, reconnect_interval=5.0, command_timeout=10.0):
+        self.session_name = session_name
+        self.reconnect_interval = reconnect_interval
+        self.command_timeout = command_timeout
+        self._proc = None
+        self._pid = None
+        self._reader = None
+        self._write_lock = threading.Lock()
+        self._pending = []          # futures waiting for their %begin block, in command order
+        self._pending_lock = threading.Lock()
+        self._last_attempt = 0.0
+        self._listeners = []
+        self.connects = 0
+        self.commands = 0
+        self.fallbacks = 0
+
+    # ---------- connection ----------
+    @property
+    def connected(self):
+        return self._proc is not None and self._proc.poll() is None and self._pid == os.getpid()
+
+    def connect(self):
+        """Attach a control-mode client to the session, returns True on success"""
+        self._last_attempt = time.monotonic()
+        try:
+            proc = subprocess.Popen(
+                ['tmux', '-C', 'attach-session', '-t', self.session_name],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            print(f"⚠️ [tmux -C] Unable to start control client: {e}", flush=True)
+            return False
+
+        # The attach itself answers with a block (flags=0); a missing session exits right away
+        first_line = proc.stdout.readline()
+        if not first_line.startswith(b'%begin'):
+            proc.wait()
+            return False
+
+        self._proc = proc
+        self._pid = os.getpid()
+        self.connects += 1
+        self._reader = threading.Thread(target=self._read_loop, args=(proc,), name='tmux-control', daemon=True)
+        self._reader.start()
+        print(f"🔗 [tmux -C] Control connection to '{self.session_name}' established", flush=True)
+        return True
+
+    def close(self):
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+
+    def ensure_connected(self):
+        """Connect if needed (rate-limited), returns True when the control connection is up"""
+        if self.connected:
+            return True
+        with self._write_lock:
+            if self.connected:
+                return True
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked child: the pipe belongs to the parent
+                self._proc = None
+                self._pending = []
+            if time.monotonic() - self._last_attempt < self.reconnect_interval:
+                return False
+            return self.connect()
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    # ---------- commands ----------
+    def run(self, args, check=False, timeout=None, input=None):
+        """Run `tmux <args>`, returns subprocess.CompletedProcess (stdout as text)"""
+        if input is None and self.ensure_connected():
+            future = Future()
+            line = ' '.join(quote_tmux_arg(a) for a in args) + '\n'
+            try:
+                with self._write_lock:
+                    with self._pending_lock:
+                        self._pending.append(future)
+                    self._proc.stdin.write(line.encode('utf-8'))
+                    self._proc.stdin.flush()
+            except (OSError, ValueError, AttributeError):
+                # Not written: safe to retry through a subprocess
+                with self._pending_lock:
+                    if future in self._pending:
+                        self._pending.remove(future)
+                return self._run_subprocess(args, check, timeout, input)
+
+            self.commands += 1
+            try:
+                ok, output = future.result(timeout or self.command_timeout)
+            except Exception as e:
+                ok, output = False, [f"tmux control connection: {e}"]
+            text = '\n'.join(output) + ('\n' if output else '')
+            result = subprocess.CompletedProcess(['tmux'] + list(args), 0 if ok else 1,
+                                                 text if ok else '', '' if ok else text)
+            if check:
+                result.check_returncode()
+            return result
+
+        return self._run_subprocess(args, check, timeout, input)
+
+    # ---------- text injection ----------
+    def send_literal(self, target, text):
+        """Type text into target pane key by key (send-keys -l, no key-name lookup)"""
+        return self.run(['send-keys', '-t', target, '-l', text], check=True)
+
+    def paste_text(self, target, text, bracketed=True):
+        """Stream text into a private buffer via stdin and paste it in one go
+
+        With bracketed=True the paste is wrapped in bracketed-paste markers
+        when the application asked for them, so CLIs treat it as one paste
+        instead of typed input; -d deletes the buffer afterwards.
+        """
+        buffer_name = f"inject_{os.getpid()}_{threading.get_ident()}"
+        self.run(['load-buffer', '-b', buffer_name, '-'], check=True, input=text)
+        args = ['paste-buffer', '-d', '-b', buffer_name, '-t', target]
+        if bracketed:
+            args.insert(1, '-p')
+        return self.run(args, check=True)
+
+    def _run_subprocess(self, args, check, timeout, input):
+        self.fallbacks += 1
+        return subprocess.run(['tmux'] + list(args), capture_output=True, text=True,
+                              check=check, timeout=timeout, input=input)
+
+    def _read_loop(self, proc):
+        current = None   # (future, output lines) of the block being read
+        try:
+            for raw in proc.stdout:
+                line = raw.rstrip(b'\n')
+                match = _BLOCK_RE.match(line)
+                if match:
+                    if match.group(4) != b'1':
+                        continue    # block of a command not sent by this client (e.g. the attach itself)
+                    if match.group(1) == b'begin':
+                        with self._pending_lock:
+                            future = self._pending.pop(0) if self._pending else None
+                        current = (future, [])
+                    elif current is not None:
+                        future, output = current
+                        current = None
+                        if future is not None and not future.done():
+                            future.set_result((match.group(1) == b'end', output))
+                    continue
+                if current is not None:
+                    current[1].append(line.decode('utf-8', errors='replace'))
+                elif line.startswith(b'%'):
+                    for listener in self._listeners:
+                        try:
+                            listener(line)
+                        except Exception as e:
+                            print(f"⚠️ [tmux -C] Listener error: {e}", flush=True)
+        finally:
+            # Connection gone (tmux server exit, session killed): fail waiters, reconnect on next use
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            for future in pending:
+                if not future.done():
+                    future.set_exception(ConnectionError('control client exited'))
+            if self._proc is proc:
+                self._proc = None
+                print("🔌 [tmux -C] Control connection closed, will reconnect on demand", flush=True)
+
+    def stats(self):
+        return {
+            'connected': self.connected,
+            'connects': self.connects,
+            'commands': self.commands,
+            'fallbacks': self.fallbacks
+        }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Injection Benchmark - send-keys -l vs load-buffer + paste-buffer
+Creates a throwaway tmux session whose pane writes everything it receives to a file,
+injects messages of several sizes with both modes and reports the time until the
+whole message has arrived in the pane.
+
+Usage:
+    python3 tools/benchmark/injection_benchmark.py
+    python3 tools/benchmark/injection_benchmark.py --sizes 100 4000 64000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from tmux_control import TmuxControlClient
+
+
+def build_message(size):
+    """Multi-line text of exactly size characters (80-column lines, like a forwarded email)"""
+    line = ("The quick brown fox jumps over the lazy dog. " * 2)[:79] + "\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def wait_for_bytes(path, expected, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.getsize(path) >= expected:
+            return True
+        time.sleep(0.001)
+    return False
+
+
+def inject(client, target, mode, message):
+    if mode == 'buffer':
+        client.paste_text(target, message)
+    else:
+        client.send_literal(target, message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tmux injection modes across message sizes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 4000, 16000, 64000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    session = f"inject_bench_{os.getpid()}"
+    sink = tempfile.NamedTemporaryFile(prefix='inject_bench_', delete=False).name
+    # Raw, silent pane: no line-length limit from the tty line discipline, no echo redraw
+    subprocess.run(['tmux', 'new-session', '-d', '-s', session, '-x', '200', '-y', '50',
+                    f"stty -icanon -echo; exec cat > {sink}"], check=True)
+    time.sleep(0.5)
+    target = f"{session}:0"
+    client = TmuxControlClient(session)
+
+    print(f"{'size':>8} | {'keys (send-keys -l)':>20} | {'buffer (paste-buffer)':>22}")
+    print("-" * 58)
+    try:
+        for size in args.sizes:
+            message = build_message(size)
+            row = {}
+            for mode in ('keys', 'buffer'):
+                samples = []
+                for _ in range(args.repeat):
+                    start_size = os.path.getsize(sink)
+                    started = time.perf_counter()
+                    inject(client, target, mode, message)
+                    if not wait_for_bytes(sink, start_size + len(message.encode('utf-8')), args.timeout):
+                        samples = None
+                        break
+                    samples.append((time.perf_counter() - started) * 1000)
+                row[mode] = f"{statistics.median(samples):.1f} ms" if samples else "timeout"
+            print(f"{size:>8} | {row['keys']:>20} | {row['buffer']:>22}")
+    finally:
+        client.close()
+        subprocess.run(['tmux', 'kill-session', '-t', session], capture_output=True)
+        os.unlink(sink)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - import cost of the short-lived CLI paths (python -X importtime)
+Measures what an Agent report pays before anything is sent (interpreter startup itself excluded):
+  forward   injection_client only (report handed to the running server)
+  config    config.py read from the precompiled snapshot
+  notifier  full telegram_notifier import (direct send when the server is down)
+Writes the config snapshot first, then fails (exit 1) when a path imports a module it must
+not need, or its cumulative import time exceeds the budget, so it can run as a regression check.
+
+Usage:
+    python3 tools/benchmark/startup_benchmark.py
+    python3 tools/benchmark/startup_benchmark.py --repeat 10 --top 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TELEGRAM_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name, statement, modules the path must not import, default budget in ms (cumulative import time)
+SCENARIOS = (
+    ('forward', 'import injection_client', ('yaml', 'requests', 'config'), 15),
+    ('config', 'import config', ('yaml',), 15),
+    ('notifier', 'import telegram_notifier', ('yaml',), 150),
+)
+
+
+def import_profile(statement, baseline=()):
+    """Run statement under -X importtime, returns ({module: cumulative_us}, top-level total in us, wall ms)
+
+    Modules in baseline (imported by interpreter startup, e.g. site and its .pth hooks) are left out.
+    """
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=TELEGRAM_DIR, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() in baseline:
+            continue
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(' '):    # Top-level import (nested ones are indented)
+            total_us += int(cumulative)
+    return modules, total_us, wall_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check for the notifier CLI paths")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5, help="Slowest imports listed per path")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget (slow machines)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, TELEGRAM_DIR)
+    import config
+    if not config.write_config_snapshot():
+        print("❌ Config snapshot could not be written")
+        return 1
+
+    baseline = set(import_profile('pass')[0])
+    failures = []
+    print(f"{'path':>9} | {'imports':>10} | {'budget':>8} | {'wall':>9}")
+    print("-" * 46)
+    for name, statement, forbidden, budget_ms in SCENARIOS:
+        runs = [import_profile(statement, baseline) for _ in range(args.repeat)]
+        modules = runs[-1][0]
+        import_ms = statistics.median(run[1] for run in runs) / 1000
+        wall_ms = statistics.median(run[2] for run in runs)
+        budget_ms *= args.scale
+        print(f"{name:>9} | {import_ms:>7.1f} ms | {budget_ms:>5.0f} ms | {wall_ms:>6.1f} ms")
+
+        for module, us in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{'':>9}   {us / 1000:>7.1f} ms  {module}")
+
+        loaded = [m for m in forbidden if m in modules]
+        if loaded:
+            failures.append(f"{name}: imports {', '.join(loaded)}")
+        if import_ms > budget_ms:
+            failures.append(f"{name}: {import_ms:.1f} ms over the {budget_ms:.0f} ms budget")
+
+    if failures:
+        print("\n❌ Startup regression:\n  " + "\n  ".join(failures))
+        return 1
+    print("\n✅ All CLI paths within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
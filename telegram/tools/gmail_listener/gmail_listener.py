@@ -9,6 +9,7 @@ import base64
 import json
 import subprocess
 import re
+import sys
 from pathlib import Path
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -21,11 +22,17 @@ token_file = script_dir / 'token.json'
 seen_file = script_dir / '.gmail_seen_messages'
 whitelist_file = script_dir / 'whitelist.json'
 
+# Injection service of the Telegram server (telegram/injection_client.py)
+telegram_dir = script_dir.parent.parent
+sys.path.insert(0, str(telegram_dir))
+from injection_client import submit as submit_injection
+
 # Load configuration
 whitelist_config = {}
 tmux_session = "ai_telegram_session"
 email_marker = "Hi"
 poll_interval_minutes = 0.5  # Default 30 seconds
+injection_socket = str(telegram_dir / '.injection.sock')
 
 if whitelist_file.exists():
     with open(whitelist_file, 'r') as f:
@@ -34,6 +41,7 @@ if whitelist_file.exists():
         tmux_session = data.get('tmux_session', 'ai_telegram_session')
         email_marker = data.get('email_marker', 'Hi')
         poll_interval_minutes = data.get('poll_interval_minutes', 0.5)
+        injection_socket = str(script_dir / data.get('injection_socket', injection_socket))
 
 # Build mapping from email address to agents
 sender_to_agents = {}
@@ -72,7 +80,13 @@ def check_agent_session(agent_name):
 
 
 def send_to_agent(agent_name, message):
-    """Send message to Agent (following Telegram approach)"""
+    """Send message to Agent (through the Telegram server's injection service, else directly via tmux)"""
+    result = submit_injection(agent_name, message, 'gmail', injection_socket, tmux_session)
+    if result is not None:
+        print(f"   {'✅ Forwarded' if result else '❌ Injection service failed to forward'} to {agent_name}")
+        return result
+
+    # Injection service not running: type into the window ourselves
     try:
         if not check_agent_session(agent_name):
             print(f"   ❌ Agent '{agent_name}' tmux window does not exist")
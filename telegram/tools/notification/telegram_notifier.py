@@ -4,15 +4,15 @@ AI 引擎 Telegram 通知器
 從模板文件讀取訊息格式，AI 引擎只需要填入變數
 """
 
-import requests
 import json
-import yaml
+import marshal
 import os
 import sys
 from datetime import datetime
 
 # 支援從 agent_home 目錄執行：查找上層目錄的 config.py
 script_dir = os.path.dirname(os.path.abspath(__file__))
+config_dir = script_dir
 
 # 如果當前目錄找不到 config，則逐級往上查找
 if not os.path.exists(os.path.join(script_dir, 'config.py')):
@@ -20,13 +20,88 @@ if not os.path.exists(os.path.join(script_dir, 'config.py')):
     telegram_dir = os.path.dirname(os.path.dirname(script_dir))
     if os.path.exists(os.path.join(telegram_dir, 'config.py')):
         sys.path.insert(0, telegram_dir)
+        config_dir = telegram_dir
     else:
         # 如果還是找不到，試試再往上一級
         telegram_dir = os.path.dirname(telegram_dir)
         if os.path.exists(os.path.join(telegram_dir, 'config.py')):
             sys.path.insert(0, telegram_dir)
+            config_dir = telegram_dir
 
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL
+def _injection_socket_path():
+    """
+    從設定快照讀取執行中伺服器的注入 socket（dispatch.injection_socket）
+
+    伺服器啟動時寫入快照，因此快照記錄的正是該伺服器監聽的 socket；
+    以 marshal 讀取，快速路徑不必匯入 yaml 與 config.py。
+
+    Returns:
+        str: socket 路徑，注入服務停用時為 None
+    """
+    if os.environ.get('TELEGRAM_NOTIFY_SOCKET'):
+        return os.environ['TELEGRAM_NOTIFY_SOCKET']
+    instance_name = os.environ.get('INSTANCE_NAME', '')
+    snapshot_path = os.path.join(config_dir, f'.config_snapshot.{instance_name}' if instance_name else '.config_snapshot')
+    try:
+        with open(snapshot_path, 'rb') as f:
+            socket_name = marshal.load(f)['config'].get('dispatch', {}).get('injection_socket', '.injection.sock')
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        # 快照不存在或無法讀取：使用預設 socket 名稱
+        socket_name = '.injection.sock'
+    return os.path.join(config_dir, socket_name) if socket_name else None
+
+def _forward_cli_report(argv):
+    """
+    將命令列回報交給執行中伺服器的注入服務，並等待發送結果
+
+    Args:
+        argv (list): 命令列參數（訊息，或 --file <type> <path> [caption]）
+
+    Returns:
+        True / False: 伺服器已發送 / 發送失敗（最終結果，結束碼依此決定）
+        None: 伺服器未接手（服務未執行、等待逾時後撤回），由下方直接發送
+    """
+    try:
+        from injection_client import notify
+    except ImportError:
+        return None
+
+    socket_path = _injection_socket_path()
+    if argv[0] == '--file':
+        if len(argv) < 3:
+            return None
+        caption = " ".join(argv[3:]).replace('\\n', '\n')
+        sent = notify(caption, socket_path, file_path=argv[2], file_type=argv[1])
+    else:
+        sent = notify(" ".join(argv).replace('\\n', '\n'), socket_path)
+    if sent is True:
+        print(f'✅ Telegram 通知發送成功: {datetime.now().strftime("%H:%M:%S")}')
+    elif sent is False:
+        print(f'❌ Telegram 通知發送失敗（詳見伺服器日誌）: {datetime.now().strftime("%H:%M:%S")}')
+    return sent
+
+# Agent 回報的快速路徑：在下方較慢的匯入（yaml、requests、解析 config.yaml）之前轉交
+if __name__ == '__main__' and len(sys.argv) > 1:
+    _forwarded = _forward_cli_report(sys.argv[1:])
+    if _forwarded is not None:
+        sys.exit(0 if _forwarded else 1)
+
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL,
+    BOT_API_TIMEOUT, BOT_API_MAX_RETRIES, BOT_API_POOL_SIZE, BOT_API_RATE_LIMITS
+)
+from bot_api import get_client
+from message_chunker import split_html_message
+
+def api_client():
+    """
+    取得本行程共用的 Bot API 連線池客戶端（keep-alive 連線、逾時、重試）
+
+    Returns:
+        BotApiClient: 本行程共用的客戶端
+    """
+    return get_client(timeout=BOT_API_TIMEOUT, max_retries=BOT_API_MAX_RETRIES, pool_size=BOT_API_POOL_SIZE,
+                      rate_limits=BOT_API_RATE_LIMITS)
 
 def load_message_template(template_name: str, software: str = None) -> dict:
     """
@@ -49,6 +124,7 @@ def load_message_template(template_name: str, software: str = None) -> dict:
         template_file = os.path.join(telegram_dir, 'message_templates.yaml')
     
     try:
+        import yaml     # 只有模板訊息需要，一般命令列回報不必匯入
         with open(template_file, 'r', encoding='utf-8') as f:
             templates = yaml.safe_load(f)
         
@@ -97,7 +173,7 @@ def send_message(message: str) -> bool:
     }
     
     try:
-        response = requests.post(url, data=data)
+        response = api_client().post(url, data=data)
         
         if response.status_code == 200:
             print(f'✅ Telegram 通知發送成功: {datetime.now().strftime("%H:%M:%S")}')
@@ -110,6 +186,23 @@ def send_message(message: str) -> bool:
         print(f'❌ 發送過程發生錯誤: {e}')
         return False
 
+def send_long_message(message: str) -> bool:
+    """
+    發送任意長度的訊息：依行切分成不超過 Telegram 4096 字元上限的多段，
+    每段的 HTML 標籤都保持成對，並依序發送
+
+    Args:
+        message (str): 要發送的訊息內容（HTML）
+
+    Returns:
+        bool: 是否全部發送成功（遇到第一段失敗即停止）
+    """
+    parts = split_html_message(message)
+    for part in parts:
+        if not send_message(part):
+            return False
+    return True
+
 def send_message_with_keyboard(message: str, keyboard_buttons: list = None) -> bool:
     """
     發送帶有自定義鍵盤的 Telegram 訊息
@@ -143,7 +236,7 @@ def send_message_with_keyboard(message: str, keyboard_buttons: list = None) -> b
         data['reply_markup'] = json.dumps(keyboard)
     
     try:
-        response = requests.post(url, data=data)
+        response = api_client().post(url, data=data)
         
         if response.status_code == 200:
             print(f'✅ Telegram 帶鍵盤訊息發送成功: {datetime.now().strftime("%H:%M:%S")}')
@@ -212,7 +305,7 @@ def send_file(file_path: str, file_type: str = 'document', caption: str = '') ->
             if caption:
                 data['caption'] = caption
 
-            response = requests.post(url, files=files, data=data, timeout=30)
+            response = api_client().post(url, files=files, data=data, timeout=30)
 
         if response.status_code == 200:
             file_name = os.path.basename(file_path)
@@ -274,7 +367,7 @@ def get_chat_id() -> str:
     url = f"{TELEGRAM_API_BASE_URL}{TELEGRAM_BOT_TOKEN}/getUpdates"
     
     try:
-        response = requests.get(url)
+        response = api_client().get(url)
         if response.status_code == 200:
             data = response.json()
             if data['result']:
@@ -328,7 +421,7 @@ if __name__ == '__main__':
         message_content = " ".join(sys.argv[1:])
         # 處理命令行傳入的換行符號，將字面量的 \n 轉換為實際換行
         message_content = message_content.replace('\\n', '\n')
-        if send_message(message_content):
+        if send_long_message(message_content):
             sys.exit(0)
         else:
             sys.exit(1)
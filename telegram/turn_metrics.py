@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# turn_metrics.py
+# Turn-completion detection on the agent output stream, plus per-Agent latency histograms:
+#   time to first output  (prompt submitted -> Agent prints anything after taking the prompt)
+#   time to prompt        (prompt submitted -> Agent back at its input prompt)
+
+import threading
+import time
+
+from pane_readiness import at_prompt, busy, input_box
+
+# Histogram bucket upper bounds in seconds (the last bucket is open-ended)
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (count, sum, max and bucket-estimated percentiles)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-quantile (max for the open bucket), None when empty"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= rank:
+                return self.buckets[i] if i < len(self.buckets) else round(self.max, 3)
+        return round(self.max, 3)
+
+    def stats(self):
+        labels = [str(b) for b in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum_s': round(self.total, 3),
+            'max_s': round(self.max, 3),
+            'p50_s': self.percentile(0.5),
+            'p95_s': self.percentile(0.95),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class _Turn:
+    def __init__(self, agent_name, typed_box):
+        self.agent_name = agent_name
+        self.typed_box = typed_box      # Input box holding the typed prompt, just before Enter
+        self.started = time.monotonic()
+        self.taken = False              # The CLI took the prompt (input box cleared or busy indicator shown)
+        self.first_output = None
+        self.last_output = None
+        self.superseded = False
+
+
+class TurnTracker:
+    """Watch every submitted prompt until the Agent is back at its prompt
+
+    begin(agent) is called right before the prompt's Enter. Output right
+    after Enter is the CLI redrawing its own input box, so it is not the
+    Agent's first output: the watcher thread first waits until the prompt
+    has been taken (input box no longer holds the typed text, or the busy
+    indicator is up). Output from then on is time-stamped by the output
+    listener; the watcher sleeps until it has been quiet for settle_seconds,
+    then checks the screen with the engine's markers (pane_readiness.at_prompt). Time to prompt is measured to the
+    last output before the prompt came back, not to the moment of the check.
+    Turns without a prompt after max_turn_seconds count as timeouts, a new
+    prompt before completion counts the previous turn as superseded.
+    """
+
+    def __init__(self, transport, engine_of, settle_seconds=1.0, max_turn_seconds=1800):
+        self.transport = transport
+        self.engine_of = engine_of
+        self.settle_seconds = settle_seconds
+        self.max_turn_seconds = max_turn_seconds
+        self._lock = threading.Lock()
+        self._output = threading.Condition(self._lock)
+        self._turns = {}
+        self._metrics = {}
+        transport.add_output_listener(self._on_output)
+
+    def _agent_metrics(self, agent_name):
+        if agent_name not in self._metrics:
+            self._metrics[agent_name] = {
+                'first_output': LatencyHistogram(), 'turn': LatencyHistogram(),
+                'completed': 0, 'timeouts': 0, 'superseded': 0
+            }
+        return self._metrics[agent_name]
+
+    def _on_output(self, agent_name, data):
+        now = time.monotonic()
+        with self._output:
+            turn = self._turns.get(agent_name)
+            if turn is not None:
+                if turn.taken and turn.first_output is None:
+                    self._first_output(turn, now)
+                turn.last_output = now
+            self._output.notify_all()
+
+    def _first_output(self, turn, at):
+        turn.first_output = at
+        self._agent_metrics(turn.agent_name)['first_output'].observe(at - turn.started)
+
+    def begin(self, agent_name):
+        """Start timing a turn (call right before the prompt's Enter)"""
+        turn = _Turn(agent_name, input_box(self.transport.capture(agent_name), self.engine_of(agent_name)))
+        with self._lock:
+            previous = self._turns.get(agent_name)
+            if previous is not None:
+                previous.superseded = True
+                self._agent_metrics(agent_name)['superseded'] += 1
+            self._turns[agent_name] = turn
+        threading.Thread(target=self._watch, args=(turn,), name=f'turn-{agent_name}', daemon=True).start()
+
+    def _wait_until_taken(self, turn, engine, deadline):
+        """Block until the CLI took the prompt, returns False if superseded or past the deadline"""
+        while time.monotonic() < deadline:
+            with self._output:
+                if turn.superseded:
+                    return False
+                seen = turn.last_output
+            screen = self.transport.capture(turn.agent_name)
+            box = input_box(screen, engine)
+            if busy(screen, engine) or turn.typed_box is None or box != turn.typed_box:
+                with self._output:
+                    turn.taken = True
+                    # The output that raised the busy indicator is the Agent's first sign of work
+                    if busy(screen, engine) and seen is not None and turn.first_output is None:
+                        self._first_output(turn, seen)
+                return True
+            with self._output:
+                if turn.last_output == seen and not turn.superseded:
+                    self._output.wait(min(self.settle_seconds, max(0.0, deadline - time.monotonic())))
+        return False
+
+    def _watch(self, turn):
+        engine = self.engine_of(turn.agent_name)
+        deadline = turn.started + self.max_turn_seconds
+        try:
+            if not self._wait_until_taken(turn, engine, deadline):
+                if not turn.superseded:
+                    with self._lock:
+                        self._agent_metrics(turn.agent_name)['timeouts'] += 1
+                return
+            while True:
+                with self._output:
+                    while not turn.superseded:
+                        now = time.monotonic()
+                        quiet_since = turn.last_output or turn.started
+                        if now - quiet_since >= self.settle_seconds or now >= deadline:
+                            break
+                        self._output.wait(min(quiet_since + self.settle_seconds, deadline) - now)
+                    if turn.superseded:
+                        return
+                    ended = turn.last_output
+                if ended is not None and at_prompt(self.transport.capture(turn.agent_name), engine):
+                    with self._lock:
+                        if turn.superseded:
+                            return
+                        metrics = self._agent_metrics(turn.agent_name)
+                        metrics['turn'].observe(ended - turn.started)
+                        metrics['completed'] += 1
+                    first = f"{turn.first_output - turn.started:.2f}s" if turn.first_output else "-"
+                    print(f"⏱ [{turn.agent_name}] Turn done in {ended - turn.started:.1f}s "
+                          f"(first output after {first})", flush=True)
+                    return
+                if time.monotonic() >= deadline:
+                    with self._lock:
+                        self._agent_metrics(turn.agent_name)['timeouts'] += 1
+                    return
+                # Quiet but not at the prompt yet (e.g. a long tool call): wait for more output
+                with self._output:
+                    if not turn.superseded and turn.last_output == ended:
+                        self._output.wait(max(0.0, min(self.settle_seconds * 5, deadline - time.monotonic())))
+        finally:
+            with self._lock:
+                if self._turns.get(turn.agent_name) is turn:
+                    del self._turns[turn.agent_name]
+
+    def wait_for_prompt(self, agent_name, engine, max_wait=30):
+        """Block until the Agent screen shows its input prompt, woken by output (True) or timeout (False)"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            if at_prompt(self.transport.capture(agent_name), engine):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._output:
+                self._output.wait(min(remaining, self.settle_seconds))
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'in_turn': name in self._turns,
+                    'completed': m['completed'],
+                    'timeouts': m['timeouts'],
+                    'superseded': m['superseded'],
+                    'first_output': m['first_output'].stats(),
+                    'time_to_prompt': m['turn'].stats()
+                }
+                for name, m in self._metrics.items()
+            }
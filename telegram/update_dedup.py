@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# update_dedup.py
+# Sliding window of recently seen Telegram update_id values (drop redelivered updates)
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class UpdateDeduplicator:
+    """Ring buffer + set of recent update_id values, O(1) check-and-insert
+
+    With snapshot_path set, the window is written to a small JSON file in the
+    background (at most every flush_interval seconds) and reloaded on startup,
+    so a restart does not reopen the window for Telegram redeliveries.
+
+    With shared_store set (SharedStateStore), a local miss is confirmed by a
+    cross-process claim, so a retry landing on another worker is still caught.
+    """
+
+    def __init__(self, capacity=1000, snapshot_path=None, flush_interval=1.0, shared_store=None):
+        self.capacity = max(1, int(capacity))
+        self.snapshot_path = snapshot_path
+        self.flush_interval = flush_interval
+        self.shared_store = shared_store
+        self._order = deque()
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher = None
+        self.duplicates = 0
+        self._load_snapshot()
+
+    def check_and_add(self, update_id):
+        """Return True if update_id was already seen, otherwise record it and return False"""
+        with self._lock:
+            if update_id in self._seen:
+                self.duplicates += 1
+                return True
+            self._seen.add(update_id)
+            self._order.append(update_id)
+            if len(self._order) > self.capacity:
+                self._seen.discard(self._order.popleft())
+            self._dirty = True
+        self._ensure_flusher()
+
+        # Another worker process may have taken it already
+        if self.shared_store is not None and not self.shared_store.claim_update(update_id):
+            with self._lock:
+                self.duplicates += 1
+            return True
+        return False
+
+    def forget(self, update_id):
+        """Remove update_id from the window (used when the update could not be accepted)"""
+        with self._lock:
+            if update_id in self._seen:
+                self._seen.discard(update_id)
+                self._order.remove(update_id)
+                self._dirty = True
+        if self.shared_store is not None:
+            self.shared_store.release_update(update_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'window': len(self._order),
+                'capacity': self.capacity,
+                'duplicates': self.duplicates
+            }
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                ids = json.load(f)
+            for update_id in ids[-self.capacity:]:
+                if update_id not in self._seen:
+                    self._seen.add(update_id)
+                    self._order.append(update_id)
+            print(f"♻️ [Dedup] Restored {len(self._order)} recent update_id values from snapshot", flush=True)
+        except Exception as e:
+            print(f"⚠️ [Dedup] Unable to read snapshot {self.snapshot_path}: {e}", flush=True)
+
+    def flush(self):
+        """Write current window to snapshot file (atomic replace)"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            ids = list(self._order)
+            self._dirty = False
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(ids, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"⚠️ [Dedup] Unable to write snapshot: {e}", flush=True)
+
+    def _ensure_flusher(self):
+        if not self.snapshot_path or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='dedup-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# update_poller.py
+# getUpdates long-polling ingestion (alternative to ngrok + webhook on a single host)
+
+import json
+import os
+import threading
+
+from bot_api import get_client
+
+POLL_READ_MARGIN = 10   # Seconds on top of the long-poll timeout before the read gives up
+
+
+class TelegramUpdatePoller:
+    """Long-poll getUpdates with a persisted offset and hand every batch to handle_update
+
+    handle_update(update) is called once per update, in order; the offset is
+    persisted once per batch after all of its updates have been handed over.
+    Calls go through the process-wide Bot API client, so they share its
+    connection pool, retries and 429 handling and show up in its stats.
+    """
+
+    def __init__(self, api_base_url, bot_token, handle_update, offset_path,
+                 poll_timeout=30, limit=100, allowed_updates=None, client=None):
+        self.api_url = f"{api_base_url}{bot_token}"
+        self.handle_update = handle_update
+        self.offset_path = offset_path
+        self.poll_timeout = int(poll_timeout)
+        self.limit = int(limit)
+        self.allowed_updates = allowed_updates or ['message', 'callback_query']
+        self.offset = self._load_offset()
+        self.client = client or get_client()
+        self._stop = threading.Event()
+        self._thread = None
+        self.batches = 0
+        self.updates = 0
+        self.errors = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._poll_loop, name='telegram-poller', daemon=True)
+        self._thread.start()
+        print(f"📡 [Poller] Long polling started (offset {self.offset}, timeout {self.poll_timeout}s)", flush=True)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'offset': self.offset,
+            'batches': self.batches,
+            'updates': self.updates,
+            'errors': self.errors
+        }
+
+    def _load_offset(self):
+        try:
+            with open(self.offset_path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_offset(self):
+        tmp_path = f"{self.offset_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(str(self.offset))
+            os.replace(tmp_path, self.offset_path)
+        except OSError as e:
+            print(f"⚠️ [Poller] Unable to persist offset: {e}", flush=True)
+
+    def delete_webhook(self):
+        """getUpdates is refused while a webhook is registered, so remove it first (pending updates are kept)"""
+        try:
+            response = self.client.post(f"{self.api_url}/deleteWebhook",
+                                        data={'drop_pending_updates': 'false'})
+            data = response.json()
+            if data.get('ok'):
+                print("🔌 [Poller] Webhook removed, switching to long polling", flush=True)
+            else:
+                print(f"⚠️ [Poller] deleteWebhook failed: {data}", flush=True)
+        except Exception as e:
+            print(f"⚠️ [Poller] deleteWebhook error: {e}", flush=True)
+
+    def _poll_read_timeout(self):
+        """(connect, read) for getUpdates: the read has to outlast the server-side long poll"""
+        connect = self.client.timeout[0] if isinstance(self.client.timeout, tuple) else self.client.timeout
+        return (connect, self.poll_timeout + POLL_READ_MARGIN)
+
+    def _poll_loop(self):
+        self.delete_webhook()
+        backoff = 1
+
+        while not self._stop.is_set():
+            try:
+                response = self.client.post(f"{self.api_url}/getUpdates", data={
+                    'offset': self.offset,
+                    'timeout': self.poll_timeout,
+                    'limit': self.limit,
+                    'allowed_updates': json.dumps(self.allowed_updates)
+                }, timeout=self._poll_read_timeout())
+                data = response.json()
+
+                if response.status_code == 409:
+                    # Conflict: a webhook was registered again (or another poller is running)
+                    print(f"⚠️ [Poller] getUpdates conflict: {data.get('description')}", flush=True)
+                    self.delete_webhook()
+                    raise RuntimeError('getUpdates conflict')
+                if not data.get('ok'):
+                    raise RuntimeError(f"getUpdates failed: {data}")
+
+                batch = data.get('result', [])
+                if batch:
+                    for update in batch:
+                        self.handle_update(update)
+                    self.offset = batch[-1]['update_id'] + 1
+                    self._save_offset()
+                    self.batches += 1
+                    self.updates += len(batch)
+                backoff = 1
+
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ [Poller] {e} (retry in {backoff}s)", flush=True)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# update_queue.py
+# Bounded in-process work queue: the webhook acknowledges immediately, a worker pool does the actual processing
+
+import queue
+import threading
+import time
+import zlib
+
+
+class UpdateWorkQueue:
+    """Bounded work queue drained by a fixed worker pool (acknowledge-then-process)
+
+    Each worker owns its own FIFO. Items submitted with the same key always land on
+    the same worker, so they are processed one at a time in arrival order; different
+    keys are spread over the pool and run in parallel.
+    """
+
+    def __init__(self, handler, workers=4, maxsize=1000, name='updates'):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.maxsize = max(1, int(maxsize))
+        self.name = name
+        self._queues = [queue.Queue() for _ in range(self.workers)]
+        self._threads = []
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._busy = 0
+        self._busy_time = 0.0
+        self._started_at = None
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Start worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._started_at = time.monotonic()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, args=(self._queues[i],),
+                                          name=f'{self.name}-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"🧵 [{self.name}] Worker pool started ({self.workers} workers, queue size {self.maxsize})", flush=True)
+
+    def stop(self, timeout=5):
+        """Ask workers to exit after draining what is already queued"""
+        for worker_queue in self._queues[:len(self._threads)]:
+            worker_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _queue_for(self, key):
+        if key is None:
+            # Unkeyed items have no ordering constraint: pick the shortest queue
+            return min(self._queues, key=lambda q: q.qsize())
+        digest = zlib.crc32(str(key).encode('utf-8'))
+        return self._queues[digest % self.workers]
+
+    def submit(self, item, key=None):
+        """Enqueue item without blocking; returns False when the queue is full
+
+        Args:
+            item: Work item passed to the handler
+            key: Ordering key (e.g. the target Agent); items sharing a key are processed in FIFO order
+        """
+        with self._lock:
+            if self._depth >= self.maxsize:
+                self.rejected += 1
+                full = True
+            else:
+                self._depth += 1
+                full = False
+        if full:
+            print(f"⚠️ [{self.name}] Queue full ({self.maxsize}), item rejected", flush=True)
+            return False
+        self._queue_for(key).put(item)
+        return True
+
+    def _worker_loop(self, worker_queue):
+        while True:
+            item = worker_queue.get()
+            if item is None:
+                worker_queue.task_done()
+                return
+
+            started = time.monotonic()
+            with self._lock:
+                self._depth -= 1
+                self._busy += 1
+            try:
+                self.handler(item)
+                with self._lock:
+                    self.processed += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                print(f"❌ [{self.name}] Worker processing error: {e}", flush=True)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._busy_time += time.monotonic() - started
+                worker_queue.task_done()
+
+    def stats(self):
+        """Queue depth and worker utilisation snapshot"""
+        with self._lock:
+            uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+            capacity = uptime * self.workers
+            return {
+                'depth': self._depth,
+                'maxsize': self.maxsize,
+                'workers': self.workers,
+                'busy_workers': self._busy,
+                'utilization': round(self._busy_time / capacity, 4) if capacity else 0.0,
+                'processed': self.processed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# window_cache.py
+# In-memory map of the session's live windows and panes, kept current by tmux control-mode
+# notifications (%window-add, %window-close, %unlinked-window-close, %window-renamed) instead of polling
+
+import threading
+import time
+
+# One list-windows row per window: everything /status needs in a single tmux call
+_PROBE_FORMAT = '\t'.join([
+    '#{session_name}', '#{window_id}', '#{window_name}', '#{pane_id}', '#{pane_pid}',
+    '#{pane_current_command}', '#{window_activity}', '#{pane_dead}'
+])
+SHELL_COMMANDS = ('bash', 'zsh', 'sh', 'dash', 'fish')
+
+
+class AgentWindowCache:
+    """Agent name -> window/pane lookup without a tmux round trip per check
+
+    An agent is bound to the window id it was first found under, so its pane
+    id stays a valid injection target even if the window is renamed later.
+    The window list is (re)loaded with one list-windows call on first use,
+    after %window-add and after every control-mode reconnect; closes and
+    renames are applied in place. While the control connection is down no
+    notifications arrive, so every lookup reloads instead of trusting the map.
+    """
+
+    def __init__(self, client, session_name):
+        self.client = client
+        self.session_name = session_name
+        self._lock = threading.Lock()
+        self._windows = {}      # window_id -> {'name': ..., 'pane_id': ...}
+        self._bindings = {}     # agent name -> window_id
+        self._dirty = True
+        self._loaded_connects = -1
+        self.loads = 0
+        self.hits = 0
+        client.add_listener(self._on_notification)
+
+    # ---------- notifications (control-mode reader thread) ----------
+    def _on_notification(self, line):
+        parts = line.decode('utf-8', errors='replace').split(' ', 2)
+        event = parts[0]
+        if event == '%window-add':
+            with self._lock:
+                self._dirty = True
+        elif event in ('%window-close', '%unlinked-window-close') and len(parts) > 1:
+            with self._lock:
+                self._windows.pop(parts[1], None)
+                for name, window_id in list(self._bindings.items()):
+                    if window_id == parts[1]:
+                        del self._bindings[name]
+        elif event == '%window-renamed' and len(parts) > 2:
+            with self._lock:
+                if parts[1] in self._windows:
+                    self._windows[parts[1]]['name'] = parts[2]
+                else:
+                    self._dirty = True
+        elif event in ('%session-changed', '%sessions-changed'):
+            with self._lock:
+                self._dirty = True
+
+    # ---------- lookups ----------
+    def _reload(self):
+        result = self.client.run(['list-windows', '-t', self.session_name,
+                                  '-F', '#{window_id}\t#{window_name}\t#{pane_id}'])
+        windows = {}
+        if result.returncode == 0:
+            for row in result.stdout.splitlines():
+                fields = row.split('\t')
+                if len(fields) == 3:
+                    windows[fields[0]] = {'name': fields[1], 'pane_id': fields[2]}
+        with self._lock:
+            self._windows = windows
+            self._bindings = {name: wid for name, wid in self._bindings.items() if wid in windows}
+            self._dirty = False
+            self.loads += 1
+
+    def _ensure_fresh(self):
+        live = self.client.ensure_connected()
+        with self._lock:
+            stale = self._dirty or not live or self._loaded_connects != self.client.connects
+            if live:
+                self._loaded_connects = self.client.connects
+        if stale:
+            self._reload()
+        else:
+            self.hits += 1
+
+    def pane_id(self, agent_name):
+        """Pane id ('%3') of the agent's window, or None when it does not exist"""
+        self._ensure_fresh()
+        with self._lock:
+            window_id = self._bindings.get(agent_name)
+            if window_id not in self._windows:
+                window_id = next((wid for wid, w in self._windows.items() if w['name'] == agent_name), None)
+                if window_id is None:
+                    return None
+                self._bindings[agent_name] = window_id
+            return self._windows[window_id]['pane_id']
+
+    def exists(self, agent_name):
+        return self.pane_id(agent_name) is not None
+
+    def agent_for_pane(self, pane_id):
+        """Name the pane's window is known under (bound Agent first), no tmux call
+
+        Safe to call from control-mode listeners, which run on the reader thread.
+        """
+        with self._lock:
+            window_id = next((wid for wid, w in self._windows.items() if w['pane_id'] == pane_id), None)
+            if window_id is None:
+                return None
+            bound = next((name for name, wid in self._bindings.items() if wid == window_id), None)
+            return bound or self._windows[window_id]['name']
+
+    def target(self, agent_name):
+        """Best tmux target for the agent: its pane id, or session:name when unknown"""
+        return self.pane_id(agent_name) or f'{self.session_name}:{agent_name}'
+
+    def probe(self, agent_names):
+        """Describe every agent's window with one `list-windows -a` call (also refreshes the map)
+
+        Returns (session_running, {agent name: info or None}); info has
+        window_id, pane_id, pane_pid, command, idle_s, dead and cli_exited
+        (the pane is back at a plain shell, i.e. the agent CLI has quit).
+        """
+        result = self.client.run(['list-windows', '-a', '-F', _PROBE_FORMAT])
+        windows = {}
+        session_running = False
+        now = time.time()
+        for row in result.stdout.splitlines() if result.returncode == 0 else []:
+            fields = row.split('\t')
+            if len(fields) != 8 or fields[0] != self.session_name:
+                continue
+            session_running = True
+            _, window_id, name, pane_id, pane_pid, command, activity, dead = fields
+            windows[window_id] = {
+                'name': name,
+                'window_id': window_id,
+                'pane_id': pane_id,
+                'pane_pid': int(pane_pid) if pane_pid.isdigit() else None,
+                'command': command,
+                'idle_s': int(now - int(activity)) if activity.isdigit() else None,
+                'dead': dead == '1',
+                'cli_exited': command in SHELL_COMMANDS
+            }
+
+        with self._lock:
+            if result.returncode == 0:
+                self._windows = {wid: {'name': w['name'], 'pane_id': w['pane_id']} for wid, w in windows.items()}
+                self._bindings = {name: wid for name, wid in self._bindings.items() if wid in windows}
+            bindings = dict(self._bindings)
+
+        by_name = {w['name']: w for w in windows.values()}
+        agents = {}
+        for agent_name in agent_names:
+            window_id = bindings.get(agent_name)
+            agents[agent_name] = windows[window_id] if window_id in windows else by_name.get(agent_name)
+        return session_running, agents
+
+    def stats(self):
+        with self._lock:
+            return {
+                'windows': len(self._windows),
+                'bound_agents': dict(self._bindings),
+                'loads': self.loads,
+                'hits': self.hits
+            }
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for multi-worker serving
+Usage: gunicorn -w 4 --threads 4 -b 127.0.0.1:5002 wsgi:app
+(do not use --preload: each worker must start its own runtime after fork)
+"""
+
+from telegram_webhook_server import create_app
+
+app = create_app()